@@ -0,0 +1,515 @@
+# benchmarks/fake_supabase.py
+"""
+In-memory Supabase stand-in para sa offline benchmarks
+- Same call surface the pages use: table()/from_() query builder, rpc(),
+  storage.from_(), functions.invoke()
+- PostgREST filter semantics (eq/neq/gt/…/in_/ilike/is_/not_/or_ with and()/or() groups)
+- Configurable per-request latency (simulated network round-trip)
+- Counts queries + bytes transferred (JSON size of request + response) per table
+Not a database — no RLS, no constraints; just enough to drive every page realistically
+"""
+import copy
+import json
+import operator
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime
+
+
+class FakeAPIError(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+# ────────────────────────────────────────────────
+# FILTERS
+# ────────────────────────────────────────────────
+def _coerce(value, like):
+    """Filter values arrive as strings sa or_() — match the stored value's type"""
+    if isinstance(value, str) and like is not None and not isinstance(like, str):
+        if isinstance(like, bool):
+            return value.lower() == "true"
+        if isinstance(like, (int, float)):
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
+
+
+def _comparable(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _like(pattern: str, case: bool) -> re.Pattern:
+    regex = "".join(".*" if ch in "%*" else re.escape(ch) for ch in str(pattern))
+    return re.compile(f"^{regex}$", 0 if case else re.IGNORECASE | re.DOTALL)
+
+
+_COMPARE = {
+    "eq": operator.eq, "neq": operator.ne,
+    "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le,
+}
+
+
+def _check(row, column, op, value) -> bool:
+    current = _comparable(row.get(column))
+    if op == "is":
+        target = None if value in (None, "null") else _coerce(value, True)
+        return current is target or current == target
+    if op == "in":
+        values = [_comparable(_coerce(v, current)) for v in value]
+        return current in values or str(current) in [str(v) for v in values]
+    if op in ("like", "ilike"):
+        return current is not None and bool(_like(value, op == "like").match(str(current)))
+    if op == "cs":
+        return isinstance(current, list) and all(v in current for v in value)
+    if current is None:
+        return False
+    target = _comparable(_coerce(value, current))
+    if type(current) is not type(target) and not all(isinstance(v, (int, float)) for v in (current, target)):
+        current, target = str(current), str(target)
+    compare = _COMPARE.get(op)
+    if compare is None:
+        raise FakeAPIError(f"unsupported operator: {op}")
+    return compare(current, target)
+
+
+def _split_top(text: str) -> list:
+    """Split on commas outside parens / double quotes"""
+    parts, depth, quoted, buf, i = [], 0, False, [], 0
+    while i < len(text):
+        ch = text[i]
+        if quoted and ch == "\\" and i + 1 < len(text):
+            buf.append(text[i:i + 2])
+            i += 2
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append("".join(buf).strip())
+            buf = []
+        else:
+            buf.append(ch)
+        i += 1
+    if buf:
+        parts.append("".join(buf).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _parse_condition(text: str):
+    """'col.op.value' / 'and(...)' / 'or(...)' / 'not.and(...)' → predicate(row)"""
+    negate = False
+    if text.startswith("not."):
+        negate, text = True, text[4:]
+    for group, combine in (("and(", all), ("or(", any)):
+        if text.startswith(group) and text.endswith(")"):
+            preds = [_parse_condition(p) for p in _split_top(text[len(group):-1])]
+            pred = lambda row, preds=preds, combine=combine: combine(p(row) for p in preds)
+            return (lambda row: not pred(row)) if negate else pred
+
+    column, op, value = text.split(".", 2)
+    if op == "not":
+        negate = not negate
+        op, value = value.split(".", 1)
+    if op == "in":
+        value = [_unquote(v) for v in _split_top(value.strip("()"))]
+    else:
+        value = _unquote(value)
+    pred = lambda row: _check(row, column, op, value)
+    return (lambda row: not pred(row)) if negate else pred
+
+
+def _sort_key(value):
+    # None sorts last (PostgREST default for asc), mixed types compare as strings
+    value = _comparable(value)
+    if value is None:
+        return (1, 0, "")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, 0, value)
+    return (0, 1, str(value))
+
+
+# ────────────────────────────────────────────────
+# QUERY BUILDER
+# ────────────────────────────────────────────────
+class _Not:
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def negated(*args, **kwargs):
+            self._query._negate_next = True
+            return method(*args, **kwargs)
+        return negated
+
+
+class FakeQuery:
+    def __init__(self, client, table: str):
+        self.client = client
+        self.table_name = table
+        self.action = "select"
+        self.columns = "*"
+        self.count_mode = None
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.limit_n = None
+        self.offset = 0
+        self.single_mode = None
+        self._negate_next = False
+
+    # ─── ACTIONS ───
+    def select(self, *columns, count=None, **_):
+        self.columns = ",".join(columns) if columns else "*"
+        self.count_mode = count
+        return self
+
+    def insert(self, rows, **_):
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id", **_):
+        self.action, self.payload = "upsert", (rows, on_conflict or "id")
+        return self
+
+    def update(self, values, **_):
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self, **_):
+        self.action = "delete"
+        return self
+
+    # ─── FILTERS ───
+    def _add(self, pred):
+        if self._negate_next:
+            self._negate_next = False
+            self.filters.append(lambda row: not pred(row))
+        else:
+            self.filters.append(pred)
+        return self
+
+    def _op(op):
+        def method(self, column, value):
+            return self._add(lambda row: _check(row, column, op, value))
+        return method
+
+    eq, neq, gt, gte, lt, lte = _op("eq"), _op("neq"), _op("gt"), _op("gte"), _op("lt"), _op("lte")
+    like, ilike, contains = _op("like"), _op("ilike"), _op("cs")
+    del _op
+
+    def is_(self, column, value):
+        return self._add(lambda row: _check(row, column, "is", value))
+
+    def in_(self, column, values):
+        values = list(values)
+        return self._add(lambda row: _check(row, column, "in", values))
+
+    def or_(self, filters: str, **_):
+        preds = [_parse_condition(p) for p in _split_top(filters)]
+        return self._add(lambda row: any(p(row) for p in preds))
+
+    def filter(self, column, operator, value):
+        return self._add(_parse_condition(f"{column}.{operator}.{value}"))
+
+    def match(self, query: dict):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    @property
+    def not_(self):
+        return _Not(self)
+
+    # ─── MODIFIERS ───
+    def order(self, column, desc: bool = False, nullsfirst: bool = False, foreign_table=None, **_):
+        if foreign_table is None:
+            self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, foreign_table=None, **_):
+        if foreign_table is None:
+            self.limit_n = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table=None, **_):
+        if foreign_table is None:
+            self.offset, self.limit_n = start, end - start + 1
+        return self
+
+    def single(self):
+        self.single_mode = "single"
+        return self
+
+    def maybe_single(self):
+        self.single_mode = "maybe"
+        return self
+
+    # ─── EXECUTE ───
+    def _matches(self, row) -> bool:
+        return all(f(row) for f in self.filters)
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute(self)
+
+
+def _parse_columns(columns: str):
+    """'id, name, files:announcement_files(*)' → (plain columns | None for *, embedded [(alias, table)])"""
+    plain, embedded = [], []
+    for part in _split_top(columns.replace("\n", " ")):
+        if "(" in part:
+            head = part[:part.index("(")].strip().split("!")[0]
+            alias, _, table = head.partition(":")
+            embedded.append((alias.strip(), (table or alias).strip()))
+        else:
+            plain.append(part.split(":")[-1].split("::")[0].strip())
+    return (None if "*" in plain or not plain else plain), embedded
+
+
+# ────────────────────────────────────────────────
+# STORAGE / FUNCTIONS
+# ────────────────────────────────────────────────
+class FakeBucket:
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def _url(self, path: str) -> str:
+        return f"{self.client.supabase_url}/storage/v1/object/public/{self.bucket}/{path}"
+
+    def upload(self, path, file, file_options=None):
+        size = len(file) if isinstance(file, (bytes, bytearray)) else 0
+        self.client._account(f"storage:{self.bucket}", sent=size)
+        self.client.objects[(self.bucket, path)] = size
+        return {"path": path}
+
+    def get_public_url(self, path: str) -> str:
+        return self._url(path)
+
+    def create_signed_url(self, path: str, expires_in: int, options=None) -> dict:
+        url = f"{self._url(path)}?token=fake"
+        self.client._account(f"storage:{self.bucket}", received=len(url))
+        return {"signedURL": url, "signedUrl": url}
+
+    def create_signed_urls(self, paths, expires_in: int, options=None) -> list:
+        out = [{"path": p, "signedURL": f"{self._url(p)}?token=fake", "signedUrl": f"{self._url(p)}?token=fake"}
+               for p in paths]
+        self.client._account(f"storage:{self.bucket}", received=len(json.dumps(out)))
+        return out
+
+    def remove(self, paths) -> list:
+        self.client._account(f"storage:{self.bucket}")
+        for p in paths:
+            self.client.objects.pop((self.bucket, p), None)
+        return [{"name": p} for p in paths]
+
+    def list(self, path: str = None, options=None) -> list:
+        self.client._account(f"storage:{self.bucket}")
+        return [{"name": p} for (b, p) in self.client.objects if b == self.bucket]
+
+
+class FakeStorage:
+    def __init__(self, client):
+        self.client = client
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self.client, bucket)
+
+
+class FakeFunctions:
+    def __init__(self, client):
+        self.client = client
+
+    def invoke(self, name: str, invoke_options=None):
+        self.client._account(f"function:{name}", sent=len(json.dumps(invoke_options or {}, default=str)))
+        return b"{}"
+
+
+class _RPC:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params or {}
+
+    def execute(self) -> FakeResponse:
+        handler = self.client.rpcs.get(self.name)
+        if handler is None:
+            raise FakeAPIError(f"function {self.name} not found")
+        self.client._sleep()
+        with self.client.lock:
+            started = time.perf_counter()
+            data = handler(self.client, **self.params)
+            self.client.server_seconds += time.perf_counter() - started
+        self.client._account(f"rpc:{self.name}",
+                             sent=len(json.dumps(self.params, default=str)),
+                             received=len(json.dumps(data, default=str)))
+        return FakeResponse(data)
+
+
+# ────────────────────────────────────────────────
+# CLIENT
+# ────────────────────────────────────────────────
+class FakeSupabase:
+    """
+    tables = {name: [row, ...]}; views = {name: fn(tables) → rows} (mv_*, v_* computed on read)
+    latency_ms = simulated round-trip per request (sleep happens outside the lock)
+    """
+
+    def __init__(self, tables=None, views=None, rpcs=None, latency_ms: float = 0.0):
+        self.tables = defaultdict(list, tables or {})
+        self.views = dict(views or {})
+        self.rpcs = dict(rpcs or {})
+        self.latency_ms = latency_ms
+        self.lock = threading.RLock()
+        self.objects = {}
+        self.storage = FakeStorage(self)
+        self.functions = FakeFunctions(self)
+        self.supabase_url = "http://fake-supabase.local"
+        self.supabase_key = "fake-key"
+        self.realtime_url = "ws://fake-supabase.local/realtime/v1"
+        self.reset_stats()
+
+    # ─── STATS ───
+    def reset_stats(self):
+        with self.lock:
+            self.stats = defaultdict(lambda: {"queries": 0, "bytes_sent": 0, "bytes_received": 0, "rows": 0})
+            self.server_seconds = 0.0  # time spent evaluating queries in-process (not app time)
+
+    def _account(self, target: str, sent: int = 0, received: int = 0, rows: int = 0):
+        with self.lock:
+            s = self.stats[target]
+            s["queries"] += 1
+            s["bytes_sent"] += sent
+            s["bytes_received"] += received
+            s["rows"] += rows
+
+    def totals(self) -> dict:
+        with self.lock:
+            out = {"queries": 0, "bytes_sent": 0, "bytes_received": 0, "rows": 0}
+            for s in self.stats.values():
+                for k in out:
+                    out[k] += s[k]
+            out["bytes"] = out["bytes_sent"] + out["bytes_received"]
+            out["server_seconds"] = self.server_seconds
+            return out
+
+    def _sleep(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+    # ─── ENTRY POINTS ───
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params=None, **_) -> _RPC:
+        return _RPC(self, name, params)
+
+    # ─── EXECUTION ───
+    def _source(self, name: str) -> list:
+        if name in self.views:
+            return self.views[name](self.tables)
+        return self.tables[name]
+
+    def _embed(self, row, parent: str, embedded) -> dict:
+        # FK by convention: child.<parent singular>_id = parent.id
+        fk = parent.rstrip("s") + "_id"
+        for alias, child in embedded:
+            row[alias] = [copy.deepcopy(r) for r in self.tables.get(child, []) if r.get(fk) == row.get("id")]
+        return row
+
+    def _execute(self, q: FakeQuery) -> FakeResponse:
+        self._sleep()
+        sent = len(json.dumps(q.payload, default=str)) if q.payload is not None else 0
+        with self.lock:
+            started = time.perf_counter()
+            data, count = self._run(q)
+            self.server_seconds += time.perf_counter() - started
+        received = len(json.dumps(data, default=str)) if data is not None else 0
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        self._account(q.table_name, sent=sent, received=received, rows=rows)
+        return FakeResponse(data, count)
+
+    def _run(self, q: FakeQuery):
+        if q.action == "insert":
+            rows = q.payload if isinstance(q.payload, list) else [q.payload]
+            inserted = [self._new_row(q.table_name, r) for r in rows]
+            self.tables[q.table_name].extend(inserted)
+            return copy.deepcopy(inserted), None
+        if q.action == "upsert":
+            rows, key = q.payload
+            rows = rows if isinstance(rows, list) else [rows]
+            keys = [k.strip() for k in key.split(",")]
+            out = []
+            for r in rows:
+                existing = next((x for x in self.tables[q.table_name]
+                                 if all(x.get(k) == r.get(k) for k in keys)), None)
+                if existing is not None:
+                    existing.update(r)
+                    out.append(existing)
+                else:
+                    new = self._new_row(q.table_name, r)
+                    self.tables[q.table_name].append(new)
+                    out.append(new)
+            return copy.deepcopy(out), None
+        if q.action == "update":
+            hits = [r for r in self.tables[q.table_name] if q._matches(r)]
+            for r in hits:
+                r.update(q.payload)
+            return copy.deepcopy(hits), None
+        if q.action == "delete":
+            table = self.tables[q.table_name]
+            hits = [r for r in table if q._matches(r)]
+            self.tables[q.table_name] = [r for r in table if not q._matches(r)]
+            return copy.deepcopy(hits), None
+
+        rows = [r for r in self._source(q.table_name) if q._matches(r)]
+        count = len(rows) if q.count_mode else None
+        for column, desc in reversed(q.orders):
+            rows.sort(key=lambda r: _sort_key(r.get(column)), reverse=desc)
+        rows = rows[q.offset:]
+        if q.limit_n is not None:
+            rows = rows[:q.limit_n]
+
+        plain, embedded = _parse_columns(q.columns)
+        out = []
+        for r in rows:
+            picked = copy.deepcopy(r) if plain is None else {c: copy.deepcopy(r.get(c)) for c in plain}
+            out.append(self._embed(picked, q.table_name, embedded) if embedded else picked)
+
+        if q.single_mode:
+            if len(out) > 1 or (not out and q.single_mode == "single"):
+                raise FakeAPIError(f"JSON object requested, multiple (or no) rows returned ({len(out)})")
+            return (out[0] if out else None), count
+        return out, count
+
+    def _new_row(self, table: str, row: dict) -> dict:
+        row = copy.deepcopy(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        now = datetime.now().isoformat()
+        row.setdefault("created_at", now)
+        if table in ("waitlist", "messages"):
+            row.setdefault("updated_at", now)
+        return row
@@ -0,0 +1,190 @@
+# benchmarks/run_pages.py
+"""
+Offline page benchmarks for KMFX Empire
+- Swaps utils.supabase_client for the in-memory stand-in (benchmarks/fake_supabase.py)
+  BEFORE any page/util imports it
+- Seeds synthetic data at each scale (benchmarks/synthetic.py)
+- Drives every page through streamlit.testing AppTest: cold run (empty caches) + warm rerun
+- Reports wall time, query count and bytes transferred per page × scale
+  ("app s" = wall time minus simulated latency and the fake's own query work)
+
+Usage (from the repo root):
+    python -m benchmarks.run_pages
+    python -m benchmarks.run_pages --scales 1 10 --latency-ms 40 --pages Dashboard Messages
+    python -m benchmarks.run_pages --role client --json bench.json
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.synthetic import RPCS, SCALES, VIEWS, generate_empire
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES_DIR = ROOT / "pages"
+PUBLIC_PAGES = {"landing.py"}  # rendered via main.py when logged out
+
+
+# ────────────────────────────────────────────────
+# CLIENT SWAP
+# ────────────────────────────────────────────────
+def install_fake_client(latency_ms: float) -> FakeSupabase:
+    """
+    Replace utils.supabase_client with a module exposing the fake.
+    Must run before anything imports utils.* (every util binds `supabase` at import).
+    """
+    os.environ.setdefault("REALTIME_MODE", "local")  # no Realtime socket sa benchmarks
+    os.environ.setdefault("MARKET_DATA_PROVIDER", "fixture")  # offline gold feed (synthetic walk)
+    os.environ.setdefault("MARKET_DATA_DB", os.path.join(tempfile.gettempdir(), "kmfx_bench_market.sqlite"))
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    if "utils.supabase_client" in sys.modules:
+        raise RuntimeError("utils.supabase_client already imported — install the fake first")
+
+    client = FakeSupabase(views=VIEWS, rpcs=RPCS, latency_ms=latency_ms)
+    module = types.ModuleType("utils.supabase_client")
+    module.__file__ = str(ROOT / "utils" / "supabase_client.py")
+    module.get_supabase = lambda: client
+    module.supabase = client
+    sys.modules["utils.supabase_client"] = module
+    return client
+
+
+def reset_caches():
+    """Cold start: empty every process-wide cache the pages use"""
+    import streamlit as st
+    from utils.query_cache import clear_all
+    from utils.user_directory import invalidate_user_names
+
+    clear_all()
+    invalidate_user_names()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+# ────────────────────────────────────────────────
+# RUNNER
+# ────────────────────────────────────────────────
+def session_user(tables: dict, role: str) -> dict:
+    user = next(u for u in tables["users"] if u["role"] == role)
+    return {
+        "authenticated": True,
+        "username": user["username"],
+        "full_name": user["full_name"],
+        "role": user["role"],
+        "user_id": user["id"],
+        "theme": "light",
+    }
+
+
+def _measure(client: FakeSupabase, at) -> dict:
+    client.reset_stats()
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    totals = client.totals()
+    return {
+        "seconds": round(elapsed, 3),
+        # wall time minus the fake's own query evaluation + simulated latency
+        "app_seconds": round(elapsed - totals["server_seconds"] - totals["queries"] * client.latency_ms / 1000, 3),
+        "queries": totals["queries"],
+        "rows": totals["rows"],
+        "bytes": totals["bytes"],
+        "exceptions": [e.message for e in at.exception],
+    }
+
+
+def bench_page(client: FakeSupabase, page: str, user: dict, timeout: float) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    reset_caches()
+    at = AppTest.from_file(str(ROOT / "main.py"), default_timeout=timeout)
+    if page not in PUBLIC_PAGES:
+        for key, value in user.items():
+            at.session_state[key] = value
+        at.switch_page(f"pages/{page}")
+    try:
+        cold = _measure(client, at)
+        warm = _measure(client, at)
+    except Exception as e:  # timeout / crash sa page — report it, keep going
+        return {"page": page, "error": f"{type(e).__name__}: {e}"}
+    return {"page": page, "cold": cold, "warm": warm}
+
+
+def discover_pages(selected=None) -> list:
+    pages = sorted(p.name for p in PAGES_DIR.glob("*.py"))
+    if not selected:
+        return pages
+    wanted = [s.lower() for s in selected]
+    return [p for p in pages if any(w in p.lower() for w in wanted)]
+
+
+def run(scales, pages, role: str, latency_ms: float, seed: int, timeout: float) -> list:
+    client = install_fake_client(latency_ms)
+    results = []
+    for scale in scales:
+        tables = generate_empire(scale=scale, seed=seed)
+        user = session_user(tables, role)
+        for page in pages:
+            client.tables.clear()
+            client.tables.update(copy.deepcopy(tables))  # fresh copy per page — pages write
+            result = bench_page(client, page, user, timeout)
+            result["scale"] = scale
+            results.append(result)
+            print(format_row(result), flush=True)
+    return results
+
+
+# ────────────────────────────────────────────────
+# REPORT
+# ────────────────────────────────────────────────
+HEADER = (
+    f"{'page':<28} {'scale':>5} {'cold s':>8} {'app s':>8} {'warm s':>8} "
+    f"{'queries':>8} {'warm q':>7} {'KB':>10} {'errors':>6}"
+)
+
+
+def format_row(r: dict) -> str:
+    name = r["page"].removesuffix(".py")[-28:]
+    if "error" in r:
+        return f"{name:<28} {r['scale']:>5}x  {r['error']}"
+    cold, warm = r["cold"], r["warm"]
+    errors = len(cold["exceptions"]) + len(warm["exceptions"])
+    return (
+        f"{name:<28} {r['scale']:>4}x {cold['seconds']:>8.3f} {cold['app_seconds']:>8.3f} {warm['seconds']:>8.3f} "
+        f"{cold['queries']:>8} {warm['queries']:>7} {cold['bytes'] / 1024:>10.1f} {errors:>6}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline KMFX Empire page benchmarks")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--pages", nargs="*", help="substring match on page file names (default: all)")
+    parser.add_argument("--role", default="owner", choices=["owner", "admin", "client"])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated round-trip per request")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=300.0, help="AppTest timeout per run (seconds)")
+    parser.add_argument("--json", help="also write raw results here")
+    args = parser.parse_args(argv)
+
+    pages = discover_pages(args.pages)
+    print(f"latency {args.latency_ms:g} ms/request · role {args.role} · {len(pages)} pages")
+    print(HEADER)
+    results = run(args.scales, pages, args.role, args.latency_ms, args.seed, args.timeout)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
+    failed = [r for r in results if "error" in r or r["cold"]["exceptions"] or r["warm"]["exceptions"]]
+    if failed:
+        print(f"\n{len(failed)} page run(s) raised — see exceptions in --json output")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
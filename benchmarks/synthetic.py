@@ -0,0 +1,471 @@
+# benchmarks/synthetic.py
+"""
+Synthetic KMFX Empire data para sa benchmarks (deterministic per seed)
+- scale=1 ≈ a small live empire; 10× / 100× multiply every growing table
+- users, ftmo_accounts (participants_v2 / contributors_v2), profits,
+  profit_distributions, logs, messages, growth_fund_transactions
+  + the side tables pages read (notifications, withdrawals, files, EA, …)
+- VIEWS = the mv_* / v_* rollups, computed from the tables on every read
+"""
+import random
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+# Rows per table at scale=1
+BASE_COUNTS = {
+    "clients": 25,
+    "admins": 2,
+    "ftmo_accounts": 6,
+    "profits": 60,
+    "logs": 2000,
+    "messages": 400,
+    "growth_fund_transactions": 40,
+    "notifications": 250,
+    "withdrawals": 40,
+    "client_files": 50,
+    "announcements": 15,
+    "testimonials": 12,
+    "ea_versions": 5,
+    "ea_downloads": 150,
+    "waitlist": 80,
+}
+SCALES = (1, 10, 100)
+
+OWNER = {"username": "owner", "full_name": "Empire Owner", "role": "owner"}
+PHASES = ["Challenge P1", "Challenge P2", "Verification", "Funded", "Failed"]
+LOG_ACTIONS = ["Login", "Logout", "Profit Recorded", "Withdrawal Requested", "File Uploaded",
+               "Message Sent", "Account Updated", "License Generated", "Announcement Posted"]
+FIRST = ["Juan", "Maria", "Jose", "Ana", "Mark", "Paolo", "Carla", "Miguel", "Liza", "Ramon", "Grace", "Noel"]
+LAST = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Aquino"]
+
+
+def _id(rng) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _ts(rng, start: datetime, days: int) -> str:
+    return (start + timedelta(seconds=rng.randrange(days * 86400))).isoformat()
+
+
+def _day(rng, start: date, days: int) -> str:
+    return (start + timedelta(days=rng.randrange(days))).isoformat()
+
+
+# ────────────────────────────────────────────────
+# GENERATOR
+# ────────────────────────────────────────────────
+def generate_empire(scale: int = 1, seed: int = 7, days: int = 365) -> dict:
+    """{table: [row, ...]} sized BASE_COUNTS × scale"""
+    rng = random.Random(seed)
+    n = {k: max(1, v * scale) for k, v in BASE_COUNTS.items()}
+    start_dt = datetime(2026, 10, 17) - timedelta(days=days)
+    start_d = start_dt.date()
+    tables = defaultdict(list)
+
+    # ─── USERS ───
+    def person(role: str, i: int) -> dict:
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}"
+        return {
+            "id": _id(rng),
+            "username": name.lower().replace(" ", "_"),
+            "full_name": name,
+            "role": role,
+            "balance": round(rng.uniform(0, 50_000), 2) if role == "client" else 0.0,
+            "email": f"{name.lower().replace(' ', '.')}@example.com",
+            "contact_no": f"09{rng.randrange(10**9):09d}",
+            "address": "Metro Manila",
+            "accounts": None,
+            "title": None,
+            "avatar_url": None,
+            "qr_token": _id(rng),
+            "created_at": _ts(rng, start_dt, days),
+        }
+
+    owner = {**person("owner", 0), **OWNER}
+    users = [owner] + [person("admin", i) for i in range(n["admins"])] + \
+        [person("client", i) for i in range(n["clients"])]
+    clients = [u for u in users if u["role"] == "client"]
+    tables["users"] = users
+
+    # ─── FTMO ACCOUNTS ───
+    for i in range(n["ftmo_accounts"]):
+        members = rng.sample(clients, k=min(len(clients), rng.randint(3, 8)))
+        cut = [rng.uniform(1, 10) for _ in members]
+        share_pool = 100.0 - 10.0 - 20.0  # minus Growth Fund + owner
+        participants = [
+            {"user_id": owner["id"], "display_name": owner["full_name"], "role": "Owner/Manager", "percentage": 20.0},
+            {"user_id": None, "display_name": "Growth Fund", "role": "Growth Fund", "percentage": 10.0},
+        ] + [
+            {"user_id": m["id"], "display_name": m["full_name"], "role": "Contributor",
+             "percentage": round(share_pool * c / sum(cut), 2)}
+            for m, c in zip(members, cut)
+        ]
+        contributors = [
+            {"user_id": m["id"], "units": float(rng.randint(1, 20)), "php_per_unit": 1000.0}
+            for m in members
+        ]
+        tables["ftmo_accounts"].append({
+            "id": _id(rng),
+            "name": f"KMFX {100_000 if i % 2 else 50_000:,} #{i + 1}",
+            "ftmo_id": str(10_000_000 + i),
+            "current_phase": rng.choice(PHASES),
+            "current_equity": round(rng.uniform(40_000, 220_000), 2),
+            "withdrawable_balance": round(rng.uniform(0, 15_000), 2),
+            "notes": "",
+            "created_date": _day(rng, start_d, days),
+            "contributor_share_pct": 50.0,
+            "unit_value": 1000.0,
+            "participants_v2": participants,
+            "contributors_v2": contributors,
+            "participants": [{"name": p["display_name"], "role": p["role"], "percentage": p["percentage"]}
+                             for p in participants],
+            "contributors": [{"name": m["full_name"], "units": c["units"], "php_per_unit": c["php_per_unit"]}
+                             for m, c in zip(members, contributors)],
+            "created_at": _ts(rng, start_dt, days),
+        })
+    accounts = tables["ftmo_accounts"]
+
+    # ─── PROFITS + DISTRIBUTIONS + GROWTH FUND ───
+    for _ in range(n["profits"]):
+        acc = rng.choice(accounts)
+        gross = round(rng.uniform(500, 12_000), 2)
+        record_date = _day(rng, start_d, days)
+        gf_add = round(gross * 0.10, 2)
+        profit_id = _id(rng)
+        tables["profits"].append({
+            "id": profit_id, "account_id": acc["id"], "gross_profit": gross, "record_date": record_date,
+            "units_generated": round(gross / 1000, 2), "growth_fund_add": gf_add,
+            "contributor_share_pct": acc["contributor_share_pct"], "created_at": record_date,
+        })
+        for p in acc["participants_v2"]:
+            is_gf = p["role"] == "Growth Fund"
+            tables["profit_distributions"].append({
+                "id": _id(rng), "profit_id": profit_id,
+                "participant_name": p["display_name"], "participant_user_id": p["user_id"],
+                "participant_role": p["role"], "percentage": p["percentage"],
+                "share_amount": round(gross * p["percentage"] / 100, 2), "is_growth_fund": is_gf,
+                "created_at": record_date,
+            })
+        tables["growth_fund_transactions"].append({
+            "id": _id(rng), "date": record_date, "type": "In", "amount": gf_add,
+            "description": f"Auto from {acc['name']} profit", "account_source": acc["name"],
+            "recorded_by": owner["full_name"], "created_at": record_date,
+        })
+    for _ in range(n["growth_fund_transactions"]):
+        kind = rng.choice(["In", "Out"])
+        tables["growth_fund_transactions"].append({
+            "id": _id(rng), "date": _day(rng, start_d, days), "type": kind,
+            "amount": round(rng.uniform(100, 5_000), 2),
+            "description": "Manual top-up" if kind == "In" else "Challenge fee",
+            "account_source": rng.choice(["Manual", "Challenge Fee", rng.choice(accounts)["name"]]),
+            "recorded_by": owner["full_name"], "created_at": _ts(rng, start_dt, days),
+        })
+
+    # ─── LOGS + MESSAGES + NOTIFICATIONS ───
+    for _ in range(n["logs"]):
+        u = rng.choice(users)
+        ts = _ts(rng, start_dt, days)
+        tables["logs"].append({
+            "id": _id(rng), "timestamp": ts, "inserted_at": ts, "user_name": u["full_name"],
+            "user_type": u["role"], "action": rng.choice(LOG_ACTIONS),
+            "details": f"synthetic event {rng.randrange(10**6)}",
+        })
+    staff = [owner] + [u for u in users if u["role"] == "admin"]
+    for _ in range(n["messages"]):
+        c, a = rng.choice(clients), rng.choice(staff)
+        ts = _ts(rng, start_dt, days)
+        from_client = rng.random() < 0.5
+        tables["messages"].append({
+            "id": _id(rng), "timestamp": ts, "updated_at": ts,
+            "message": "Salamat po! " * rng.randint(1, 6),
+            "from_admin": None if from_client else a["full_name"],
+            "from_client": c["full_name"] if from_client else None,
+            "to_client": None if from_client else c["full_name"],
+            "is_read": rng.random() < 0.7,
+        })
+    for _ in range(n["notifications"]):
+        c = rng.choice(clients)
+        tables["notifications"].append({
+            "id": _id(rng), "client_name": c["full_name"], "title": "Profit distributed",
+            "message": "May bagong share ka!", "date": _day(rng, start_d, days),
+            "category": rng.choice(["Profit Distribution", "Withdrawal", "General"]),
+            "read": int(rng.random() < 0.6),
+        })
+
+    # ─── SIDE TABLES ───
+    for _ in range(n["withdrawals"]):
+        c = rng.choice(clients)
+        tables["withdrawals"].append({
+            "id": _id(rng), "client_name": c["full_name"], "client_user_id": c["id"],
+            "amount": round(rng.uniform(500, 20_000), 2), "method": rng.choice(["GCash", "Bank", "USDT"]),
+            "details": "09xx", "status": rng.choice(["Pending", "Approved", "Paid", "Rejected"]),
+            "date_requested": _day(rng, start_d, days), "created_at": _ts(rng, start_dt, days),
+        })
+    for i in range(n["client_files"]):
+        c = rng.choice(clients)
+        tables["client_files"].append({
+            "id": _id(rng), "original_name": f"proof_{i}.png", "storage_path": f"proofs/{i}.png",
+            "file_url": None, "upload_date": _day(rng, start_d, days), "sent_by": c["full_name"],
+            "category": rng.choice(["Payout Proof", "Withdrawal Proof", "Other"]), "notes": "",
+            "tags": [], "assigned_client": c["full_name"], "client_name": c["full_name"],
+            "client_user_id": c["id"], "amount": None, "method": None,
+        })
+    for i in range(n["announcements"]):
+        ann_id = _id(rng)
+        tables["announcements"].append({
+            "id": ann_id, "title": f"Update #{i + 1}", "message": "Empire update " * 20,
+            "date": _day(rng, start_d, days), "posted_by": owner["full_name"],
+            "category": "General", "pinned": i == 0, "likes": rng.randrange(30),
+        })
+        for _ in range(rng.randrange(4)):
+            tables["announcement_comments"].append({
+                "id": _id(rng), "announcement_id": ann_id, "user_name": rng.choice(clients)["full_name"],
+                "message": "Nice!", "timestamp": _ts(rng, start_dt, days),
+            })
+    for i in range(n["testimonials"]):
+        c = rng.choice(clients)
+        tables["testimonials"].append({
+            "id": _id(rng), "client_name": c["full_name"], "message": "Legit! " * 10,
+            "image_url": None, "storage_path": None, "date_submitted": _day(rng, start_d, days),
+            "status": rng.choice(["Pending", "Approved"]),
+        })
+    for i in range(n["ea_versions"]):
+        tables["ea_versions"].append({
+            "id": _id(rng), "version": f"v{i + 1}.0", "title": f"KMFX EA v{i + 1}.0", "message": "Changelog",
+            "notes": "", "file_url": None, "storage_path": f"ea/kmfx_{i + 1}.ex5", "posted_by": owner["full_name"],
+            "upload_date": _day(rng, start_d, days), "date": _day(rng, start_d, days), "category": "EA",
+            "download_count": 0,
+        })
+    versions = {v["id"]: v for v in tables["ea_versions"]}
+    for _ in range(n["ea_downloads"]):
+        v = rng.choice(tables["ea_versions"])
+        versions[v["id"]]["download_count"] += 1
+        tables["ea_downloads"].append({
+            "id": _id(rng), "version_id": v["id"], "downloaded_by": rng.choice(clients)["full_name"],
+            "download_date": _day(rng, start_d, days),
+        })
+    for c in clients:
+        tables["client_licenses"].append({
+            "id": _id(rng), "account_id": c["id"], "key": _id(rng), "enc_data": "x" * 64,
+            "version": "v1.0", "date_generated": _day(rng, start_d, days), "expiry": None,
+            "allow_live": rng.random() < 0.5, "allowed_accounts": "", "revoked": False, "notes": "",
+        })
+    for i in range(n["waitlist"]):
+        ts = _ts(rng, start_dt, days)
+        tables["waitlist"].append({
+            "id": _id(rng), "full_name": f"Prospect {i}", "email": f"prospect{i}@example.com",
+            "language": "tl", "message": "Pa-join po", "status": rng.choice(["Pending", "Approved", "Rejected"]),
+            "subscribed": True, "created_at": ts, "updated_at": ts,
+        })
+    tables["badge_definitions"] = [
+        {"badge_name": "Early Supporter", "description": "First 10 members", "icon_emoji": "🌟",
+         "is_special": True, "max_slots": 10},
+        {"badge_name": "Top Contributor", "description": "Most units", "icon_emoji": "🏆",
+         "is_special": False, "max_slots": None},
+    ]
+    for c in rng.sample(clients, k=min(5, len(clients))):
+        tables["client_badges"].append({
+            "id": _id(rng), "user_id": c["id"], "badge_name": "Early Supporter",
+            "awarded_by": owner["full_name"], "awarded_at": _ts(rng, start_dt, days),
+            "evidence": "", "is_public": True, "is_active": True,
+        })
+    return dict(tables)
+
+
+# ────────────────────────────────────────────────
+# VIEWS (mv_* / v_* rollups computed on read)
+# ────────────────────────────────────────────────
+def _gf_balance(t):
+    txs = t.get("growth_fund_transactions", [])
+    bal = sum(x["amount"] for x in txs if x["type"] == "In") - sum(x["amount"] for x in txs if x["type"] == "Out")
+    return [{"balance": round(bal, 2)}]
+
+
+def _gf_checkpoints(t):
+    """Every finished month closed (what close_growth_fund_months() leaves behind)"""
+    this_month = str(datetime.now(timezone.utc).date())[:7]  # UTC, same as gf_open_month()
+    agg = defaultdict(lambda: [0.0, 0.0, 0])
+    for x in t.get("growth_fund_transactions", []):
+        month = str(x["date"])[:7]
+        if month < this_month:
+            a = agg[month]
+            a[0 if x["type"] == "In" else 1] += x["amount"]
+            a[2] += 1
+    rows, balance = [], 0.0
+    if agg:
+        y, m = map(int, min(agg).split("-"))
+        while f"{y:04d}-{m:02d}" < this_month:
+            a = agg.get(f"{y:04d}-{m:02d}", [0.0, 0.0, 0])
+            balance += a[0] - a[1]
+            rows.append({"month": f"{y:04d}-{m:02d}-01", "closing_balance": round(balance, 2),
+                         "total_in": round(a[0], 2), "total_out": round(a[1], 2), "tx_count": a[2]})
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return rows
+
+
+def _gf_source_rollups(t):
+    agg = defaultdict(lambda: [0.0, 0, ""])
+    for x in t.get("growth_fund_transactions", []):
+        desc, src = x.get("description") or "", x.get("account_source") or ""
+        if x["type"] == "Out":
+            key = ("out", desc or src or "Outflow")
+        elif src != "Manual" and desc.startswith("Auto"):
+            key = ("auto", src or "Unknown")
+        else:
+            key = ("manual", desc or src or "Manual In")
+        a = agg[key]
+        a[0] += x["amount"]
+        a[1] += 1
+        a[2] = max(a[2], str(x["date"]))
+    return [{"kind": k, "source": s, "total": round(v[0], 2), "tx_count": v[1], "last_date": v[2]}
+            for (k, s), v in agg.items()]
+
+
+def _empire_summary(t):
+    accs = t.get("ftmo_accounts", [])
+    return [{
+        "total_accounts": len(accs),
+        "total_equity": round(sum(a.get("current_equity") or 0 for a in accs), 2),
+        "total_withdrawable": round(sum(a.get("withdrawable_balance") or 0 for a in accs), 2),
+    }]
+
+
+def _client_balances(t):
+    clients = [u for u in t.get("users", []) if u.get("role") == "client"]
+    return [{"total_client_balances": round(sum(u.get("balance") or 0 for u in clients), 2),
+             "total_clients": len(clients)}]
+
+
+def _non_gf(t):
+    return [d for d in t.get("profit_distributions", []) if not d.get("is_growth_fund")]
+
+
+def _profit_totals(t):
+    return [{
+        "id": 1,
+        "total_gross": round(sum(p["gross_profit"] for p in t.get("profits", [])), 2),
+        "total_distributed": round(sum(d["share_amount"] for d in _non_gf(t)), 2),
+        "profit_count": len(t.get("profits", [])),
+        "distribution_count": len(t.get("profit_distributions", [])),
+    }]
+
+
+def _participant_shares(t):
+    agg = defaultdict(lambda: [0.0, 0])
+    for d in t.get("profit_distributions", []):
+        a = agg[(d.get("participant_name") or "Unknown", bool(d.get("is_growth_fund")))]
+        a[0] += d["share_amount"]
+        a[1] += 1
+    return [{"participant_name": name, "is_growth_fund": gf, "total_share": round(v[0], 2), "distribution_count": v[1]}
+            for (name, gf), v in agg.items()]
+
+
+def _monthly_profits(t):
+    agg = defaultdict(lambda: [0.0, 0.0, 0])
+    for p in t.get("profits", []):
+        a = agg[str(p["record_date"])[:7]]
+        a[0] += p["gross_profit"]
+        a[1] += p.get("growth_fund_add") or 0
+        a[2] += 1
+    return [{"month": k, "gross_profit": round(v[0], 2), "growth_fund_add": round(v[1], 2), "profit_count": v[2]}
+            for k, v in agg.items()]
+
+
+def _unread_counts(t):
+    agg = defaultdict(int)
+    for x in t.get("notifications", []):
+        if not x.get("read"):
+            agg[x["client_name"]] += 1
+    return [{"client_name": k, "unread": v} for k, v in agg.items()]
+
+
+def _download_trends(t):
+    agg = defaultdict(int)
+    for d in t.get("ea_downloads", []):
+        agg[(d["version_id"], d["download_date"])] += 1
+    return [{"version_id": v, "download_date": day, "downloads": c} for (v, day), c in agg.items()]
+
+
+def _entitlements(t):
+    users = {u["id"]: u for u in t.get("users", [])}
+    latest = {}
+    for lic in t.get("client_licenses", []):
+        cur = latest.get(lic["account_id"])
+        if cur is None or str(lic["date_generated"]) > str(cur["date_generated"]):
+            latest[lic["account_id"]] = lic
+    return [{"user_id": uid, "full_name": users[uid]["full_name"], "allow_live": lic["allow_live"],
+             "version": lic["version"], "revoked": lic["revoked"], "date_generated": lic["date_generated"]}
+            for uid, lic in latest.items() if uid in users]
+
+
+VIEWS = {
+    "mv_growth_fund_balance": _gf_balance,
+    "gf_checkpoints": _gf_checkpoints,
+    "gf_source_rollups": _gf_source_rollups,
+    "mv_empire_summary": _empire_summary,
+    "mv_client_balances": _client_balances,
+    "mv_profit_totals": _profit_totals,
+    "mv_participant_shares": _participant_shares,
+    "mv_monthly_profits": _monthly_profits,
+    "notification_unread_counts": _unread_counts,
+    "v_ea_download_trends": _download_trends,
+    "v_client_entitlements": _entitlements,
+}
+
+
+# ────────────────────────────────────────────────
+# RPCs
+# ────────────────────────────────────────────────
+def _distribute_profit(client, p_account_id, p_gross_profit, p_record_date, p_units_generated,
+                       p_growth_fund_add, p_contributor_share_pct, p_distributions,
+                       p_account_source, p_recorded_by):
+    """Same effect as supabase/migrations/20261017000200_distribute_profit.sql"""
+    t = client.tables
+    profit_id = str(uuid.uuid4())
+    t["profits"].append({
+        "id": profit_id, "account_id": p_account_id, "gross_profit": p_gross_profit,
+        "record_date": p_record_date, "units_generated": p_units_generated,
+        "growth_fund_add": p_growth_fund_add, "contributor_share_pct": p_contributor_share_pct,
+    })
+    users = {u["id"]: u for u in t["users"]}
+    for d in p_distributions or []:
+        t["profit_distributions"].append({"id": str(uuid.uuid4()), "profit_id": profit_id, **d})
+        uid = d.get("participant_user_id")
+        if uid in users and not d.get("is_growth_fund"):
+            users[uid]["balance"] = (users[uid].get("balance") or 0) + d["share_amount"]
+    if p_growth_fund_add and p_growth_fund_add > 0:
+        t["growth_fund_transactions"].append({
+            "id": str(uuid.uuid4()), "date": p_record_date, "type": "In", "amount": p_growth_fund_add,
+            "description": f"Auto from {p_account_source} profit", "account_source": p_account_source,
+            "recorded_by": p_recorded_by,
+        })
+    return profit_id
+
+
+def _close_growth_fund_months(client):
+    return 0  # gf_checkpoints is computed on read — every finished month is already closed
+
+
+def _public_stats(client):
+    t = client.tables
+    summary = _empire_summary(t)[0]
+    return [{
+        "accounts_count": summary["total_accounts"],
+        "total_equity": summary["total_equity"],
+        "gf_balance": _gf_balance(t)[0]["balance"],
+        "members_count": sum(1 for u in t.get("users", []) if u.get("role") == "client"),
+        "computed_at": datetime.now().isoformat(),
+    }]
+
+
+def _refresh_profit_rollups_if_dirty(client):
+    return False  # rollup views are computed on read
+
+
+RPCS = {
+    "distribute_profit": _distribute_profit,
+    "refresh_profit_rollups_if_dirty": _refresh_profit_rollups_if_dirty,
+    "close_growth_fund_months": _close_growth_fund_months,
+    "public_stats": _public_stats,
+}
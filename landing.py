@@ -3,8 +3,10 @@
 # KMFX EA - FULL PUBLIC LANDING PAGE (COMPLETE v3.3 – fully synced Feb 2026)
 # =====================================================================
 import streamlit as st
-import yfinance as yf
+from streamlit_lightweight_charts import renderLightweightCharts
 from utils.supabase_client import supabase
+from utils.public_stats import get_public_stats
+from utils.market_data import get_gold_quote, get_gold_bars
 from utils.auth import login_user, is_authenticated
 from utils.helpers import log_action
 from utils.styles import apply_global_styles
@@ -48,41 +50,6 @@ if is_authenticated():
 # ────────────────────────────────────────────────
 # CACHED DATA FUNCTIONS
 # ────────────────────────────────────────────────
-@st.cache_data(ttl=60)
-def get_realtime_stats():
-    try:
-        accounts_count = supabase.table("ftmo_accounts").select("id", count="exact").execute().count or 0
-        equity_data = supabase.table("ftmo_accounts").select("current_equity").execute().data or []
-        total_equity = sum(acc.get("current_equity", 0) for acc in equity_data)
-        gf_data = supabase.table("growth_fund_transactions").select("type", "amount").execute().data or []
-        gf_balance = sum(t["amount"] if t["type"] == "In" else -t["amount"] for t in gf_data)
-        members_count = supabase.table("users").select("id", count="exact").eq("role", "client").execute().count or 0
-        return accounts_count, total_equity, gf_balance, members_count
-    except Exception:
-        return 0, 0, 0, 0
-
-@st.cache_data(ttl=300)
-def get_gold_price():
-    try:
-        t = yf.Ticker("GC=F")
-        info = t.info
-        price = (
-            info.get('regularMarketPrice') or
-            info.get('regularMarketPreviousClose') or
-            info.get('previousClose') or
-            info.get('currentPrice')
-        )
-        ch = info.get('regularMarketChangePercent') or 0.0
-        if price is None:
-            hist = t.history(period="2d")
-            if not hist.empty:
-                price = hist['Close'][-1]
-                prev = hist['Close'][-2] if len(hist) > 1 else price
-                ch = ((price - prev) / prev * 100) if prev else 0.0
-        return round(price, 1) if price else None, round(ch, 2)
-    except Exception:
-        return None, 0.0
-
 # ────────────────────────────────────────────────
 # LANGUAGE SUPPORT
 # ────────────────────────────────────────────────
@@ -214,40 +181,75 @@ st.markdown("<p style='text-align:center; font-size:1.2rem;'>Mark Jeff Blando 
 # ────────────────────────────────────────────────
 # REALTIME STATS
 # ────────────────────────────────────────────────
-accounts_count, total_equity, gf_balance, members_count = get_realtime_stats()
-stat_cols = st.columns(4)
-with stat_cols[0]: st.metric("Active Accounts", accounts_count)
-with stat_cols[1]: st.metric("Total Equity", f"${total_equity:,.0f}")
-with stat_cols[2]: st.metric("Growth Fund", f"${gf_balance:,.0f}")
-with stat_cols[3]: st.metric("Members", members_count)
+# Process-wide snapshot (utils/public_stats.py) — never waits on the database.
+# Cold server: placeholders + a 2s fragment poll until the first refresh lands.
+def render_public_stats():
+    stats, _ = get_public_stats()
+    if stats is not None and st.session_state.get("public_stats_pending"):
+        st.session_state.public_stats_pending = False
+        st.rerun()
+    stat_cols = st.columns(4)
+    with stat_cols[0]: st.metric("Active Accounts", stats["accounts_count"] if stats else "—")
+    with stat_cols[1]: st.metric("Total Equity", f"${stats['total_equity']:,.0f}" if stats else "—")
+    with stat_cols[2]: st.metric("Growth Fund", f"${stats['gf_balance']:,.0f}" if stats else "—")
+    with stat_cols[3]: st.metric("Members", stats["members_count"] if stats else "—")
+
+st.session_state.public_stats_pending = get_public_stats()[0] is None
+if st.session_state.public_stats_pending:
+    st.fragment(run_every=2)(render_public_stats)()
+else:
+    render_public_stats()
 
 # ────────────────────────────────────────────────
 # LIVE GOLD PRICE
 # ────────────────────────────────────────────────
-price, change = get_gold_price()
-if price:
-    st.markdown(f"""
-    <div style="text-align:center; font-size: clamp(3rem,9vw,4.5rem); font-weight:800; color:#ffd700; text-shadow:0 0 24px #00ffaa40; margin:2.2rem 0 0.8rem;">
-        ${price:,.1f}
-    </div>
-    <p style="text-align:center; font-size:1.55rem; opacity:0.95;">
-        <span style="color:{'#00ffaa' if change >=0 else '#ff5555'}; font-weight:700; font-size:1.65rem;">{change:+.2f}%</span>
-         • Live Gold (XAU/USD) • GC=F Futures
-    </p>
-    """, unsafe_allow_html=True)
-else:
-    st.markdown("<p style='text-align:center; color:#aaaaaa; font-size:1.8rem;'>Gold Price (Loading or Market Closed...)</p>", unsafe_allow_html=True)
+# Background feed (utils/market_data.py) — memory read lang, never waits on Yahoo
+@st.fragment(run_every=60)
+def render_gold_price():
+    price, change = get_gold_quote()
+    if price:
+        st.markdown(f"""
+        <div style="text-align:center; font-size: clamp(3rem,9vw,4.5rem); font-weight:800; color:#ffd700; text-shadow:0 0 24px #00ffaa40; margin:2.2rem 0 0.8rem;">
+            ${price:,.1f}
+        </div>
+        <p style="text-align:center; font-size:1.55rem; opacity:0.95;">
+            <span style="color:{'#00ffaa' if change >=0 else '#ff5555'}; font-weight:700; font-size:1.65rem;">{change:+.2f}%</span>
+             • Live Gold (XAU/USD) • GC=F Futures
+        </p>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown("<p style='text-align:center; color:#aaaaaa; font-size:1.8rem;'>Gold Price (Loading or Market Closed...)</p>", unsafe_allow_html=True)
+
+render_gold_price()
 
 # ────────────────────────────────────────────────
-# TRADINGVIEW MINI CHART
+# GOLD CHART (5m candles from the local market-data store)
 # ────────────────────────────────────────────────
-st.components.v1.html("""
-<div class="tradingview-widget-container" style="width:100%; height:340px; min-height:220px; max-height:380px; margin:1.8rem auto 3rem; border-radius:14px; overflow:hidden; box-shadow:0 8px 28px rgba(0,0,0,0.5); background:rgba(13,17,23,0.6);">
-  <div class="tradingview-widget-container__widget"></div>
-  <script type="module" src="https://widgets.tradingview-widget.com/w/en/tv-mini-chart.js" async></script>
-  <tv-mini-chart symbol="OANDA:XAUUSD" color-theme="dark" locale="en" height="100%" width="100%"></tv-mini-chart>
-</div>
-""", height=420)
+gold_bars = get_gold_bars(limit=576)  # ~2 days
+if gold_bars:
+    renderLightweightCharts([{
+        "chart": {
+            "height": 340,
+            "layout": {"background": {"type": "solid", "color": "rgba(13,17,23,0.6)"}, "textColor": "#d1d4dc"},
+            "grid": {"vertLines": {"color": "rgba(255,255,255,0.04)"}, "horzLines": {"color": "rgba(255,255,255,0.04)"}},
+            "timeScale": {"timeVisible": True, "secondsVisible": False},
+        },
+        "series": [{
+            "type": "Candlestick",
+            "data": gold_bars,
+            "options": {"upColor": "#00ffaa", "downColor": "#ff5555", "borderVisible": False,
+                        "wickUpColor": "#00ffaa", "wickDownColor": "#ff5555"},
+        }],
+    }], key="gold_chart")
+else:
+    # Feed still warming up → TradingView mini chart
+    st.components.v1.html("""
+    <div class="tradingview-widget-container" style="width:100%; height:340px; min-height:220px; max-height:380px; margin:1.8rem auto 3rem; border-radius:14px; overflow:hidden; box-shadow:0 8px 28px rgba(0,0,0,0.5); background:rgba(13,17,23,0.6);">
+      <div class="tradingview-widget-container__widget"></div>
+      <script type="module" src="https://widgets.tradingview-widget.com/w/en/tv-mini-chart.js" async></script>
+      <tv-mini-chart symbol="OANDA:XAUUSD" color-theme="dark" locale="en" height="100%" width="100%"></tv-mini-chart>
+    </div>
+    """, height=420)
 
 # ────────────────────────────────────────────────
 # BACKTEST VIDEOS – TABBED MODE (1-Year & 3-Year)
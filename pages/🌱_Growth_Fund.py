@@ -10,6 +10,8 @@ from datetime import date, timedelta
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.query_cache import cached_query, invalidate
+from utils.gf_ledger import fetch_gf_ledger, fetch_month_transactions
 
 render_sidebar()
 require_auth(min_role="client")  # clients can view, admin/owner can transact
@@ -47,58 +49,59 @@ st.markdown("**Empire reinvestment engine** • 100% automatic inflows from prof
 current_role = st.session_state.get("role", "guest").lower()
 
 # ─── ULTRA-REALTIME DATA FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing Growth Fund realtime...")
+# Checkpoint + recent delta (utils/gf_ledger.py) — cost = this month's transactions only
+@cached_query("growth_fund_transactions", "ftmo_accounts", ttl=10, show_spinner="Syncing Growth Fund realtime...")
 def fetch_gf_full_data():
     try:
-        # Instant balance from MV
-        gf_resp = supabase.table("mv_growth_fund_balance").select("balance").single().execute()
-        gf_balance = gf_resp.data["balance"] if gf_resp.data else 0.0
-
-        # Transactions history
-        trans = supabase.table("growth_fund_transactions").select("*").order("date", desc=True).execute().data or []
-
-        # Auto inflows sources
-        profits = supabase.table("profits").select("id, account_id, record_date, growth_fund_add").gt("growth_fund_add", 0).execute().data or []
-        accounts = supabase.table("ftmo_accounts").select("id, name").execute().data or []
-        account_map = {a["id"]: a["name"] for a in accounts}
-
-        auto_sources = {}
-        for p in profits:
-            acc_name = account_map.get(p["account_id"], "Unknown")
-            key = f"{acc_name} ({p['record_date']})"
-            auto_sources[key] = auto_sources.get(key, 0) + p["growth_fund_add"]
-
-        # Manual sources / outflows
-        manual_sources = {}
-        for t in trans:
-            if t["type"] == "Out" or t.get("account_source") == "Manual" or not t.get("description", "").startswith("Auto"):
-                key = t.get("description") or t.get("account_source") or ("Outflow" if t["type"] == "Out" else "Manual In")
-                amount = -t["amount"] if t["type"] == "Out" else t["amount"]
-                manual_sources[key] = manual_sources.get(key, 0) + amount
+        ledger = fetch_gf_ledger()
 
         # Empire stats for projections
         empire = supabase.table("mv_empire_summary").select("total_accounts").single().execute()
         total_accounts = empire.data["total_accounts"] if empire.data else 0
 
-        return trans, gf_balance, auto_sources, manual_sources, total_accounts
+        return ledger, total_accounts
     except Exception as e:
         st.error(f"Growth Fund sync error: {str(e)}")
-        return [], 0.0, {}, {}, 0
+        return {"balance": 0.0, "checkpoints": [], "recent": [], "auto_sources": {}, "manual_sources": {}, "curve": []}, 0
 
-transactions, gf_balance, auto_sources, manual_sources, total_accounts = fetch_gf_full_data()
+@cached_query("growth_fund_transactions", ttl=60)
+def fetch_closed_month(month):
+    try:
+        return fetch_month_transactions(month)
+    except Exception as e:
+        st.error(f"Failed to load {str(month)[:7]}: {str(e)}")
+        return []
+
+ledger, total_accounts = fetch_gf_full_data()
+gf_balance = ledger["balance"]
+auto_sources = ledger["auto_sources"]
+manual_sources = ledger["manual_sources"]
+transactions = ledger["recent"]
+checkpoints = ledger["checkpoints"]
 
 # ─── REFRESH BUTTON ───
 if st.button("🔄 Refresh Growth Fund Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_gf_full_data.clear()
     st.rerun()
 
 # ─── KEY METRICS GRID ───
 cols = st.columns(4)
-cols[0].metric("Current Growth Fund", f"${gf_balance:,.0f}", help="Realtime from materialized view")
+cols[0].metric("Current Growth Fund", f"${gf_balance:,.0f}", help="Last monthly checkpoint + transactions since")
 cols[1].metric("Total Auto Inflows", f"${sum(auto_sources.values()):,.0f}")
 cols[2].metric("Total Manual In", f"${sum(v for v in manual_sources.values() if v > 0):,.0f}")
 cols[3].metric("Total Outflows", f"${sum(abs(v) for v in manual_sources.values() if v < 0):,.0f}")
 
+# ─── BALANCE HISTORY ───
+if ledger["curve"]:
+    curve_df = pd.DataFrame(ledger["curve"])
+    fig_hist = go.Figure(go.Scatter(
+        x=curve_df["date"], y=curve_df["balance"], mode="lines",
+        line=dict(color=accent_primary, width=3, shape="hv"), name="Balance"
+    ))
+    fig_hist.update_layout(height=360, title="Growth Fund Balance (monthly closings + this month)",
+                           margin=dict(l=0, r=0, t=40, b=20), yaxis_title="USD")
+    st.plotly_chart(fig_hist, use_container_width=True)
+
 # ─── SOURCE TREE ───
 st.subheader("🌳 All Inflow & Outflow Sources (Realtime)")
 all_sources = {**auto_sources, **manual_sources}
@@ -156,15 +159,14 @@ if current_role in ["owner", "admin"]:
                     }).execute()
                     st.success("Manual transaction recorded • Growth Fund updated realtime!")
                     st.balloons()
-                    st.cache_data.clear()
+                    invalidate("growth_fund_transactions")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Failed to record: {str(e)}")
 
 # ─── TRANSACTION HISTORY ───
-st.subheader("📜 Complete Transaction History")
-if transactions:
-    df = pd.DataFrame(transactions)
+def render_transactions(rows):
+    df = pd.DataFrame(rows)
     df["Amount Display"] = df.apply(lambda r: f"+${r['amount']:,.0f}" if r["type"] == "In" else f"-${r['amount']:,.0f}", axis=1)
     df["Type Display"] = df["type"].map({"In": "✅ In", "Out": "❌ Out"})
     df["Source"] = df.apply(lambda r: r["account_source"] if r["account_source"] != "Manual" else (r["description"] or "Manual"), axis=1)
@@ -172,8 +174,34 @@ if transactions:
     display_cols = ["date", "Type Display", "Amount Display", "Source", "recorded_by"]
     rename_map = {"date": "Date", "Type Display": "Type", "Amount Display": "Amount", "recorded_by": "By"}
     st.dataframe(df[display_cols].rename(columns=rename_map), use_container_width=True, hide_index=True)
-else:
+
+st.subheader("📜 Transaction History")
+if transactions:
+    st.caption(f"Since last monthly close • {len(transactions):,} transaction(s)")
+    render_transactions(transactions)
+elif not checkpoints:
     st.info("No transactions recorded yet • Auto-inflows begin with profit sharing")
+else:
+    st.caption("No transactions since the last monthly close")
+
+if checkpoints:
+    with st.expander("🗓️ Closed Months", expanded=False):
+        closed_df = pd.DataFrame(checkpoints)[["month", "total_in", "total_out", "closing_balance", "tx_count"]]
+        st.dataframe(
+            closed_df.iloc[::-1].rename(columns={
+                "month": "Month", "total_in": "In", "total_out": "Out",
+                "closing_balance": "Closing Balance", "tx_count": "Transactions"
+            }),
+            use_container_width=True, hide_index=True
+        )
+        month_pick = st.selectbox("Browse a closed month", [c["month"] for c in reversed(checkpoints)],
+                                  format_func=lambda m: str(m)[:7], index=None, placeholder="Select month...")
+        if month_pick:
+            month_rows = fetch_closed_month(month_pick)
+            if month_rows:
+                render_transactions(month_rows)
+            else:
+                st.caption("No transactions that month")
 
 # ─── PROJECTIONS ───
 st.subheader("🔮 Growth Fund Scaling Projections")
@@ -10,6 +10,9 @@ from datetime import datetime
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.user_directory import resolve_user_names, contributor_user_ids
+from utils.rollups import fetch_profit_rollups
+from utils.query_cache import cached_query
 
 render_sidebar()
 require_auth(min_role="client")
@@ -38,7 +41,7 @@ st.header("Elite Empire Command Center 🚀")
 st.markdown("**Realtime, fully automatic empire overview** • Every transaction syncs instantly • Trees update live • Empire scales itself")
 
 # ─── OPTIMIZED DATA FETCH ───
-@st.cache_data(ttl=30, show_spinner="Loading empire overview...")
+@cached_query("ftmo_accounts", "users", "profits", "profit_distributions", "growth_fund_transactions", ttl=30, show_spinner="Loading empire overview...")
 def fetch_empire_summary():
     try:
         # Fast totals from materialized views (fallback gracefully)
@@ -57,28 +60,17 @@ def fetch_empire_summary():
 
         # Lightweight raw data
         accounts = supabase.table("ftmo_accounts").select("*").execute().data or []
-        profits  = supabase.table("profits").select("gross_profit").execute().data or []
-        distributions = supabase.table("profit_distributions").select("share_amount, participant_name, is_growth_fund").execute().data or []
 
-        total_gross      = sum(p.get("gross_profit", 0) for p in profits)
-        total_distributed = sum(d.get("share_amount", 0) for d in distributions if not d.get("is_growth_fund", False))
-
-        participant_shares = {}
-        for d in distributions:
-            if not d.get("is_growth_fund", False):
-                name = d.get("participant_name", "Unknown")
-                participant_shares[name] = participant_shares.get(name, 0) + d.get("share_amount", 0)
-
-        # Resolve contributor names
-        all_users = supabase.table("users").select("id, full_name").execute().data or []
-        user_map = {u["id"]: u["full_name"] for u in all_users}
+        # Pre-grouped totals (server-side rollups, hindi na buong ledger)
+        rollups = fetch_profit_rollups()
+        total_gross        = rollups["total_gross"]
+        total_distributed  = rollups["total_distributed"]
+        participant_shares = rollups["participant_shares"]
 
         total_funded_php = 0
         for acc in accounts:
             contrib = acc.get("contributors_v2") or acc.get("contributors", [])
             for c in contrib:
-                user_id = c.get("user_id") or c.get("id")
-                name = user_map.get(user_id, c.get("display_name") or c.get("name", "Anonymous"))
                 funded = c.get("units", 0) * (c.get("php_per_unit", 0) or 0)
                 total_funded_php += funded
 
@@ -97,6 +89,15 @@ def fetch_empire_summary():
     total_client_balances, participant_shares, total_funded_php
 ) = fetch_empire_summary()
 
+# Resolve ALL contributor names once per render (one bulk users query, cached process-wide)
+user_map = resolve_user_names(contributor_user_ids(accounts))
+
+def contributor_name(c):
+    user_id = c.get("user_id") or c.get("id")
+    if user_id:
+        return user_map.get(str(user_id), "Anonymous")
+    return c.get("display_name") or c.get("name", "Anonymous")
+
 # ─── METRICS GRID ───
 st.markdown(f"""
 <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(260px, 1fr)); gap: 1.2rem; margin: 2rem 0;">
@@ -181,14 +182,7 @@ with tab_contrib:
     for acc in accounts:
         contrib = acc.get("contributors_v2") or acc.get("contributors", [])
         for c in contrib:
-            user_id = c.get("user_id") or c.get("id")
-            name = "Anonymous"
-            if user_id:
-                user_resp = supabase.table("users").select("full_name").eq("id", user_id).single().execute()
-                if user_resp.data:
-                    name = user_resp.data.get("full_name", "Anonymous")
-            else:
-                name = c.get("display_name") or c.get("name", "Anonymous")
+            name = contributor_name(c)
             funded = c.get("units", 0) * (c.get("php_per_unit", 0) or 0)
             funded_by[name] = funded_by.get(name, 0) + funded
 
@@ -250,15 +244,7 @@ if accounts:
                 contrib_labels = ["Funded"]
                 contrib_vals = []
                 for c in contrib:
-                    user_id = c.get("user_id") or c.get("id")
-                    name = "Anonymous"
-                    if user_id:
-                        user_resp = supabase.table("users").select("full_name").eq("id", user_id).single().execute()
-                        if user_resp.data:
-                            name = user_resp.data.get("full_name", "Anonymous")
-                    else:
-                        name = c.get("display_name") or c.get("name", "Anonymous")
-                    contrib_labels.append(name)
+                    contrib_labels.append(contributor_name(c))
                     contrib_vals.append(c.get("units", 0) * (c.get("php_per_unit", 0) or 0))
                 fig_c = go.Figure(go.Sankey(
                     node=dict(pad=15, thickness=20, label=contrib_labels),
@@ -275,7 +261,7 @@ else:
 st.subheader("Latest Updates")
 
 # Latest Announcements
-@st.cache_data(ttl=60)
+@cached_query("announcements", ttl=60)
 def get_latest_announcements(limit=3):
     try:
         return supabase.table("announcements") \
@@ -299,7 +285,7 @@ else:
     st.info("No recent announcements yet")
 
 # Latest Testimonials
-@st.cache_data(ttl=60)
+@cached_query("testimonials", ttl=60)
 def get_latest_testimonials(limit=3):
     try:
         return supabase.table("testimonials") \
@@ -326,10 +312,9 @@ else:
     st.info("No approved testimonials yet")
 
 # Unread Messages Preview
-@st.cache_data(ttl=30)
-def get_unread_messages_preview():
+@cached_query("messages", ttl=30)
+def get_unread_messages_preview(my_username: str):
     try:
-        my_username = st.session_state.get("username", "")
         unread_count = supabase.table("messages") \
             .select("count", count="exact") \
             .eq("to_client", my_username) \
@@ -346,7 +331,7 @@ def get_unread_messages_preview():
     except:
         return 0, []
 
-unread_count, latest_msgs = get_unread_messages_preview()
+unread_count, latest_msgs = get_unread_messages_preview(st.session_state.get("username", ""))
 if unread_count > 0:
     st.markdown(f"#### 💬 You have **{unread_count} message{'s' if unread_count > 1 else ''}**")
     for m in latest_msgs:
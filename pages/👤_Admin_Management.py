@@ -10,6 +10,8 @@ import bcrypt
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.user_directory import invalidate_user_names
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth(min_role="owner")  # strict — owner only
@@ -50,7 +52,7 @@ if current_role != "owner":
     st.stop()
 
 # ─── FULL REALTIME CACHE (30s TTL) ───
-@st.cache_data(ttl=30, show_spinner="Syncing empire team...")
+@cached_query("users", ttl=30, show_spinner="Syncing empire team...")
 def fetch_users_full():
     try:
         users = supabase.table("users").select("*").order("created_at", desc=True).execute().data or []
@@ -62,7 +64,7 @@ def fetch_users_full():
 users = fetch_users_full()
 
 if st.button("🔄 Refresh Team Management Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_users_full.clear()
     st.rerun()
 
 st.caption("🔄 Team auto-refreshes every 30s • All changes instantly sync empire-wide")
@@ -122,9 +124,10 @@ with st.form("add_user_form", clear_on_submit=True):
                         "address": address.strip() or None
                     }
                     supabase.table("users").insert(insert_data).execute()
+                    invalidate_user_names()
                     st.success(f"**{full_name.strip()}** registered & synced!")
                     st.balloons()
-                    st.cache_data.clear()
+                    invalidate("users")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Registration failed: {str(e)}")
@@ -205,13 +208,13 @@ if team:
                         supabase.table("users").update({"qr_token": new_token}).eq("id", u["id"]).execute()
                         st.success("New QR token generated")
                         st.balloons()
-                        st.cache_data.clear()
+                        invalidate("users")
                         st.rerun()
                 with col_revoke:
                     if st.button("❌ Revoke QR Code", key=f"revoke_{u['id']}", type="secondary"):
                         supabase.table("users").update({"qr_token": None}).eq("id", u["id"]).execute()
                         st.success("QR token revoked")
-                        st.cache_data.clear()
+                        invalidate("users")
                         st.rerun()
             else:
                 st.info("No QR login code yet")
@@ -220,7 +223,7 @@ if team:
                     supabase.table("users").update({"qr_token": new_token}).eq("id", u["id"]).execute()
                     st.success("QR code generated • Refresh to view")
                     st.balloons()
-                    st.cache_data.clear()
+                    invalidate("users")
                     st.rerun()
 
             # ─── Actions ───
@@ -236,8 +239,9 @@ if team:
                 if st.button("🗑️ Delete Member", key=f"del_confirm_{u['id']}", type="secondary"):
                     try:
                         supabase.table("users").delete().eq("id", u["id"]).execute()
+                        invalidate_user_names([u["id"]])
                         st.success(f"**{u['full_name']}** removed")
-                        st.cache_data.clear()
+                        invalidate("users")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Delete failed: {str(e)}")
@@ -286,12 +290,13 @@ if team:
                                         hashed_new = bcrypt.hashpw(new_pwd.encode(), bcrypt.gensalt()).decode()
                                         update_data["password"] = hashed_new
                                     supabase.table("users").update(update_data).eq("id", u["id"]).execute()
+                                    invalidate_user_names([u["id"]])
                                     st.success("Member updated!")
                                     if "edit_user_id" in st.session_state:
                                         del st.session_state.edit_user_id
                                     if "edit_user_data" in st.session_state:
                                         del st.session_state.edit_user_data
-                                    st.cache_data.clear()
+                                    invalidate("users")
                                     st.rerun()
                                 except Exception as e:
                                     st.error(f"Update failed: {str(e)}")
@@ -312,7 +317,7 @@ st.markdown("---")
 st.subheader("🏅 Manage Client Badges")
 st.markdown("Award or revoke badges • Public badges appear in **Empire Heroes** teaser")
 
-@st.cache_data(ttl=300)
+@cached_query("badge_definitions", ttl=300)
 def get_badge_definitions():
     try:
         resp = supabase.table("badge_definitions").select("badge_name, description, icon_emoji, is_special, max_slots").execute()
@@ -328,7 +333,7 @@ def get_badge_definitions():
 badges_dict = get_badge_definitions()
 badge_options = [""] + sorted(badges_dict.keys())
 
-@st.cache_data(ttl=60)
+@cached_query("users", ttl=60)
 def get_clients_for_badges():
     try:
         return supabase.table("users").select("id, username, full_name, email, role").eq("role", "client").execute().data or []
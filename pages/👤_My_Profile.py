@@ -4,7 +4,6 @@ import plotly.graph_objects as go
 from datetime import datetime
 import qrcode
 from io import BytesIO
-import requests
 import uuid
 
 # ────────────────────────────────────────────────
@@ -13,7 +12,9 @@ import uuid
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.http_transport import get_http_client
 from utils.helpers import upload_to_supabase, log_action
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth(min_role="client")
@@ -65,8 +66,8 @@ if "navigate_to" not in st.session_state:
     st.session_state.navigate_to = None
 
 # ─── FETCH CURRENT USER DATA ───
-@st.cache_data(ttl=60)
-def fetch_user_data():
+@cached_query("users", ttl=60)
+def fetch_user_data(my_username: str):
     try:
         resp = supabase.table("users").select("*").eq("username", my_username).maybe_single().execute()
         return resp.data or {}
@@ -74,7 +75,7 @@ def fetch_user_data():
         st.error(f"User fetch error: {str(e)}")
         return {}
 
-user = fetch_user_data()
+user = fetch_user_data(my_username)
 
 # ─── SAFETY CHECK: If user not found in DB ───
 if not user:
@@ -178,6 +179,7 @@ if uploaded_file is not None:
                     supabase.table("users").update({
                         "avatar_url": file_url
                     }).eq("username", my_username).execute()
+                    invalidate("users")
 
                     log_action("Profile Picture Updated", f"User: {my_name} | Path: {storage_path}")
 
@@ -296,12 +298,14 @@ if role == "client":
             if st.button("🔄 Regenerate QR Code", type="primary", use_container_width=True):
                 new_token = str(uuid.uuid4())
                 supabase.table("users").update({"qr_token": new_token}).eq("username", my_username).execute()
+                invalidate("users")
                 log_action("QR Regenerated", f"User: {my_name}")
                 st.success("New QR created! Refreshing...")
                 st.rerun()
         with col2:
             if st.button("❌ Revoke QR Code", type="secondary", use_container_width=True):
                 supabase.table("users").update({"qr_token": None}).eq("username", my_username).execute()
+                invalidate("users")
                 log_action("QR Revoked", f"User: {my_name}")
                 st.success("QR revoked • Login code disabled")
                 st.rerun()
@@ -309,13 +313,12 @@ if role == "client":
         st.info("No Quick Login QR yet. Contact admin/owner to generate one.")
 
     # Shared Accounts + Withdrawals + Proofs
-    @st.cache_data(ttl=30)
-    def fetch_client_data():
+    @cached_query("ftmo_accounts", "withdrawals", "client_files", ttl=30)
+    def fetch_client_data(my_name: str, uid: str):
         try:
             accs_resp = supabase.table("ftmo_accounts").select("*").execute()
             accounts = accs_resp.data or []
             my_accs = []
-            uid = str(user.get("id", ""))
             for a in accounts:
                 p_v2 = a.get("participants_v2", []) or []
                 p_old = a.get("participants", []) or []
@@ -333,7 +336,7 @@ if role == "client":
             st.error(f"Client data fetch error: {str(e)}")
             return [], [], []
 
-    my_accounts, my_withdrawals, my_proofs = fetch_client_data()
+    my_accounts, my_withdrawals, my_proofs = fetch_client_data(my_name, str(user.get("id", "")))
 
     st.subheader(f"Your Shared Accounts ({len(my_accounts)} active)")
     if my_accounts:
@@ -415,6 +418,7 @@ if role == "client":
                                     "status": "Pending",
                                     "date_requested": datetime.now().date().isoformat()
                                 }).execute()
+                                invalidate("withdrawals", "client_files")
                                 st.success("Request submitted! Proof stored permanently.")
                                 st.rerun()
                             except Exception as e:
@@ -438,7 +442,7 @@ if role == "client":
                     else:
                         st.markdown(f"**{p['original_name']}** • {p.get('upload_date','—')}")
                         try:
-                            r = requests.get(file_url, timeout=10)
+                            r = get_http_client().get(file_url)
                             if r.status_code == 200:
                                 st.download_button("⬇ Download", r.content, p["original_name"], use_container_width=True, key=f"dl_{p['id']}")
                         except:
@@ -451,7 +455,7 @@ elif role in ("admin", "owner"):
 
     st.subheader("Empire Overview & Quick Controls")
 
-    @st.cache_data(ttl=30)
+    @cached_query("ftmo_accounts", "users", "profits", "profit_distributions", "growth_fund_transactions", ttl=30)
     def fetch_empire_overview():
         try:
             gf = supabase.table("mv_growth_fund_balance").select("balance").execute().data
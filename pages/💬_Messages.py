@@ -8,7 +8,11 @@ from datetime import datetime
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
-from utils.helpers import upload_to_supabase, log_action
+from utils.helpers import log_action
+from utils.uploads import upload_many
+from utils.query_cache import cached_query, invalidate
+from utils.conversations import get_conversation
+from utils.change_feed import watch_tables
 
 render_sidebar()
 require_auth(min_role="client")  # everyone can message, admin/owner has multi-client view
@@ -47,43 +51,29 @@ current_role = st.session_state.get("role", "guest").lower()
 my_name = st.session_state.get("full_name", "User")
 my_username = st.session_state.get("username", "")
 
-# ─── REALTIME FETCH (6s TTL for chat feel) ───
-@st.cache_data(ttl=6, show_spinner="Syncing messages...")
-def fetch_messages_data():
+# ─── CLIENT LIST (admin/owner picker only) ───
+@cached_query("users", ttl=60)
+def fetch_client_names():
     try:
-        # Get all users for name mapping (if needed later)
-        users = supabase.table("users").select("id, full_name, username, role").execute().data or []
-        
-        # Get all messages (oldest first for chat order)
-        messages = supabase.table("messages").select(
-            "id, message, timestamp, from_admin, from_client, to_client"
-        ).order("timestamp", desc=False).execute().data or []
-        
-        return users, messages
+        users = supabase.table("users").select("full_name").eq("role", "client").execute().data or []
+        return sorted(u["full_name"] for u in users if u.get("full_name"))
     except Exception as e:
-        st.error(f"Messages sync error: {str(e)}")
-        return [], []
+        st.error(f"Client list error: {str(e)}")
+        return []
 
-all_users, all_messages = fetch_messages_data()
-
-if st.button("🔄 Refresh Messages", type="secondary", use_container_width=True):
-    st.cache_data.clear()
-    st.rerun()
-
-# ─── CONVERSATION FILTERING ───
-convo = []
+# ─── CONVERSATION (server-side filtered, per-session buffer) ───
 partner_name = "KMFX Admin"
 
 if current_role in ["owner", "admin"]:
     # Admin/Owner selects client to chat with
-    client_names = [u["full_name"] for u in all_users if u["role"] == "client"]
+    client_names = fetch_client_names()
     if not client_names:
         st.info("No clients yet • Messaging activates once team members are added")
         st.stop()
 
     client_options = {
         f"{name}": name
-        for name in sorted(client_names)
+        for name in client_names
     }
 
     selected_display = st.selectbox(
@@ -94,29 +84,38 @@ if current_role in ["owner", "admin"]:
     partner_name = client_options[selected_display]
     st.info(f"**Chatting with:** {partner_name}")
 
-    # Filter messages: admin ↔ selected client
-    convo = [
-        m for m in all_messages
-        if (m.get("from_admin") == my_name and m.get("to_client") == partner_name) or
-           (m.get("from_client") == partner_name and m.get("to_client") is None) or
-           (m.get("from_client") == partner_name and m.get("from_admin") == my_name)
-    ]
+    # admin ↔ selected client lang
+    conversation = get_conversation(partner_name, admin_name=my_name)
 else:
     # Client view — only messages with admin
     st.info(f"**Private channel with KMFX Admin** • Updates on profits, withdrawals, EA, etc.")
-    convo = [
-        m for m in all_messages
-        if (m.get("from_client") == my_name) or
-           (m.get("to_client") == my_name) or
-           (m.get("from_admin") is not None and m.get("to_client") == my_name)
-    ]
+    conversation = get_conversation(my_name)
+
+# Rerun within ~1s of a new message (Realtime push) — no polling while idle
+feed = watch_tables("messages", key="messages")
+
+force_sync = st.button("🔄 Refresh Messages", type="secondary", use_container_width=True)
+try:
+    # only rows after the since cursor, and only when the feed says messages changed
+    conversation.sync(force=force_sync, version=feed.version("messages") if feed.live else None)
+except Exception as e:
+    st.error(f"Messages sync error: {str(e)}")
+
+if conversation.has_older and conversation.messages:
+    if st.button("⬆️ Load Older Messages", use_container_width=True):
+        try:
+            conversation.load_older()
+        except Exception as e:
+            st.error(f"Could not load older messages: {str(e)}")
+
+convo = conversation.messages
 
 # ─── CHAT DISPLAY ───
 chat_container = st.container(height=500, border=True)
 
 with chat_container:
     if convo:
-        search_term = st.text_input("Search messages", "", placeholder="Type to filter...")
+        search_term = st.text_input("Search messages", "", placeholder="Type to filter loaded messages...")
         display_msgs = convo
         if search_term:
             s = search_term.lower()
@@ -203,19 +202,14 @@ with st.form("send_message_form", clear_on_submit=True):
                     
                     # Handle attachments (if any)
                     if attached_files:
-                        for file in attached_files:
-                            try:
-                                url, _ = upload_to_supabase(
-                                    file=file,
-                                    bucket="client_files",
-                                    folder="messages"
-                                )
-                                if file.type.startswith("image/"):
-                                    content_parts.append(f"![{file.name}]({url})")
-                                else:
-                                    content_parts.append(f"[{file.name}]({url})")
-                            except Exception as upload_err:
-                                st.warning(f"Upload failed for {file.name}: {upload_err}")
+                        # Parallel uploads (order preserved for the message body)
+                        for r in upload_many(attached_files, bucket="client_files", folder="messages"):
+                            if r["error"]:
+                                st.warning(f"Upload failed for {r['name']}: {r['error']}")
+                            elif (r["file"].type or "").startswith("image/"):
+                                content_parts.append(f"![{r['name']}]({r['url']})")
+                            else:
+                                content_parts.append(f"[{r['name']}]({r['url']})")
 
                     final_content = "\n\n".join(content_parts) or "📎 Attachment only"
 
@@ -234,10 +228,11 @@ with st.form("send_message_form", clear_on_submit=True):
                         # insert_row["to_client"] = "KMFX Admin"  # optional
 
                     supabase.table("messages").insert(insert_row).execute()
+                    conversation.sync(force=True)
 
                     st.success("Message sent!")
                     st.balloons()
-                    st.cache_data.clear()
+                    invalidate("messages")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Failed to send: {str(e)}")
@@ -16,6 +16,9 @@ from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
 from utils.helpers import log_action
+from utils.user_directory import prime_user_names, resolve_user_names
+from utils.query_cache import cached_query, invalidate
+from utils.rollups import request_rollup_refresh
 
 render_sidebar()
 require_auth(min_role="client")  # All roles can access, content role-specific
@@ -54,8 +57,8 @@ current_role = st.session_state.get("role", "guest").lower()
 my_username = st.session_state.get("username", "")
 
 # ─── FETCH CURRENT USER DATA (for UUID) ───
-@st.cache_data(ttl=60)
-def fetch_user_data():
+@cached_query("users", ttl=60)
+def fetch_user_data(my_username: str):
     try:
         resp = supabase.table("users").select("id, full_name, email, balance").eq("username", my_username).maybe_single().execute()
         return resp.data or {}
@@ -63,30 +66,30 @@ def fetch_user_data():
         st.error(f"User fetch error: {str(e)}")
         return {}
 
-user = fetch_user_data()
+user = fetch_user_data(my_username)
 
 if not user:
     st.error("User profile not found. Contact support.")
     st.stop()
 
 # ─── DATA FETCH ───
-@st.cache_data(ttl=60, show_spinner="Syncing accounts & users...")
+@cached_query("ftmo_accounts", "users", ttl=60, show_spinner="Syncing accounts & users...")
 def fetch_profit_data():
     try:
         accounts = supabase.table("ftmo_accounts").select(
             "id, name, current_phase, current_equity, "
             "participants_v2, contributors_v2, contributor_share_pct"
         ).execute().data or []
-        users_list = supabase.table("users").select("id, full_name, email, balance").execute().data or []
-        uid_to_display = {str(u["id"]): u["full_name"] for u in users_list}
+        users_list = supabase.table("users").select("id, full_name, email").execute().data or []
+        prime_user_names(users_list)
+        uid_to_display = resolve_user_names(u["id"] for u in users_list)
         uid_to_email = {str(u["id"]): u.get("email") for u in users_list}
-        uid_to_balance = {str(u["id"]): u.get("balance", 0.0) for u in users_list}
-        return accounts, uid_to_display, uid_to_email, uid_to_balance
+        return accounts, uid_to_display, uid_to_email
     except Exception as e:
         st.error(f"Data sync failed: {str(e)}")
-        return [], {}, {}, {}
+        return [], {}, {}
 
-accounts, uid_to_display, uid_to_email, uid_to_balance = fetch_profit_data()
+accounts, uid_to_display, uid_to_email = fetch_profit_data()
 
 if not accounts:
     st.info("No accounts yet • Launch one in FTMO Accounts first")
@@ -102,8 +105,8 @@ if current_role == "client":
         st.error("Cannot load earnings – user ID not found.")
         st.stop()
 
-    @st.cache_data(ttl=30)
-    def fetch_my_earnings():
+    @cached_query("profit_distributions", ttl=30)
+    def fetch_my_earnings(my_user_id):
         try:
             # Use 'timestamp' column (from your schema)
             dists = supabase.table("profit_distributions").select(
@@ -117,7 +120,7 @@ if current_role == "client":
             st.error(f"Earnings fetch error: {str(e)}")
             return [], 0.0, 0.0
 
-    my_dists, total_earned, pending = fetch_my_earnings()
+    my_dists, total_earned, pending = fetch_my_earnings(my_user_id)
 
     cols = st.columns(3)
     cols[0].metric("Total Earned", f"${total_earned:,.2f}")
@@ -278,17 +281,7 @@ elif current_role in ["admin", "owner"]:
                 st.error("Gross profit must be greater than 0")
             else:
                 try:
-                    profit_resp = supabase.table("profits").insert({
-                        "account_id": acc_id,
-                        "gross_profit": gross_profit,
-                        "record_date": str(record_date),
-                        "units_generated": gross_profit / 3000.0 if gross_profit > 0 else 0,
-                        "growth_fund_add": gf_add,
-                        "contributor_share_pct": contributor_share_pct
-                    }).execute()
-                    profit_id = profit_resp.data[0]["id"]
                     distributions = []
-                    balance_updates = []
 
                     if contributor_pool > 0 and total_funded_php > 0:
                         for c in contributors:
@@ -299,7 +292,6 @@ elif current_role in ["admin", "owner"]:
                             share = contributor_pool * (funded / total_funded_php)
                             pro_rata_pct = (funded / total_funded_php) * 100
                             distributions.append({
-                                "profit_id": profit_id,
                                 "participant_name": display,
                                 "participant_user_id": user_id,
                                 "participant_role": "Contributor",
@@ -307,8 +299,6 @@ elif current_role in ["admin", "owner"]:
                                 "share_amount": share,
                                 "is_growth_fund": False
                             })
-                            new_bal = uid_to_balance.get(user_id, 0) + share
-                            balance_updates.append((user_id, new_bal))
 
                     for p in participants:
                         user_id = p.get("user_id")
@@ -316,7 +306,6 @@ elif current_role in ["admin", "owner"]:
                         share = gross_profit * (p["percentage"] / 100)
                         is_gf = "growth fund" in display.lower()
                         distributions.append({
-                            "profit_id": profit_id,
                             "participant_name": display,
                             "participant_user_id": user_id,
                             "participant_role": p.get("role", ""),
@@ -324,25 +313,21 @@ elif current_role in ["admin", "owner"]:
                             "share_amount": share,
                             "is_growth_fund": is_gf
                         })
-                        if user_id and not is_gf:
-                            new_bal = uid_to_balance.get(user_id, 0) + share
-                            balance_updates.append((user_id, new_bal))
-
-                    if distributions:
-                        supabase.table("profit_distributions").insert(distributions).execute()
-
-                    for uid, new_bal in balance_updates:
-                        supabase.table("users").update({"balance": new_bal}).eq("id", uid).execute()
-
-                    if gf_add > 0:
-                        supabase.table("growth_fund_transactions").insert({
-                            "date": str(record_date),
-                            "type": "In",
-                            "amount": gf_add,
-                            "description": f"Auto from {acc_name} profit",
-                            "account_source": acc_name,
-                            "recorded_by": st.session_state.get("full_name", "System")
-                        }).execute()
+
+                    # ONE transactional round-trip: profit + distributions + balance increments + GF
+                    # (see supabase/migrations/20261017000200_distribute_profit.sql)
+                    supabase.rpc("distribute_profit", {
+                        "p_account_id": acc_id,
+                        "p_gross_profit": gross_profit,
+                        "p_record_date": str(record_date),
+                        "p_units_generated": gross_profit / 3000.0 if gross_profit > 0 else 0,
+                        "p_growth_fund_add": gf_add,
+                        "p_contributor_share_pct": contributor_share_pct,
+                        "p_distributions": distributions,
+                        "p_account_source": acc_name,
+                        "p_recorded_by": st.session_state.get("full_name", "System")
+                    }).execute()
+                    request_rollup_refresh()  # rollup views catch up in the background
 
                     # ─── EMAIL ───
                     date_str = record_date.strftime("%B %d, %Y")
@@ -402,7 +387,7 @@ elif current_role in ["admin", "owner"]:
 
                     st.success("Profit recorded & distributed! Balances + Growth Fund updated.")
                     st.balloons()
-                    st.cache_data.clear()
+                    invalidate("profits", "profit_distributions", "users", "growth_fund_transactions")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Operation failed: {str(e)}")
@@ -1,6 +1,5 @@
 # pages/💳_Withdrawals.py
 import streamlit as st
-import requests
 from datetime import date
 
 # ────────────────────────────────────────────────
@@ -9,7 +8,10 @@ from datetime import date
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
-from utils.helpers import upload_to_supabase
+from utils.http_transport import get_http_client
+from utils.uploads import upload_many, insert_file_rows, remove_uploaded
+from utils.query_cache import cached_query, invalidate
+from utils.change_feed import watch_tables
 
 render_sidebar()
 require_auth(min_role="client")  # clients request, admin/owner manage
@@ -46,8 +48,10 @@ st.markdown("**Empire payout engine** • Clients request from earned balances 
 
 current_role = st.session_state.get("role", "guest").lower()
 
-# ─── ULTRA-REALTIME FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing withdrawals & proofs...")
+# ─── REALTIME FETCH (pushed by the change feed; TTL is just a safety net) ───
+feed = watch_tables("withdrawals", "client_files", key="withdrawals")
+
+@cached_query("withdrawals", "users", "client_files", ttl=feed.ttl(10, "withdrawals", "users", "client_files"), show_spinner="Syncing withdrawals & proofs...")
 def fetch_withdrawals_full():
     try:
         withdrawals = supabase.table("withdrawals").select("*").order("date_requested", desc=True).execute().data or []
@@ -64,10 +68,10 @@ def fetch_withdrawals_full():
 withdrawals, user_map, proofs = fetch_withdrawals_full()
 
 if st.button("🔄 Refresh Withdrawals Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_withdrawals_full.clear()
     st.rerun()
 
-st.caption("🔄 Withdrawals auto-refresh every 10s • Proofs permanent & fully visible in Supabase Storage")
+st.caption("🔄 Withdrawals update live via the realtime feed • Proofs permanent & fully visible in Supabase Storage")
 
 # ─── CLIENT VIEW ───
 if current_role == "client":
@@ -84,33 +88,34 @@ if current_role == "client":
                 amount = st.number_input("Amount (USD)", min_value=1.0, max_value=my_balance, step=100.0, format="%.2f")
                 method = st.selectbox("Method", ["USDT", "Bank Transfer", "Wise", "PayPal", "GCash", "Other"])
                 details = st.text_area("Payout Details (Wallet/Address/Bank Info)", placeholder="e.g. USDT: 0x... or Bank: Account #12345")
-                proof = st.file_uploader("Upload Proof * (Permanent)", type=["png","jpg","jpeg","pdf","gif"])
+                proof_files = st.file_uploader("Upload Proof * (Permanent)", type=["png","jpg","jpeg","pdf","gif"], accept_multiple_files=True)
                 submitted = st.form_submit_button("Submit Request", type="primary", use_container_width=True)
 
                 if submitted:
                     if amount > my_balance:
                         st.error("Amount exceeds your balance")
-                    elif not proof:
+                    elif not proof_files:
                         st.error("Proof document is required")
                     else:
                         with st.spinner("Submitting request..."):
+                            results, rows_saved = [], False
                             try:
-                                url, storage_path = upload_to_supabase(  # assuming helper exists
-                                    file=proof,
-                                    bucket="client_files",
-                                    folder="withdrawals"
-                                )
-                                # Save proof permanently
-                                supabase.table("client_files").insert({
-                                    "original_name": proof.name,
-                                    "file_url": url,
-                                    "storage_path": storage_path,
+                                # Parallel proof uploads → one bulk client_files insert
+                                results = upload_many(proof_files, bucket="client_files", folder="withdrawals")
+                                failed = [f"{r['name']}: {r['error']}" for r in results if r["error"]]
+                                if failed:
+                                    raise Exception("Proof upload failed – " + "; ".join(failed))
+                                insert_file_rows("client_files", [{
+                                    "original_name": r["name"],
+                                    "file_url": r["url"],
+                                    "storage_path": r["storage_path"],
                                     "upload_date": date.today().isoformat(),
                                     "sent_by": my_name,
                                     "category": "Withdrawal Proof",
                                     "assigned_client": my_name,
                                     "notes": f"Proof for ${amount:,.2f} withdrawal request"
-                                }).execute()
+                                } for r in results])
+                                rows_saved = True
 
                                 # Create withdrawal request
                                 supabase.table("withdrawals").insert({
@@ -124,9 +129,11 @@ if current_role == "client":
 
                                 st.success("Withdrawal request submitted with permanent proof!")
                                 st.balloons()
-                                st.cache_data.clear()
+                                invalidate("withdrawals", "client_files")
                                 st.rerun()
                             except Exception as e:
+                                if not rows_saved:
+                                    remove_uploaded("client_files", results)  # no client_files row → no orphan objects
                                 st.error(f"Submission failed: {str(e)}")
     else:
         st.info("No available balance yet • Earnings from profits will appear here")
@@ -215,7 +222,7 @@ else:
                                 else:
                                     st.markdown(f"**{p['original_name']}** • {p.get('upload_date', '—')}")
                                     try:
-                                        r = requests.get(file_url, timeout=10)
+                                        r = get_http_client().get(file_url)
                                         if r.status_code == 200:
                                             st.download_button(
                                                 f"Download {p['original_name']}",
@@ -239,7 +246,7 @@ else:
                                     "processed_by": st.session_state.get("full_name", "Admin")
                                 }).eq("id", w["id"]).execute()
                                 st.success("Request approved!")
-                                st.cache_data.clear()
+                                invalidate("withdrawals")
                                 st.rerun()
                             except Exception as e:
                                 st.error(f"Approve failed: {str(e)}")
@@ -252,7 +259,7 @@ else:
                                     "processed_by": st.session_state.get("full_name", "Admin")
                                 }).eq("id", w["id"]).execute()
                                 st.success("Request rejected")
-                                st.cache_data.clear()
+                                invalidate("withdrawals")
                                 st.rerun()
                             except Exception as e:
                                 st.error(f"Reject failed: {str(e)}")
@@ -271,7 +278,7 @@ else:
                             }).eq("id", w["id"]).execute()
                             st.success("Marked as paid • Balance auto-deducted!")
                             st.balloons()
-                            st.cache_data.clear()
+                            invalidate("withdrawals", "users")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Pay failed: {str(e)}")
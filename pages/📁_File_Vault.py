@@ -1,5 +1,4 @@
 import streamlit as st
-import requests
 from datetime import date
 
 # ────────────────────────────────────────────────
@@ -8,6 +7,11 @@ from datetime import date
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.http_transport import get_http_client
+from utils.renditions import schedule_renditions, remove_renditions
+from utils.uploads import upload_many, insert_file_rows, remove_uploaded
+from utils.query_cache import cached_query, invalidate
+from utils.change_feed import watch_tables
 
 render_sidebar()
 require_auth(min_role="client")  # clients can view their files, admin/owner full access
@@ -44,49 +48,14 @@ st.markdown("**Permanent encrypted storage** • All file types supported • Pr
 
 current_role = st.session_state.get("role", "guest").lower()
 
-# ─── UPLOAD HELPER FUNCTION (this fixes the 'upload_to_supabase not defined' error) ───
-def upload_to_supabase(file, bucket: str = "client_files", folder: str = "vault", use_signed_url: bool = False):
-    try:
-        # Reset file pointer and read content
-        file.seek(0)
-        file_bytes = file.read()
-
-        # Create safe filename
-        original_name = file.name
-        safe_name = "".join(c if c.isalnum() or c in "._-" else "_" for c in original_name)
-        storage_path = f"{folder}/{safe_name}" if folder else safe_name
-
-        # Upload to Supabase Storage
-        response = supabase.storage.from_(bucket).upload(
-            path=storage_path,
-            file=file_bytes,
-            file_options={"content-type": file.type or "application/octet-stream"}
-        )
-
-        # Basic success check (supabase-py can return different types)
-        if hasattr(response, "status_code") and response.status_code not in (200, 201):
-            raise Exception(f"Upload HTTP error: {response.status_code} - {response.text}")
-
-        # Get public URL
-        public_url = supabase.storage.from_(bucket).get_public_url(storage_path)
+# ─── REALTIME FETCH (pushed by the change feed; TTL is just a safety net) ───
+feed = watch_tables("client_files", key="vault")
 
-        # Optional signed URL (not used by default in your code)
-        if use_signed_url:
-            signed_data = supabase.storage.from_(bucket).create_signed_url(storage_path, expires_in=604800)  # 7 days
-            if "signedURL" in signed_data:
-                public_url = signed_data["signedURL"]
-
-        return public_url, storage_path
-
-    except Exception as e:
-        raise Exception(f"Failed to upload {file.name}: {str(e)}")
-
-# ─── ULTRA-REALTIME FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing secure vault...")
+@cached_query("client_files", "users", ttl=feed.ttl(10, "client_files", "users"), show_spinner="Syncing secure vault...")
 def fetch_vault_data():
     try:
         files_resp = supabase.table("client_files").select(
-            "id, original_name, file_url, storage_path, upload_date, sent_by, "
+            "id, original_name, file_url, storage_path, thumb_url, upload_date, sent_by, "
             "category, assigned_client, tags, notes"
         ).order("upload_date", desc=True).execute()
         files = files_resp.data or []
@@ -103,10 +72,10 @@ def fetch_vault_data():
 files, registered_clients = fetch_vault_data()
 
 if st.button("🔄 Refresh Vault Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_vault_data.clear()
     st.rerun()
 
-st.caption("🔄 Vault auto-refreshes every 10s • Files stored permanently in Supabase Storage")
+st.caption("🔄 Vault updates live via the realtime feed • Files stored permanently in Supabase Storage")
 
 # ─── CLIENT VIEW RESTRICTION ───
 if current_role == "client":
@@ -138,45 +107,36 @@ if current_role in ["owner", "admin"]:
         submitted = st.form_submit_button("📤 Upload Permanently", type="primary", use_container_width=True)
 
         if submitted and uploaded_files:
+            # Parallel uploads → one bulk client_files insert
+            results = upload_many(uploaded_files, bucket="client_files", folder="vault")
+            uploaded = [r for r in results if not r["error"]]
+            failed = [f"{r['name']}: {r['error']}" for r in results if r["error"]]
             success_count = 0
-            failed = []
-            progress_bar = st.progress(0)
-            status_text = st.empty()
 
-            for idx, file in enumerate(uploaded_files):
-                status_text.text(f"Uploading {file.name} ({idx+1}/{len(uploaded_files)})...")
-                try:
-                    url, storage_path = upload_to_supabase(
-                        file=file,
-                        bucket="client_files",
-                        folder="vault",
-                        use_signed_url=False
-                    )
-
-                    supabase.table("client_files").insert({
-                        "original_name": file.name,
-                        "file_url": url,
-                        "storage_path": storage_path,
-                        "upload_date": date.today().isoformat(),
-                        "sent_by": st.session_state.get("full_name", "System"),
-                        "category": category,
-                        "assigned_client": assigned_client if assigned_client != "None" else None,
-                        "tags": tags.strip() or None,
-                        "notes": notes.strip() or None
-                    }).execute()
-
-                    success_count += 1
-                except Exception as e:
-                    failed.append(f"{file.name}: {str(e)}")
-                progress_bar.progress((idx + 1) / len(uploaded_files))
-
-            status_text.empty()
-            progress_bar.empty()
+            try:
+                inserted = insert_file_rows("client_files", [{
+                    "original_name": r["name"],
+                    "file_url": r["url"],
+                    "storage_path": r["storage_path"],
+                    "upload_date": date.today().isoformat(),
+                    "sent_by": st.session_state.get("full_name", "System"),
+                    "category": category,
+                    "assigned_client": assigned_client if assigned_client != "None" else None,
+                    "tags": tags.strip() or None,
+                    "notes": notes.strip() or None
+                } for r in uploaded])
+                for r, row in zip(uploaded, inserted):
+                    schedule_renditions(r["content"], r["name"], "client_files", r["storage_path"],
+                                        "client_files", row["id"])
+                success_count = len(inserted)
+            except Exception as e:
+                remove_uploaded("client_files", uploaded)
+                failed.append(f"Metadata save failed: {str(e)}")
 
             if success_count:
                 st.success(f"**{success_count}/{len(uploaded_files)}** files uploaded permanently!")
                 st.balloons()
-                st.cache_data.clear()
+                invalidate("client_files")
                 st.rerun()
 
             if failed:
@@ -244,7 +204,7 @@ if filtered:
 
             # Preview
             if file_url and f["original_name"].lower().endswith(('.png','.jpg','.jpeg','.gif')):
-                st.image(file_url, use_container_width=True)
+                st.image(f.get("thumb_url") or file_url, use_container_width=True)
             else:
                 st.markdown("<div style='height:140px; background:rgba(50,55,65,0.5); border-radius:10px; display:flex; align-items:center; justify-content:center; color:#aaa; font-size:1rem;'>No Preview</div>", unsafe_allow_html=True)
 
@@ -262,7 +222,7 @@ if filtered:
             # Download
             if file_url:
                 try:
-                    r = requests.get(file_url, timeout=10)
+                    r = get_http_client().get(file_url)
                     if r.status_code == 200:
                         st.download_button(
                             "⬇ Download",
@@ -282,10 +242,11 @@ if filtered:
                     try:
                         if f.get("storage_path"):
                             supabase.storage.from_("client_files").remove([f["storage_path"]])
+                            remove_renditions("client_files", f["storage_path"])
                         supabase.table("client_files").delete().eq("id", f["id"]).execute()
                         st.success(f"Deleted: {f['original_name']}")
                         st.balloons()
-                        st.cache_data.clear()
+                        invalidate("client_files")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Delete failed: {str(e)}")
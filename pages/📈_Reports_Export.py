@@ -10,6 +10,8 @@ from datetime import date
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.rollups import fetch_profit_rollups
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth(min_role="admin")  # stricter — owner/admin only
@@ -50,7 +52,7 @@ if current_role not in ["owner", "admin"]:
     st.stop()
 
 # ─── ULTRA-REALTIME CACHE (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Generating realtime empire reports...")
+@cached_query("profits", "profit_distributions", "users", "ftmo_accounts", "growth_fund_transactions", ttl=10, show_spinner="Generating realtime empire reports...")
 def fetch_reports_full():
     try:
         # Instant MV totals (lightning fast)
@@ -64,32 +66,33 @@ def fetch_reports_full():
         total_client_bal   = client_mv.get("total_client_balances", 0.0)
         gf_balance         = gf_mv.get("balance", 0.0)
 
-        # Detailed data for charts & tables
-        profits       = supabase.table("profits").select("*").order("record_date", desc=True).execute().data or []
-        distributions = supabase.table("profit_distributions").select("*").execute().data or []
-        clients       = supabase.table("users").select("full_name, balance").eq("role", "client").execute().data or []
-        accounts      = supabase.table("ftmo_accounts").select("name, current_phase, current_equity, withdrawable_balance").execute().data or []
-
-        total_gross       = sum(p.get("gross_profit", 0) for p in profits)
-        total_distributed = sum(d.get("share_amount", 0) for d in distributions if not d.get("is_growth_fund", False))
+        # Pre-grouped rollups for charts (server-side, few KB)
+        rollups  = fetch_profit_rollups()
+        clients  = supabase.table("users").select("full_name, balance").eq("role", "client").execute().data or []
+        accounts = supabase.table("ftmo_accounts").select("name, current_phase, current_equity, withdrawable_balance").execute().data or []
 
         return (
-            profits, distributions, clients, accounts,
-            total_gross, total_distributed, total_client_bal,
+            rollups["monthly_gross"], rollups["all_participant_shares"], clients, accounts,
+            rollups["total_gross"], rollups["total_distributed"], total_client_bal,
             gf_balance, total_accounts, total_equity, total_withdrawable
         )
     except Exception as e:
         st.error(f"Reports fetch error: {str(e)}")
-        return [], [], [], [], 0, 0, 0, 0, 0, 0, 0
+        return [], {}, [], [], 0, 0, 0, 0, 0, 0, 0
 
 (
-    profits, distributions, clients, accounts,
+    monthly_gross, participant_shares, clients, accounts,
     total_gross, total_distributed, total_client_bal,
     gf_balance, total_accounts, total_equity, total_withdrawable
 ) = fetch_reports_full()
 
+# Full ledgers — only pulled when an export is actually requested
+@cached_query("profits", "profit_distributions", ttl=60, show_spinner="Preparing export...")
+def fetch_ledger_export(table: str, order_col: str):
+    return supabase.table(table).select("*").order(order_col, desc=True).execute().data or []
+
 if st.button("🔄 Refresh Reports Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_reports_full.clear()
     st.rerun()
 
 st.caption("🔄 Reports auto-refresh every 10s • Lightning fast via materialized views")
@@ -111,14 +114,11 @@ tab1, tab2, tab3, tab4 = st.tabs(["Profit Trend", "Distribution Breakdown", "Cli
 
 with tab1:
     st.subheader("Monthly Profit Trend")
-    if profits:
-        df = pd.DataFrame(profits)
-        df["record_date"] = pd.to_datetime(df["record_date"])
-        monthly = df.groupby(df["record_date"].dt.strftime("%Y-%m"))["gross_profit"].sum().reset_index()
-        monthly = monthly.sort_values("record_date")
+    if monthly_gross:
+        monthly = pd.DataFrame(monthly_gross).sort_values("month")
         fig = go.Figure()
         fig.add_trace(go.Bar(
-            x=monthly["record_date"],
+            x=monthly["month"],
             y=monthly["gross_profit"],
             marker_color=accent_primary,
             text=monthly["gross_profit"].apply(lambda x: f"${x:,.0f}"),
@@ -137,10 +137,10 @@ with tab1:
 
 with tab2:
     st.subheader("All-Time Participant Shares")
-    if distributions:
-        df = pd.DataFrame(distributions)
-        summary = df.groupby("participant_name")["share_amount"].sum().reset_index()
-        summary = summary.sort_values("share_amount", ascending=False)
+    if participant_shares:
+        summary = pd.DataFrame(
+            list(participant_shares.items()), columns=["participant_name", "share_amount"]
+        ).sort_values("share_amount", ascending=False)
         fig = go.Figure(go.Pie(
             labels=summary["participant_name"],
             values=summary["share_amount"],
@@ -190,13 +190,20 @@ col_e1, col_e2 = st.columns(2)
 today_str = date.today().strftime("%Y-%m-%d")
 
 with col_e1:
-    if profits:
-        csv = pd.DataFrame(profits).to_csv(index=False).encode('utf-8')
-        st.download_button("📄 Profits Report", csv, f"KMFX_Profits_{today_str}.csv", "text/csv", use_container_width=True)
-
-    if distributions:
-        csv = pd.DataFrame(distributions).to_csv(index=False).encode('utf-8')
-        st.download_button("📄 Distributions Report", csv, f"KMFX_Distributions_{today_str}.csv", "text/csv", use_container_width=True)
+    # Raw ledgers are large — fetch on demand instead of on every 10s refresh
+    if monthly_gross:
+        if st.session_state.get("export_profits_ready") or st.button("📦 Prepare Profits Report", use_container_width=True):
+            st.session_state.export_profits_ready = True
+            profits = fetch_ledger_export("profits", "record_date")
+            csv = pd.DataFrame(profits).to_csv(index=False).encode('utf-8')
+            st.download_button("📄 Profits Report", csv, f"KMFX_Profits_{today_str}.csv", "text/csv", use_container_width=True)
+
+    if participant_shares:
+        if st.session_state.get("export_dists_ready") or st.button("📦 Prepare Distributions Report", use_container_width=True):
+            st.session_state.export_dists_ready = True
+            distributions = fetch_ledger_export("profit_distributions", "timestamp")
+            csv = pd.DataFrame(distributions).to_csv(index=False).encode('utf-8')
+            st.download_button("📄 Distributions Report", csv, f"KMFX_Distributions_{today_str}.csv", "text/csv", use_container_width=True)
 
 with col_e2:
     if clients:
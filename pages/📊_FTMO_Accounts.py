@@ -5,6 +5,8 @@ from datetime import date, datetime
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.user_directory import prime_user_names
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth()  # Allow both owner/admin and client
@@ -24,10 +26,11 @@ current_role = st.session_state.get("role", "guest").lower()
 # ────────────────────────────────────────────────
 # SHARED DATA FETCH
 # ────────────────────────────────────────────────
-@st.cache_data(ttl=60)
+@cached_query("ftmo_accounts", "users", ttl=60)
 def fetch_ftmo_data():
     accs = supabase.table("ftmo_accounts").select("*").order("created_date", desc=True).execute().data or []
     users = supabase.table("users").select("id, full_name, role, title").execute().data or []
+    prime_user_names(users)  # Share names with the process-wide directory (Dashboard, Profit Sharing)
 
     uid_to_display = {}
     display_to_uid = {}
@@ -248,7 +251,7 @@ if current_role in ["owner", "admin"]:
                         for key in ["create_tree_data", "create_gf_pct"]:
                             if key in st.session_state:
                                 del st.session_state[key]
-                        st.cache_data.clear()
+                        invalidate("ftmo_accounts")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Launch failed: {str(e)}")
@@ -306,7 +309,7 @@ if current_role in ["owner", "admin"]:
                         try:
                             supabase.table("ftmo_accounts").delete().eq("id", acc["id"]).execute()
                             st.success("Account deleted")
-                            st.cache_data.clear()
+                            invalidate("ftmo_accounts")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error: {str(e)}")
@@ -488,7 +491,7 @@ if current_role in ["owner", "admin"]:
                                     st.success("Updated successfully! 🎉")
                                     del st.session_state.edit_acc_id
                                     del st.session_state.edit_acc_data
-                                    st.cache_data.clear()
+                                    invalidate("ftmo_accounts")
                                     st.rerun()
                                 except Exception as e:
                                     st.error(f"Update failed: {str(e)}")
@@ -1,10 +1,11 @@
 # pages/📊_Whitelist_Monitor.py
 import streamlit as st
 from datetime import datetime
-import time
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.query_cache import cached_query, invalidate
+from utils.moderation import bulk_update, send_status_emails
 
 render_sidebar()
 require_auth(min_role="admin")
@@ -36,6 +37,57 @@ st.markdown("""
 st.title("👥 Whitelist / Waitlist Monitor")
 st.caption("Waitlist signups + messages from approved clients • Admin only")
 
+# ─── AUTO-REFRESH (fragment timers — walang naka-block na thread) ───
+AUTO_REFRESH_SECONDS = 15
+auto_refresh = st.toggle(f"Auto-refresh every {AUTO_REFRESH_SECONDS}s (both tabs)", value=False, key="global_auto")
+refresh_every = AUTO_REFRESH_SECONDS if auto_refresh else None
+
+
+# Change signature = (matching row count, max updated_at) — one tiny query.
+# Same signature → list served from cache, no refetch / rebuild.
+def waitlist_filters(q, statuses, search):
+    if statuses:
+        q = q.in_("status", statuses)
+    if search.strip():
+        s = search.strip().lower()
+        q = q.or_(f"full_name.ilike.%{s}%,email.ilike.%{s}%,message.ilike.%{s}%")
+    return q
+
+
+def message_filters(q, mode, search, uid):
+    if mode == "Inbox (Received)" and uid:
+        q = q.eq("receiver_id", uid)
+    elif mode == "Sent" and uid:
+        q = q.eq("sender_id", uid)
+    elif mode == "Unread Only" and uid:
+        q = q.eq("receiver_id", uid).eq("is_read", False)
+    if search.strip():
+        s = search.strip().lower()
+        q = q.or_(f"message.ilike.%{s}%,sender_username.ilike.%{s}%,receiver_username.ilike.%{s}%")
+    return q
+
+
+def table_signature(q) -> tuple:
+    resp = q.order("updated_at", desc=True).limit(1).execute()
+    latest = resp.data[0]["updated_at"] if resp.data else None
+    return (resp.count or 0, latest)
+
+
+def watch_signature(seen_key: str, make_query):
+    """
+    Auto-refresh timer: a tiny fragment that only re-checks the signature.
+    Unchanged → nothing re-renders; changed → one app rerun redraws the lists.
+    """
+    if not refresh_every:
+        return
+
+    @st.fragment(run_every=refresh_every)
+    def _tick():
+        if table_signature(make_query()) != st.session_state.get(seen_key):
+            st.rerun()
+
+    _tick()
+
 # ─── TABS ───
 tab_waitlist, tab_messages = st.tabs(["📋 Waitlist Submissions", "💬 Whitelisted Messages"])
 
@@ -59,115 +111,195 @@ with tab_waitlist:
     with col3:
         page_size = st.number_input("Per page", 10, 100, 20, 5, key="wl_page_size")
 
-    # Fetch
-    @st.cache_data(ttl=12, show_spinner="Loading waitlist...")
-    def fetch_waitlist(page=1, size=20, statuses=None, search=""):
+    # Fetch — signature is part of the key, so an unchanged table is a cache hit
+    @cached_query("waitlist", ttl=300, show_spinner="Loading waitlist...")
+    def fetch_waitlist(page=1, size=20, statuses=None, search="", signature=None):
         offset = (page - 1) * size
         q = supabase.table("waitlist").select("""
             id, full_name, email, message, language, status, 
             subscribed, created_at
         """).order("created_at", desc=True)
-
-        if statuses:
-            q = q.in_("status", statuses)
-        if search.strip():
-            s = search.strip().lower()
-            q = q.or_(f"full_name.ilike.%{s}%,email.ilike.%{s}%,message.ilike.%{s}%")
-
-        data_resp = q.range(offset, offset + size - 1).execute()
-        data = data_resp.data or []
-
-        count_q = supabase.table("waitlist").select("id", count="exact")
-        if statuses:
-            count_q = count_q.in_("status", statuses)
-        if search.strip():
-            count_q = count_q.or_(f"full_name.ilike.%{s}%,email.ilike.%{s}%,message.ilike.%{s}%")
-        count_resp = count_q.execute()
-        total = count_resp.count if count_resp.count is not None else 0
-
-        return data, total
+        q = waitlist_filters(q, statuses, search)
+        return q.range(offset, offset + size - 1).execute().data or []
+
+    def fetch_waitlist_targets(statuses, search):
+        """Every entry matching the filters (id + the fields the status email needs)"""
+        rows, start = [], 0
+        while True:
+            q = waitlist_filters(
+                supabase.table("waitlist").select("id, full_name, email, language").order("created_at", desc=True),
+                statuses, search
+            )
+            page = q.range(start, start + 999).execute().data or []
+            rows.extend(page)
+            if len(page) < 1000:
+                return rows
+            start += 1000
+
+    BULK_ACTIONS = {
+        "✅ Approve": {"status": "Approved"},
+        "❌ Reject": {"status": "Rejected"},
+        "🗑️ Unsubscribe": {"status": "Unsubscribed", "subscribed": False},
+    }
 
     if "wl_page" not in st.session_state:
         st.session_state.wl_page = 1
 
-    data, total = fetch_waitlist(
-        page=st.session_state.wl_page,
-        size=page_size,
-        statuses=status_filter,
-        search=search_term
-    )
-
-    total_pages = max(1, (total + page_size - 1) // page_size)
-
-    # Pagination
-    col_prev, col_info, col_next = st.columns([1, 5, 1])
-    with col_prev:
-        if st.button("← Prev", disabled=st.session_state.wl_page <= 1, key="wl_prev_btn"):
-            st.session_state.wl_page -= 1
-            st.rerun()
-    with col_info:
-        st.markdown(f"**Page {st.session_state.wl_page} / {total_pages}**  •  {total:,} entries")
-    with col_next:
-        if st.button("Next →", disabled=st.session_state.wl_page >= total_pages, key="wl_next_btn"):
-            st.session_state.wl_page += 1
-            st.rerun()
-
-    if not data:
-        st.info("No matching waitlist entries.")
-    else:
-        for entry in data:
-            created_str = entry.get("created_at", "—")[:19].replace("T", " ") if entry.get("created_at") else "—"
-            name = entry.get("full_name") or "—"
-            email = entry.get("email", "—")
-            message = (entry.get("message") or "").strip()
-            status = entry.get("status", "Pending")
-            subscribed = "Yes" if entry.get("subscribed", True) else "No"
-            lang = entry.get("language", "en").upper()
-
-            card_class = f"card {status.lower()[:3]}"
-
-            st.markdown(f'<div class="{card_class}">', unsafe_allow_html=True)
-            st.markdown(f'<span class="timestamp">Submitted: {created_str} • Lang: {lang}</span>')
-            st.markdown(f"**Name:** {name}")
-            st.markdown(f"**Email:** {email}")
-            if message:
-                st.markdown("**Why join:**")
-                st.write(message)
-
-            badge_color = {"Pending": "orange", "Approved": "green", "Rejected": "red", "Unsubscribed": "gray"}.get(status, "blue")
-            st.caption(f"Status: :{badge_color}-background[**{status}**] • Subscribed: {subscribed}")
-
-            col_a, col_r, col_u = st.columns(3)
-            with col_a:
-                if status != "Approved" and st.button("Approve", key=f"approve_{entry['id']}"):
-                    try:
-                        supabase.table("waitlist").update({"status": "Approved"}).eq("id", entry["id"]).execute()
-                        st.toast("Approved!", icon="✅")
-                        time.sleep(0.5)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Approve failed: {str(e)}")
-            with col_r:
-                if status != "Rejected" and st.button("Reject", key=f"reject_{entry['id']}"):
-                    try:
-                        supabase.table("waitlist").update({"status": "Rejected"}).eq("id", entry["id"]).execute()
-                        st.toast("Rejected", icon="❌")
-                        time.sleep(0.5)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Reject failed: {str(e)}")
-            with col_u:
-                if status != "Unsubscribed" and st.button("Unsubscribe", key=f"unsub_{entry['id']}"):
-                    try:
-                        supabase.table("waitlist").update({"status": "Unsubscribed", "subscribed": False}).eq("id", entry["id"]).execute()
-                        st.toast("Unsubscribed", icon="🗑️")
-                        time.sleep(0.5)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Unsubscribe failed: {str(e)}")
+    def waitlist_signature_query():
+        return waitlist_filters(supabase.table("waitlist").select("updated_at", count="exact"), status_filter, search_term)
+
+    @st.fragment
+    def render_waitlist(statuses, search, page_size):
+        signature = table_signature(waitlist_signature_query())
+        st.session_state.wl_signature = signature  # what's on screen (watch_signature compares)
+        total = signature[0]
+        data = fetch_waitlist(
+            page=st.session_state.wl_page,
+            size=page_size,
+            statuses=statuses,
+            search=search,
+            signature=signature
+        )
 
-            st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown('<hr class="thin">', unsafe_allow_html=True)
+        total_pages = max(1, (total + page_size - 1) // page_size)
+
+        # Pagination
+        col_prev, col_info, col_next = st.columns([1, 5, 1])
+        with col_prev:
+            if st.button("← Prev", disabled=st.session_state.wl_page <= 1, key="wl_prev_btn"):
+                st.session_state.wl_page -= 1
+                st.rerun(scope="fragment")
+        with col_info:
+            st.markdown(f"**Page {st.session_state.wl_page} / {total_pages}**  •  {total:,} entries")
+        with col_next:
+            if st.button("Next →", disabled=st.session_state.wl_page >= total_pages, key="wl_next_btn"):
+                st.session_state.wl_page += 1
+                st.rerun(scope="fragment")
+
+        # ─── BULK ACTIONS ───
+        with st.expander("⚡ Bulk Actions", expanded=bool(st.session_state.get("wl_bulk_report"))):
+            scope = st.radio(
+                "Apply to",
+                ["Selected on this page", f"All {total:,} matching entries"],
+                horizontal=True,
+                key="wl_bulk_scope"
+            )
+            send_emails = st.checkbox("Send status email to each entry", value=False, key="wl_bulk_email")
+
+            sel_all, sel_none = st.columns(2)
+            if sel_all.button("☑️ Select all on this page", key="wl_sel_all", use_container_width=True):
+                for entry in data:
+                    st.session_state[f"wl_sel_{entry['id']}"] = True
+                st.rerun(scope="fragment")
+            if sel_none.button("⬜ Clear selection", key="wl_sel_none", use_container_width=True):
+                for key in [k for k in st.session_state if str(k).startswith("wl_sel_")]:
+                    del st.session_state[key]
+                st.rerun(scope="fragment")
+
+            action_cols = st.columns(len(BULK_ACTIONS))
+            chosen = None
+            for col, label in zip(action_cols, BULK_ACTIONS):
+                if col.button(label, key=f"wl_bulk_{label}", use_container_width=True):
+                    chosen = label
+
+            if chosen:
+                if scope == "Selected on this page":
+                    targets = [e for e in data if st.session_state.get(f"wl_sel_{e['id']}")]
+                else:
+                    targets = fetch_waitlist_targets(statuses, search)
+
+                if not targets:
+                    st.warning("Nothing selected")
+                else:
+                    values = BULK_ACTIONS[chosen]
+                    with st.spinner(f"Updating {len(targets):,} entries..."):
+                        update_results = bulk_update("waitlist", [t["id"] for t in targets], values)
+                        invalidate("waitlist")
+                        ok_rows = [t for t in targets if update_results.get(str(t["id"])) == "ok"]
+                        email_results = send_status_emails(ok_rows, values["status"]) if send_emails else {}
+
+                    st.session_state.wl_bulk_report = [
+                        {
+                            "Name": t.get("full_name") or "—",
+                            "Email": t.get("email") or "—",
+                            "Update": update_results.get(str(t["id"]), "—"),
+                            "Email Sent": email_results.get(str(t["id"]), "—")
+                        }
+                        for t in targets
+                    ]
+                    for key in [k for k in st.session_state if str(k).startswith("wl_sel_")]:
+                        del st.session_state[key]
+                    st.rerun(scope="fragment")
+
+            report = st.session_state.get("wl_bulk_report")
+            if report:
+                updated = sum(1 for r in report if r["Update"] == "ok")
+                st.success(f"{updated:,} / {len(report):,} entries updated")
+                st.dataframe(report, use_container_width=True, hide_index=True)
+                if st.button("Dismiss report", key="wl_bulk_dismiss"):
+                    del st.session_state["wl_bulk_report"]
+                    st.rerun(scope="fragment")
+
+        if not data:
+            st.info("No matching waitlist entries.")
+        else:
+            for entry in data:
+                created_str = entry.get("created_at", "—")[:19].replace("T", " ") if entry.get("created_at") else "—"
+                name = entry.get("full_name") or "—"
+                email = entry.get("email", "—")
+                message = (entry.get("message") or "").strip()
+                status = entry.get("status", "Pending")
+                subscribed = "Yes" if entry.get("subscribed", True) else "No"
+                lang = entry.get("language", "en").upper()
+
+                card_class = f"card {status.lower()[:3]}"
+
+                st.markdown(f'<div class="{card_class}">', unsafe_allow_html=True)
+                st.checkbox("Select", key=f"wl_sel_{entry['id']}")
+                st.markdown(f'<span class="timestamp">Submitted: {created_str} • Lang: {lang}</span>')
+                st.markdown(f"**Name:** {name}")
+                st.markdown(f"**Email:** {email}")
+                if message:
+                    st.markdown("**Why join:**")
+                    st.write(message)
+
+                badge_color = {"Pending": "orange", "Approved": "green", "Rejected": "red", "Unsubscribed": "gray"}.get(status, "blue")
+                st.caption(f"Status: :{badge_color}-background[**{status}**] • Subscribed: {subscribed}")
+
+                col_a, col_r, col_u = st.columns(3)
+                with col_a:
+                    if status != "Approved" and st.button("Approve", key=f"approve_{entry['id']}"):
+                        try:
+                            supabase.table("waitlist").update({"status": "Approved"}).eq("id", entry["id"]).execute()
+                            invalidate("waitlist")
+                            st.toast("Approved!", icon="✅")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Approve failed: {str(e)}")
+                with col_r:
+                    if status != "Rejected" and st.button("Reject", key=f"reject_{entry['id']}"):
+                        try:
+                            supabase.table("waitlist").update({"status": "Rejected"}).eq("id", entry["id"]).execute()
+                            invalidate("waitlist")
+                            st.toast("Rejected", icon="❌")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Reject failed: {str(e)}")
+                with col_u:
+                    if status != "Unsubscribed" and st.button("Unsubscribe", key=f"unsub_{entry['id']}"):
+                        try:
+                            supabase.table("waitlist").update({"status": "Unsubscribed", "subscribed": False}).eq("id", entry["id"]).execute()
+                            invalidate("waitlist")
+                            st.toast("Unsubscribed", icon="🗑️")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Unsubscribe failed: {str(e)}")
+
+                st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown('<hr class="thin">', unsafe_allow_html=True)
+
+    render_waitlist(status_filter, search_term, page_size)
+    watch_signature("wl_signature", waitlist_signature_query)
 
 # ────────────────────────────────────────────────
 # MESSAGES TAB
@@ -183,130 +315,112 @@ with tab_messages:
     with col_m3:
         msg_page_size = st.number_input("Per page", 10, 100, 20, 5, key="msg_page_size_input")
 
-    @st.cache_data(ttl=8, show_spinner="Loading messages...")
-    def fetch_messages(page=1, size=20, mode="All", search=""):
+    @cached_query("messages", ttl=300, show_spinner="Loading messages...")
+    def fetch_messages(page=1, size=20, mode="All", search="", uid=None, signature=None):
         offset = (page - 1) * size
-        uid = st.session_state.get("user_id")
 
         q = supabase.table("messages").select("""
             id, sender_id, sender_username, receiver_id, receiver_username,
             message, timestamp, is_read
         """).order("timestamp", desc=True)
-
-        if mode == "Inbox (Received)" and uid:
-            q = q.eq("receiver_id", uid)
-        elif mode == "Sent" and uid:
-            q = q.eq("sender_id", uid)
-        elif mode == "Unread Only" and uid:
-            q = q.eq("receiver_id", uid).eq("is_read", False)
-
-        if search.strip():
-            s = search.strip().lower()
-            q = q.or_(f"message.ilike.%{s}%,sender_username.ilike.%{s}%,receiver_username.ilike.%{s}%")
-
-        data_resp = q.range(offset, offset + size - 1).execute()
-        data = data_resp.data or []
-
-        count_q = supabase.table("messages").select("id", count="exact")
-        if mode == "Inbox (Received)" and uid:
-            count_q = count_q.eq("receiver_id", uid)
-        elif mode == "Sent" and uid:
-            count_q = count_q.eq("sender_id", uid)
-        elif mode == "Unread Only" and uid:
-            count_q = count_q.eq("receiver_id", uid).eq("is_read", False)
-        if search.strip():
-            count_q = count_q.or_(f"message.ilike.%{s}%,sender_username.ilike.%{s}%,receiver_username.ilike.%{s}%")
-
-        count_resp = count_q.execute()
-        total = count_resp.count if count_resp.count is not None else 0
-
-        return data, total
+        q = message_filters(q, mode, search, uid)
+        return q.range(offset, offset + size - 1).execute().data or []
 
     if "msg_page" not in st.session_state:
         st.session_state.msg_page = 1
 
-    msg_data, msg_total = fetch_messages(
-        page=st.session_state.msg_page,
-        size=msg_page_size,
-        mode=msg_mode,
-        search=msg_search
-    )
-
-    msg_total_pages = max(1, (msg_total + msg_page_size - 1) // msg_page_size)
+    def messages_signature_query():
+        uid = st.session_state.get("user_id")
+        return message_filters(supabase.table("messages").select("updated_at", count="exact"), msg_mode, msg_search, uid)
 
-    col_mp1, col_mp2, col_mp3 = st.columns([1, 5, 1])
-    with col_mp1:
-        if st.button("← Prev", disabled=st.session_state.msg_page <= 1, key="msg_prev_btn"):
-            st.session_state.msg_page -= 1
-            st.rerun()
-    with col_mp2:
-        st.markdown(f"**Page {st.session_state.msg_page} / {msg_total_pages}**  •  {msg_total:,} messages")
-    with col_mp3:
-        if st.button("Next →", disabled=st.session_state.msg_page >= msg_total_pages, key="msg_next_btn"):
-            st.session_state.msg_page += 1
-            st.rerun()
+    @st.fragment
+    def render_messages(msg_mode, msg_search, msg_page_size):
+        uid = st.session_state.get("user_id")
+        signature = table_signature(messages_signature_query())
+        st.session_state.msg_signature = signature
+        msg_total = signature[0]
+        msg_data = fetch_messages(
+            page=st.session_state.msg_page,
+            size=msg_page_size,
+            mode=msg_mode,
+            search=msg_search,
+            uid=uid,
+            signature=signature
+        )
 
-    if not msg_data:
-        st.info("No messages match the filters.")
-    else:
-        for msg in msg_data:
-            ts_raw = msg.get("timestamp")
-            ts_str = "—"
-            if ts_raw:
-                try:
-                    dt = datetime.fromisoformat(ts_raw.replace("Z", "+00:00"))
-                    ts_str = dt.strftime("%b %d, %Y %I:%M %p")
-                except:
-                    ts_str = ts_raw[:19].replace("T", " ")
-
-            sender = msg.get("sender_username", "Unknown")
-            receiver = msg.get("receiver_username", "—")
-            content = msg.get("message", "").strip()
-            is_read = msg.get("is_read", False)
-
-            card_class = f"card {'unread' if not is_read else 'read'}"
-
-            st.markdown(f'<div class="{card_class}">', unsafe_allow_html=True)
-            st.markdown(f'<span class="timestamp">{ts_str}</span>')
-            st.markdown(f"**{sender}** → **{receiver}**")
-            st.write(content)
-
-            col_read, col_reply, col_send = st.columns([1.3, 3.5, 1.2])
-            with col_read:
-                if not is_read and st.button("Mark Read", key=f"msg_read_{msg['id']}"):
-                    try:
-                        supabase.table("messages").update({"is_read": True}).eq("id", msg["id"]).execute()
-                        st.toast("Marked as read", icon="✅")
-                        time.sleep(0.5)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error: {str(e)}")
-
-            with col_reply:
-                reply_key = f"msg_reply_{msg['id']}"
-                reply_text = st.text_input("", placeholder="Quick reply...", key=reply_key, label_visibility="collapsed")
-
-            with col_send:
-                if st.button("Send", key=f"msg_send_{msg['id']}") and reply_text.strip():
+        msg_total_pages = max(1, (msg_total + msg_page_size - 1) // msg_page_size)
+
+        col_mp1, col_mp2, col_mp3 = st.columns([1, 5, 1])
+        with col_mp1:
+            if st.button("← Prev", disabled=st.session_state.msg_page <= 1, key="msg_prev_btn"):
+                st.session_state.msg_page -= 1
+                st.rerun(scope="fragment")
+        with col_mp2:
+            st.markdown(f"**Page {st.session_state.msg_page} / {msg_total_pages}**  •  {msg_total:,} messages")
+        with col_mp3:
+            if st.button("Next →", disabled=st.session_state.msg_page >= msg_total_pages, key="msg_next_btn"):
+                st.session_state.msg_page += 1
+                st.rerun(scope="fragment")
+
+        if not msg_data:
+            st.info("No messages match the filters.")
+        else:
+            for msg in msg_data:
+                ts_raw = msg.get("timestamp")
+                ts_str = "—"
+                if ts_raw:
                     try:
-                        supabase.table("messages").insert({
-                            "sender_id": st.session_state.get("user_id"),
-                            "sender_username": st.session_state.get("username", "Admin"),
-                            "receiver_id": msg["sender_id"],
-                            "receiver_username": sender,
-                            "message": reply_text.strip()
-                        }).execute()
-                        st.session_state[reply_key] = ""
-                        st.toast("Reply sent", icon="📤")
-                        time.sleep(0.6)
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Send failed: {str(e)}")
-
-            st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown('<hr class="thin">', unsafe_allow_html=True)
-
-# ─── OPTIONAL GLOBAL REFRESH ───
-if st.toggle("Auto-refresh every 15s (both tabs)", value=False, key="global_auto"):
-    time.sleep(15)
-    st.rerun()
\ No newline at end of file
+                        dt = datetime.fromisoformat(ts_raw.replace("Z", "+00:00"))
+                        ts_str = dt.strftime("%b %d, %Y %I:%M %p")
+                    except:
+                        ts_str = ts_raw[:19].replace("T", " ")
+
+                sender = msg.get("sender_username", "Unknown")
+                receiver = msg.get("receiver_username", "—")
+                content = msg.get("message", "").strip()
+                is_read = msg.get("is_read", False)
+
+                card_class = f"card {'unread' if not is_read else 'read'}"
+
+                st.markdown(f'<div class="{card_class}">', unsafe_allow_html=True)
+                st.markdown(f'<span class="timestamp">{ts_str}</span>')
+                st.markdown(f"**{sender}** → **{receiver}**")
+                st.write(content)
+
+                col_read, col_reply, col_send = st.columns([1.3, 3.5, 1.2])
+                with col_read:
+                    if not is_read and st.button("Mark Read", key=f"msg_read_{msg['id']}"):
+                        try:
+                            supabase.table("messages").update({"is_read": True}).eq("id", msg["id"]).execute()
+                            invalidate("messages")
+                            st.toast("Marked as read", icon="✅")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Error: {str(e)}")
+
+                with col_reply:
+                    reply_key = f"msg_reply_{msg['id']}"
+                    reply_text = st.text_input("", placeholder="Quick reply...", key=reply_key, label_visibility="collapsed")
+
+                with col_send:
+                    if st.button("Send", key=f"msg_send_{msg['id']}") and reply_text.strip():
+                        try:
+                            supabase.table("messages").insert({
+                                "sender_id": st.session_state.get("user_id"),
+                                "sender_username": st.session_state.get("username", "Admin"),
+                                "receiver_id": msg["sender_id"],
+                                "receiver_username": sender,
+                                "message": reply_text.strip()
+                            }).execute()
+                            invalidate("messages")
+                            st.session_state[reply_key] = ""
+                            st.toast("Reply sent", icon="📤")
+                            st.rerun(scope="fragment")
+                        except Exception as e:
+                            st.error(f"Send failed: {str(e)}")
+
+                st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown('<hr class="thin">', unsafe_allow_html=True)
+
+    render_messages(msg_mode, msg_search, msg_page_size)
+    watch_signature("msg_signature", messages_signature_query)
@@ -9,7 +9,9 @@ from datetime import date, datetime
 # ────────────────────────────────────────────────
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
-from utils.supabase_client import supabase
+from utils.log_store import get_log_store, fetch_log_page, filter_log_frame
+from utils.log_writer import get_log_writer
+from utils.query_cache import get_cache_stats
 
 render_sidebar()
 require_auth(min_role="owner")  # strict — owner only for full audit transparency
@@ -49,34 +51,53 @@ if current_role != "owner":
     st.error("🔒 Audit Logs are **OWNER-ONLY** for empire security & compliance.")
     st.stop()
 
-# ─── FULL REALTIME CACHE (30s TTL) ───
-@st.cache_data(ttl=30, show_spinner="Loading realtime audit logs...")
-def fetch_audit_full():
+# ─── INCREMENTAL LOG STORE (only new rows per sync) ───
+log_store = get_log_store()
+
+def fetch_audit_full(force: bool = False):
     try:
-        logs = supabase.table("logs").select("*").order("timestamp", desc=True).execute().data or []
+        log_store.sync(force=force)
+    except Exception as e:
+        st.error(f"Failed to fetch audit logs: {str(e)}")
 
-        total_actions   = len(logs)
-        unique_users    = len(set(l.get("user_name") for l in logs if l.get("user_name")))
-        unique_actions  = len(set(l.get("action") for l in logs))
-        action_counts   = pd.Series([l.get("action") for l in logs]).value_counts()
+    logs = log_store.snapshot()  # typed DataFrame, newest first
 
-        latest_ts = logs[0]["timestamp"][:16].replace("T", " ") if logs else "—"
+    total_actions   = len(logs)
+    unique_users    = logs["user_name"].nunique()
+    unique_actions  = logs["action"].nunique()
+    action_counts   = logs["action"].value_counts()
+    action_counts   = action_counts[action_counts > 0]
 
-        return logs, total_actions, unique_users, unique_actions, action_counts, latest_ts
-    except Exception as e:
-        st.error(f"Failed to fetch audit logs: {str(e)}")
-        return [], 0, 0, 0, pd.Series(), "—"
+    latest_ts = logs["ts"].iloc[0].strftime("%Y-%m-%d %H:%M") if total_actions else "—"
 
-logs, total_actions, unique_users, unique_actions, action_counts, latest_ts = fetch_audit_full()
+    return logs, total_actions, unique_users, unique_actions, action_counts, latest_ts
 
-if st.button("🔄 Refresh Audit Logs Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
-    st.rerun()
+force_sync = st.button("🔄 Refresh Audit Logs Now", type="secondary", use_container_width=True)
+logs, total_actions, unique_users, unique_actions, action_counts, latest_ts = fetch_audit_full(force=force_sync)
 
-st.caption("🔄 Logs auto-refresh every 30s • Every empire action tracked realtime")
+st.caption("🔄 Only new log rows are fetched on each visit • Every empire action tracked realtime")
+synced_at = datetime.now().strftime("%H:%M:%S")
+
+with st.expander("🧾 Background Log Writer Status"):
+    writer_stats = get_log_writer().get_stats()
+    wcols = st.columns(6)
+    for col, key in zip(wcols, ["queued", "flushed", "pending", "spilled", "replayed", "dropped"]):
+        col.metric(key.title(), f"{writer_stats[key]:,}")
+
+with st.expander("🗃️ Query Cache Stats"):
+    cache_stats = get_cache_stats()
+    if cache_stats:
+        cache_df = pd.DataFrame(cache_stats)
+        ccols = st.columns(4)
+        for col, key in zip(ccols, ["hits", "misses", "evictions", "invalidations"]):
+            col.metric(key.title(), f"{int(cache_df[key].sum()):,}")
+        st.dataframe(cache_df, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No cached queries yet in this server process")
 
 # ─── AUDIT SUMMARY METRICS ───
 st.subheader("Audit Overview (Instant Stats)")
+st.caption(f"Counts, charts & CSV export = local log store (synced {synced_at}) • Detailed table rows = live server pages")
 cols = st.columns(4)
 cols[0].metric("Total Logged Actions", f"{total_actions:,}")
 cols[1].metric("Unique Active Users", unique_users)
@@ -113,41 +134,27 @@ with col_f1:
         end_date = st.date_input("To Date", value=None)
 
 with col_f2:
-    filter_user = st.selectbox("Filter User", ["All"] + sorted(set(l.get("user_name") for l in logs if l.get("user_name"))))
-    filter_action = st.selectbox("Filter Action Type", ["All"] + sorted(set(l.get("action") for l in logs)))
-
-# Apply filters
-filtered_logs = logs
-if search_log:
-    s = search_log.lower()
-    filtered_logs = [l for l in filtered_logs if
-                     s in l.get("action", "").lower() or
-                     s in l.get("details", "").lower() or
-                     s in str(l.get("user_name", "")).lower()]
-
-if filter_user != "All":
-    filtered_logs = [l for l in filtered_logs if l.get("user_name") == filter_user]
-
-if filter_action != "All":
-    filtered_logs = [l for l in filtered_logs if l.get("action") == filter_action]
-
-if start_date or end_date:
-    filtered_logs = [
-        l for l in filtered_logs
-        if (not start_date or pd.to_datetime(l["timestamp"]).date() >= start_date) and
-           (not end_date or pd.to_datetime(l["timestamp"]).date() <= end_date)
-    ]
+    filter_user = st.selectbox("Filter User", ["All"] + sorted(logs["user_name"].dropna().unique().tolist()))
+    filter_action = st.selectbox("Filter Action Type", ["All"] + sorted(logs["action"].dropna().unique().tolist()))
+
+# Apply filters — one vectorized mask over the typed frame
+filtered_logs = filter_log_frame(
+    logs,
+    search=search_log,
+    user=None if filter_user == "All" else filter_user,
+    action=None if filter_action == "All" else filter_action,
+    start_date=start_date,
+    end_date=end_date
+)
 
 # ─── ACTIVITY TIMELINE CHART ───
 st.subheader("📊 Empire Activity Timeline (Filtered View)")
-if filtered_logs:
-    log_df = pd.DataFrame(filtered_logs)
-    log_df["timestamp"] = pd.to_datetime(log_df["timestamp"])
-    daily_counts = log_df.groupby(log_df["timestamp"].dt.date).size().reset_index(name="Actions")
+if not filtered_logs.empty:
+    daily_counts = filtered_logs.groupby(filtered_logs["ts"].dt.floor("D")).size().reset_index(name="Actions")
 
     fig_timeline = go.Figure()
     fig_timeline.add_trace(go.Scatter(
-        x=daily_counts["timestamp"],
+        x=daily_counts["ts"],
         y=daily_counts["Actions"],
         mode='lines+markers',
         line=dict(color=accent_primary, width=5),
@@ -166,10 +173,33 @@ if filtered_logs:
 else:
     st.info("No logs match current filters • Adjust filters to see timeline")
 
-# ─── DETAILED LOG TABLE ───
+# ─── DETAILED LOG TABLE (server-side filtered, keyset pages) ───
+filter_key = (search_log, filter_user, filter_action, start_date, end_date)
+if st.session_state.get("audit_filter_key") != filter_key or force_sync:
+    st.session_state.audit_filter_key = filter_key
+    st.session_state.audit_pages = []
+    st.session_state.audit_next = None
+
+if not st.session_state.audit_pages:
+    try:
+        rows, next_before = fetch_log_page(
+            search=search_log,
+            user=None if filter_user == "All" else filter_user,
+            action=None if filter_action == "All" else filter_action,
+            start_date=start_date,
+            end_date=end_date
+        )
+        st.session_state.audit_pages = rows
+        st.session_state.audit_next = next_before
+    except Exception as e:
+        st.error(f"Failed to load log page: {str(e)}")
+
+# Match count from the synced store — no count(*) over all of logs on every filter change
 st.subheader(f"Detailed Audit Logs ({len(filtered_logs):,} entries)")
-if filtered_logs:
-    log_display = pd.DataFrame(filtered_logs)
+
+page_rows = st.session_state.audit_pages
+if page_rows:
+    log_display = pd.DataFrame(page_rows)
     log_display["timestamp"] = pd.to_datetime(log_display["timestamp"]).dt.strftime("%Y-%m-%d %H:%M:%S")
     log_display = log_display[["timestamp", "user_name", "user_type", "action", "details"]].rename(columns={
         "timestamp": "Time",
@@ -184,9 +214,34 @@ if filtered_logs:
         use_container_width=True,
         hide_index=True
     )
+    st.caption(f"Showing {len(page_rows):,} of {len(filtered_logs):,} matching entries")
 
-    # Export filtered CSV
-    csv_logs = log_display.to_csv(index=False).encode('utf-8')
+    if st.session_state.audit_next and st.button("⬇️ Load Older Logs", use_container_width=True):
+        try:
+            rows, next_before = fetch_log_page(
+                search=search_log,
+                user=None if filter_user == "All" else filter_user,
+                action=None if filter_action == "All" else filter_action,
+                start_date=start_date,
+                end_date=end_date,
+                before=st.session_state.audit_next
+            )
+            st.session_state.audit_pages = page_rows + rows
+            st.session_state.audit_next = next_before
+            st.rerun()
+        except Exception as e:
+            st.error(f"Failed to load older logs: {str(e)}")
+
+    # Export filtered CSV (full filtered set from the local store — same as the charts)
+    export_df = filtered_logs.assign(timestamp=filtered_logs["ts"].dt.strftime("%Y-%m-%d %H:%M:%S"))
+    export_df = export_df[["timestamp", "user_name", "user_type", "action", "details"]].rename(columns={
+        "timestamp": "Time",
+        "user_name": "User",
+        "user_type": "Role",
+        "action": "Action",
+        "details": "Details"
+    })
+    csv_logs = export_df.to_csv(index=False).encode('utf-8')
     st.download_button(
         "📤 Export Filtered Logs CSV",
         csv_logs,
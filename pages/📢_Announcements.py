@@ -1,6 +1,5 @@
 # pages/📢_Announcements.py
 import streamlit as st
-import requests
 from datetime import datetime, date
 
 # ────────────────────────────────────────────────
@@ -9,7 +8,12 @@ from datetime import datetime, date
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
-from utils.helpers import upload_to_supabase, log_action
+from utils.helpers import log_action
+from utils.signed_urls import get_signed_urls, invalidate_signed_urls
+from utils.media import is_image, prepare_images, show_image
+from utils.renditions import schedule_renditions, remove_renditions
+from utils.uploads import upload_many, insert_file_rows, remove_uploaded
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth(min_role="client")  # everyone sees feed, owner/admin can post/delete/pin
@@ -47,41 +51,38 @@ st.markdown("**Central realtime communication** • Broadcast updates • Rich i
 current_role = st.session_state.get("role", "guest").lower()
 
 # ─── ULTRA-REALTIME FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing empire feed...")
+@cached_query("announcements", "announcement_files", "announcement_comments", ttl=10, show_spinner="Syncing empire feed...")
 def fetch_announcements_realtime():
     try:
-        ann_resp = supabase.table("announcements").select("*").order("date", desc=True).execute()
+        # Announcements + attachments in ONE embedded query
+        ann_resp = supabase.table("announcements").select(
+            "*, announcement_files(id, original_name, storage_path, file_url, thumb_path, thumb_url)"
+        ).order("date", desc=True).execute()
         announcements = ann_resp.data or []
 
-        # Attachments – try public URL first, then fresh signed
-        for ann in announcements:
-            att_resp = supabase.table("announcement_files").select(
-                "id, original_name, storage_path, file_url"
-            ).eq("announcement_id", ann["id"]).execute()
-            attachments = []
-            for att in att_resp.data or []:
-                public_url = att.get("file_url")  # direct public URL if bucket public
-                signed_url = None
-
-                if not public_url and att.get("storage_path"):
-                    try:
-                        signed = supabase.storage.from_("announcements").create_signed_url(
-                            att["storage_path"], expires_in=3600 * 24  # 24 hours - fresh every load
-                        )
-                        signed_url = signed.signed_url
-                        # Temporary debug - comment out after testing
-                        # st.write(f"Generated signed URL for {att['original_name']}: {signed_url}")
-                    except Exception as sign_err:
-                        st.warning(f"Signed URL failed for {att['original_name']}: {str(sign_err)}")
+        # Attachments – public URL first, else cached/bulk signed URL
+        to_sign = [
+            path
+            for ann in announcements
+            for att in ann.get("announcement_files") or []
+            if not att.get("file_url") and att.get("storage_path")
+            for path in (att["storage_path"], att.get("thumb_path"))
+        ]
+        signed_map = get_signed_urls("announcements", to_sign)
 
-                attachments.append({
+        for ann in announcements:
+            ann["attachments"] = [
+                {
                     "id": att["id"],
                     "original_name": att["original_name"],
                     "storage_path": att["storage_path"],
-                    "public_url": public_url,
-                    "signed_url": signed_url
-                })
-            ann["attachments"] = attachments
+                    "public_url": att.get("file_url"),  # direct public URL if bucket public
+                    "signed_url": signed_map.get(att.get("storage_path")),
+                    "thumb_path": att.get("thumb_path"),
+                    "thumb_url": att.get("thumb_url") or signed_map.get(att.get("thumb_path"))
+                }
+                for att in ann.pop("announcement_files", None) or []
+            ]
 
         # Comments grouped
         comm_resp = supabase.table("announcement_comments").select("*").order("timestamp", desc=True).execute()
@@ -99,7 +100,7 @@ def fetch_announcements_realtime():
 announcements = fetch_announcements_realtime()
 
 if st.button("🔄 Refresh Feed Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_announcements_realtime.clear()
     st.rerun()
 
 st.caption("🔄 Feed auto-refreshes every 10s • Images & attachments fully visible")
@@ -139,28 +140,29 @@ if current_role in ["owner", "admin"]:
                         ann_id = resp.data[0]["id"]
 
                         if attachments:
-                            progress = st.progress(0)
-                            for idx, file in enumerate(attachments):
-                                try:
-                                    url, storage_path = upload_to_supabase(
-                                        file=file,
-                                        bucket="announcements",
-                                        folder="attachments"
-                                    )
-                                    supabase.table("announcement_files").insert({
-                                        "announcement_id": ann_id,
-                                        "original_name": file.name,
-                                        "file_url": url,
-                                        "storage_path": storage_path
-                                    }).execute()
-                                except Exception as upload_err:
-                                    st.warning(f"Attachment {file.name} failed: {str(upload_err)}")
-                                progress.progress((idx + 1) / len(attachments))
-                            progress.empty()
+                            # Parallel uploads → one bulk announcement_files insert
+                            results = upload_many(attachments, bucket="announcements", folder="attachments")
+                            for r in results:
+                                if r["error"]:
+                                    st.warning(f"Attachment {r['name']} failed: {r['error']}")
+                            uploaded = [r for r in results if not r["error"]]
+                            try:
+                                inserted = insert_file_rows("announcement_files", [{
+                                    "announcement_id": ann_id,
+                                    "original_name": r["name"],
+                                    "file_url": r["url"],
+                                    "storage_path": r["storage_path"]
+                                } for r in uploaded])
+                                for r, row in zip(uploaded, inserted):
+                                    schedule_renditions(r["content"], r["name"], "announcements", r["storage_path"],
+                                                        "announcement_files", row["id"])
+                            except Exception as insert_err:
+                                remove_uploaded("announcements", uploaded)
+                                st.warning(f"Attachment records failed: {str(insert_err)}")
 
                         st.success("Announcement broadcasted! Visible to entire empire.")
                         st.balloons()
-                        st.cache_data.clear()
+                        invalidate("announcements", "announcement_files")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Post failed: {str(e)}")
@@ -186,6 +188,15 @@ filtered = sorted(filtered, key=lambda x: (not x.get("pinned", False), x["date"]
 # ─── RICH FEED DISPLAY ───
 st.subheader(f"📻 Live Empire Feed ({len(filtered)} posts)")
 if filtered:
+    # All feed images resolved once (URLs for the browser, or parallel-fetched cached bytes)
+    image_sources = prepare_images(
+        (att.get("thumb_path") or att.get("storage_path") or att["id"],
+         att.get("thumb_url") or att.get("public_url") or att.get("signed_url"))
+        for ann in filtered
+        for att in ann.get("attachments", [])
+        if is_image(att["original_name"])
+    )
+
     for ann in filtered:
         pinned_tag = " 📌 PINNED" if ann.get("pinned") else ""
         with st.container(border=True):
@@ -193,50 +204,22 @@ if filtered:
             st.caption(f"{ann.get('category', 'General')} • by {ann['posted_by']} • {ann['date']}")
             st.markdown(ann['message'])
 
-            # Attachments: try public first, then fresh signed, then bytes load
-            images = [att for att in ann.get("attachments", []) if att["original_name"].lower().endswith(('.png','.jpg','.jpeg','.gif'))]
+            # Attachments: images straight from storage URL (or LRU cache in proxy mode)
+            images = [att for att in ann.get("attachments", []) if is_image(att["original_name"])]
             if images:
                 img_cols = st.columns(min(4, len(images)))
                 for i, att in enumerate(images):
-                    url = att.get("public_url") or att.get("signed_url")
-                    if url:
-                        with img_cols[i % 4]:
-                            try:
-                                r = requests.get(url, timeout=10)
-                                if r.status_code == 200:
-                                    st.image(r.content, use_column_width=True, caption=att["original_name"])
-                                else:
-                                    st.caption(f"{att['original_name']} (status {r.status_code})")
-                                    # Debug
-                                    st.write("Failed URL:", url)
-                            except Exception as load_err:
-                                st.caption(f"{att['original_name']} (load error)")
-                                st.write("Load error:", str(load_err))
-                    else:
-                        st.caption(f"Image failed to load: {att['original_name']}")
+                    with img_cols[i % 4]:
+                        show_image(image_sources.get(att.get("thumb_path") or att.get("storage_path") or att["id"]), caption=att["original_name"])
 
-            # Other files (downloadable)
-            non_images = [att for att in ann.get("attachments", []) if not att["original_name"].lower().endswith(('.png','.jpg','.jpeg','.gif'))]
+            # Other files (browser downloads directly from storage)
+            non_images = [att for att in ann.get("attachments", []) if not is_image(att["original_name"])]
             if non_images:
                 st.markdown("**Attached Files:**")
                 for att in non_images:
                     url = att.get("public_url") or att.get("signed_url")
                     if url:
-                        try:
-                            r = requests.get(url, timeout=10)
-                            if r.status_code == 200:
-                                st.download_button(
-                                    label=att["original_name"],
-                                    data=r.content,
-                                    file_name=att["original_name"],
-                                    mime="application/octet-stream",
-                                    use_container_width=True,
-                                    key=f"dl_ann_{ann['id']}_{att['id']}"
-                                )
-                            else:
-                                st.caption(f"{att['original_name']} (status {r.status_code})")
-                        except:
-                            st.caption(f"{att['original_name']} (download failed)")
+                        st.link_button(f"⬇️ {att['original_name']}", url, use_container_width=True)
                     else:
                         st.caption(att["original_name"])
 
@@ -244,7 +227,7 @@ if filtered:
             like_key = f"like_{ann['id']}"
             if st.button(f"❤️ {ann.get('likes', 0)}", key=like_key):
                 supabase.table("announcements").update({"likes": ann.get('likes', 0) + 1}).eq("id", ann["id"]).execute()
-                st.cache_data.clear()
+                invalidate("announcements")
                 st.rerun()
 
             # Comments
@@ -265,7 +248,7 @@ if filtered:
                                 "message": comment_text.strip(),
                                 "timestamp": datetime.now().isoformat()
                             }).execute()
-                            st.cache_data.clear()
+                            invalidate("announcement_comments")
                             st.rerun()
 
             # Admin controls
@@ -274,24 +257,27 @@ if filtered:
                 with col_pin:
                     if st.button("📌 Pin / Unpin", key=f"pin_{ann['id']}"):
                         supabase.table("announcements").update({"pinned": not ann.get("pinned", False)}).eq("id", ann["id"]).execute()
-                        st.cache_data.clear()
+                        invalidate("announcements")
                         st.rerun()
                 with col_del:
                     if st.button("🗑️ Delete Announcement", key=f"del_{ann['id']}", type="secondary"):
                         try:
-                            # Clean storage
-                            for att in ann.get("attachments", []):
-                                if att.get("storage_path"):
-                                    try:
-                                        supabase.storage.from_("announcements").remove([att["storage_path"]])
-                                    except:
-                                        pass
+                            # Clean storage (one bulk remove)
+                            att_paths = [att["storage_path"] for att in ann.get("attachments", []) if att.get("storage_path")]
+                            if att_paths:
+                                try:
+                                    supabase.storage.from_("announcements").remove(att_paths)
+                                except:
+                                    pass
+                                invalidate_signed_urls("announcements", att_paths)
+                                for path in att_paths:
+                                    remove_renditions("announcements", path)
                             # Delete DB
                             supabase.table("announcement_files").delete().eq("announcement_id", ann["id"]).execute()
                             supabase.table("announcement_comments").delete().eq("announcement_id", ann["id"]).execute()
                             supabase.table("announcements").delete().eq("id", ann["id"]).execute()
                             st.success("Announcement deleted permanently")
-                            st.cache_data.clear()
+                            invalidate("announcements", "announcement_files", "announcement_comments")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Delete failed: {str(e)}")
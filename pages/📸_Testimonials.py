@@ -1,6 +1,5 @@
 # pages/📸_Testimonials.py
 import streamlit as st
-import requests
 from datetime import date
 
 # ────────────────────────────────────────────────
@@ -10,6 +9,10 @@ from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
 from utils.helpers import upload_to_supabase, log_action
+from utils.signed_urls import get_signed_urls
+from utils.media import prepare_images, show_image
+from utils.renditions import schedule_renditions, remove_renditions
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth(min_role="client")  # clients submit, everyone views approved, owner/admin approves
@@ -47,19 +50,19 @@ st.markdown("**Empire motivation hub** • Share your success stories + photos (
 current_role = st.session_state.get("role", "guest").lower()
 
 # ─── ULTRA-REALTIME FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing testimonials...")
+@cached_query("testimonials", "users", ttl=10, show_spinner="Syncing testimonials...")
 def fetch_testimonials_full():
     try:
         # Approved
         approved = supabase.table("testimonials") \
-            .select("id, client_name, message, image_url, storage_path, date_submitted, status") \
+            .select("id, client_name, message, image_url, storage_path, thumb_url, thumb_path, medium_url, medium_path, date_submitted, status") \
             .eq("status", "Approved") \
             .order("date_submitted", desc=True) \
             .execute().data or []
 
         # Pending
         pending = supabase.table("testimonials") \
-            .select("id, client_name, message, image_url, storage_path, date_submitted, status") \
+            .select("id, client_name, message, image_url, storage_path, thumb_url, thumb_path, medium_url, medium_path, date_submitted, status") \
             .eq("status", "Pending") \
             .order("date_submitted", desc=True) \
             .execute().data or []
@@ -68,24 +71,18 @@ def fetch_testimonials_full():
         users = supabase.table("users").select("full_name, balance").execute().data or []
         user_map = {u["full_name"]: u.get("balance", 0) for u in users}
 
-        # Image URLs: public first, then fresh signed
+        # Image URLs: public first, else cached/bulk signed (original + renditions)
         all_testis = approved + pending
+        to_sign = []
         for t in all_testis:
-            public_url = t.get("image_url")  # direct public URL if bucket public
-            signed_url = None
-
-            if not public_url and t.get("storage_path"):
-                try:
-                    signed = supabase.storage.from_("testimonials").create_signed_url(
-                        t["storage_path"], expires_in=3600 * 24  # 24 hours - fresh on load
-                    )
-                    signed_url = signed.signed_url
-                    # Temporary debug - comment out after testing
-                    # st.write(f"Generated signed URL for {t['client_name']}: {signed_url}")
-                except Exception as sign_err:
-                    st.warning(f"Signed URL failed for {t['client_name']}: {str(sign_err)}")
-
-            t["display_url"] = public_url or signed_url
+            if not t.get("image_url") and t.get("storage_path"):
+                to_sign += [t["storage_path"], t.get("thumb_path"), t.get("medium_path")]
+        signed_map = get_signed_urls("testimonials", to_sign)
+        for t in all_testis:
+            t["display_url"] = t.get("image_url") or signed_map.get(t.get("storage_path"))
+            # Grid = thumb, review = medium; fall back to original until renditions are ready
+            t["thumb_display_url"] = t.get("thumb_url") or signed_map.get(t.get("thumb_path")) or t["display_url"]
+            t["medium_display_url"] = t.get("medium_url") or signed_map.get(t.get("medium_path")) or t["display_url"]
 
         return approved, pending, user_map
     except Exception as e:
@@ -95,7 +92,7 @@ def fetch_testimonials_full():
 approved, pending, user_map = fetch_testimonials_full()
 
 if st.button("🔄 Refresh Testimonials Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_testimonials_full.clear()
     st.rerun()
 
 st.caption("🔄 Testimonials auto-refresh every 10s • Photos permanent & fully visible")
@@ -122,7 +119,7 @@ if current_role == "client":
                                 bucket="testimonials",
                                 folder="photos"
                             )
-                            supabase.table("testimonials").insert({
+                            resp = supabase.table("testimonials").insert({
                                 "client_name": my_name,
                                 "message": story.strip(),
                                 "image_url": url,
@@ -130,9 +127,12 @@ if current_role == "client":
                                 "date_submitted": date.today().isoformat(),
                                 "status": "Pending"
                             }).execute()
+                            # Thumb + medium generated in the background (process pool)
+                            schedule_renditions(photo.getvalue(), photo.name, "testimonials", storage_path,
+                                                "testimonials", resp.data[0]["id"], public=bool(url))
                             st.success("Testimonial submitted permanently! Photo will be visible once approved.")
                             st.balloons()
-                            st.cache_data.clear()
+                            invalidate("testimonials")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Submission failed: {str(e)}")
@@ -146,6 +146,8 @@ if approved:
         s = search.lower()
         filtered_approved = [t for t in approved if s in t["message"].lower() or s in t["client_name"].lower()]
 
+    image_sources = prepare_images((t.get("thumb_path") or t.get("storage_path") or t["id"], t.get("thumb_display_url")) for t in filtered_approved)
+
     cols = st.columns(3)
     for idx, t in enumerate(filtered_approved):
         with cols[idx % 3]:
@@ -164,17 +166,7 @@ if approved:
             """, unsafe_allow_html=True)
 
             if display_url:
-                try:
-                    r = requests.get(display_url, timeout=5)
-                    if r.status_code == 200:
-                        st.image(r.content, use_column_width=True, caption=t["client_name"])
-                    else:
-                        st.caption(f"Image unavailable (status {r.status_code})")
-                        # Debug
-                        st.write("Failed URL:", display_url)
-                except Exception as load_err:
-                    st.caption("Image load error")
-                    st.write("Load error:", str(load_err))
+                show_image(image_sources.get(t.get("thumb_path") or t.get("storage_path") or t["id"]), caption=t["client_name"])
             else:
                 st.markdown("<div style='height:180px; background:rgba(50,55,65,0.5); border-radius:10px; display:flex; align-items:center; justify-content:center; color:#aaa;'>No Photo</div>", unsafe_allow_html=True)
 
@@ -188,21 +180,13 @@ else:
 # ─── PENDING APPROVAL (OWNER/ADMIN ONLY) ───
 if current_role in ["owner", "admin"] and pending:
     st.subheader("⏳ Pending Approval")
+    pending_sources = prepare_images((p.get("medium_path") or p.get("storage_path") or p["id"], p.get("medium_display_url")) for p in pending)
     for p in pending:
         balance = user_map.get(p["client_name"], 0)
         display_url = p.get("display_url")
         with st.expander(f"{p['client_name']} • {p['date_submitted']} • Balance ${balance:,.2f}", expanded=False):
             if display_url:
-                try:
-                    r = requests.get(display_url, timeout=5)
-                    if r.status_code == 200:
-                        st.image(r.content, use_column_width=True, caption="Submitted Photo")
-                    else:
-                        st.caption(f"Image unavailable (status {r.status_code})")
-                        st.write("Failed URL:", display_url)
-                except Exception as load_err:
-                    st.caption("Image load error")
-                    st.write("Load error:", str(load_err))
+                show_image(pending_sources.get(p.get("medium_path") or p.get("storage_path") or p["id"]), caption="Submitted Photo")
             else:
                 st.caption("No photo uploaded")
             st.markdown(p["message"])
@@ -221,7 +205,7 @@ if current_role in ["owner", "admin"] and pending:
                         }).execute()
                         st.success("Approved & announced empire-wide!")
                         st.balloons()
-                        st.cache_data.clear()
+                        invalidate("testimonials", "announcements")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Approve failed: {str(e)}")
@@ -230,9 +214,10 @@ if current_role in ["owner", "admin"] and pending:
                     try:
                         if p.get("storage_path"):
                             supabase.storage.from_("testimonials").remove([p["storage_path"]])
+                            remove_renditions("testimonials", p["storage_path"])
                         supabase.table("testimonials").delete().eq("id", p["id"]).execute()
                         st.success("Rejected & deleted permanently")
-                        st.cache_data.clear()
+                        invalidate("testimonials")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Reject failed: {str(e)}")
@@ -8,6 +8,7 @@ from datetime import date, datetime, timedelta
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.query_cache import cached_query, invalidate
 
 render_sidebar()
 require_auth(min_role="owner")  # strict — owner only
@@ -58,7 +59,7 @@ def mt_encrypt(plain: str, key: str) -> str:
     return ''.join(f'{b:02X}' for b in result).upper()
 
 # ─── REALTIME DATA FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing clients & licenses...")
+@cached_query("users", "client_licenses", ttl=10, show_spinner="Syncing clients & licenses...")
 def fetch_license_data():
     try:
         clients = supabase.table("users").select("id, full_name, balance, role").eq("role", "client").execute().data or []
@@ -72,7 +73,7 @@ def fetch_license_data():
 clients, history, user_map = fetch_license_data()
 
 if st.button("🔄 Refresh License Data", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    fetch_license_data.clear()
     st.rerun()
 
 if not clients:
@@ -197,7 +198,7 @@ string UNIQUE_KEY = "{unique_key}";
 string ENC_DATA   = "{enc_data_hex}";
             ''', language="cpp")
 
-            st.cache_data.clear()
+            invalidate("client_licenses")
             st.rerun()
 
         except Exception as e:
@@ -262,7 +263,7 @@ if history:
                             if already_exp:
                                 msg += " (was already expired)"
                             st.success(msg)
-                            st.cache_data.clear()
+                            invalidate("client_licenses")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Revoke failed: {str(e)}")
@@ -274,7 +275,7 @@ if history:
                     try:
                         supabase.table("client_licenses").delete().eq("id", h["id"]).execute()
                         st.success("License deleted permanently")
-                        st.cache_data.clear()
+                        invalidate("client_licenses")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Delete failed: {str(e)}")
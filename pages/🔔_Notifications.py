@@ -1,6 +1,5 @@
 # pages/🔔_Notifications.py
 import streamlit as st
-from datetime import date
 
 # ────────────────────────────────────────────────
 # AUTH + SIDEBAR + REQUIRE AUTH (must be first)
@@ -8,6 +7,12 @@ from datetime import date
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.query_cache import cached_query, invalidate
+from utils.change_feed import watch_tables
+from utils.notifications import (
+    send_notification, fetch_client_notifications, fetch_recent_notifications, unread_count, mark_read,
+    mark_all_read
+)
 
 render_sidebar()
 require_auth(min_role="client")  # clients see their own, admin/owner see/send to all
@@ -44,41 +49,50 @@ st.markdown("**Realtime alert system** • Auto-push on profits, withdrawals, li
 
 current_role = st.session_state.get("role", "guest").lower()
 
-# ─── ULTRA-REALTIME FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing notifications...")
-def fetch_notifications_full():
+# ─── REALTIME FETCH (pushed by the change feed; TTL is just a safety net) ───
+feed = watch_tables("notifications", key="notifications")
+
+@cached_query("users", ttl=feed.ttl(10, "users"), show_spinner="Syncing team...")
+def fetch_user_directory():
     try:
-        notifs = supabase.table("notifications").select("*").order("date", desc=True).execute().data or []
         users = supabase.table("users").select("id, full_name, balance, role").execute().data or []
         user_map = {u["full_name"]: {"balance": u.get("balance", 0)} for u in users}
         client_names = sorted(u["full_name"] for u in users if u["role"] == "client")
-        return notifs, user_map, client_names
+        return user_map, client_names
     except Exception as e:
         st.error(f"Notifications sync error: {str(e)}")
-        return [], {}, []
+        return {}, []
 
-notifications, user_map, client_names = fetch_notifications_full()
+user_map, client_names = fetch_user_directory()
 
 if st.button("🔄 Refresh Notifications Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    invalidate("notifications")
     st.rerun()
 
-st.caption("🔄 Notifications auto-refresh every 10s • Auto-generated on key empire events")
+st.caption("🔄 Notifications update live via the realtime feed • Auto-generated on key empire events")
 
 # ─── CLIENT VIEW: Own notifications + unread count ───
-if current_role == "client":
-    my_name = st.session_state.get("full_name", "")
-    my_notifications = [n for n in notifications if n.get("client_name") == my_name]
-    unread_count = sum(1 for n in my_notifications if n.get("read", 0) == 0)
-    st.subheader("Your Notifications 🔔")
-    if unread_count > 0:
-        st.markdown(f"### 🟡 {unread_count} Unread Alert{'s' if unread_count != 1 else ''}")
+try:
+    if current_role == "client":
+        # Own rows only (server-side filter) + badge from the maintained counter
+        my_name = st.session_state.get("full_name", "")
+        my_notifications = fetch_client_notifications(my_name)
+        my_unread = unread_count(my_name)
+        st.subheader("Your Notifications 🔔")
+        if my_unread > 0:
+            st.markdown(f"### 🟡 {my_unread} Unread Alert{'s' if my_unread != 1 else ''}")
+            if st.button("✅ Mark All as Read", use_container_width=True):
+                mark_all_read(my_name)
+                st.rerun()
+        else:
+            st.markdown("### ✅ All caught up!")
     else:
-        st.markdown("### ✅ All caught up!")
-else:
-    # OWNER/ADMIN: Full view
-    my_notifications = notifications
-    st.subheader("All Empire Notifications")
+        # OWNER/ADMIN: latest across the empire
+        my_notifications = fetch_recent_notifications()
+        st.subheader("All Empire Notifications")
+except Exception as e:
+    st.error(f"Notifications sync error: {str(e)}")
+    my_notifications = []
 
 # ─── SEND NEW NOTIFICATION (OWNER/ADMIN ONLY) ───
 if current_role in ["owner", "admin"]:
@@ -98,33 +112,12 @@ if current_role in ["owner", "admin"]:
                 st.error("Title and message are required")
             else:
                 try:
-                    inserts = []
-                    if target == "All Clients":
-                        for name in client_names:
-                            inserts.append({
-                                "client_name": name,
-                                "title": title.strip(),
-                                "message": message.strip(),
-                                "date": date.today().isoformat(),
-                                "category": category,
-                                "read": 0
-                            })
-                    else:
-                        inserts.append({
-                            "client_name": target,
-                            "title": title.strip(),
-                            "message": message.strip(),
-                            "date": date.today().isoformat(),
-                            "category": category,
-                            "read": 0
-                        })
-
-                    if inserts:
-                        supabase.table("notifications").insert(inserts).execute()
-
-                    st.success(f"Notification sent to **{'all clients' if target == 'All Clients' else target}**!")
+                    recipients = client_names if target == "All Clients" else [target]
+                    # Chunked fan-out — bounded payload per request kahit libo-libo ang clients
+                    sent = send_notification(recipients, title.strip(), message.strip(), category)
+
+                    st.success(f"Notification sent to **{'all clients' if target == 'All Clients' else target}** ({sent:,})!")
                     st.balloons()
-                    st.cache_data.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Send failed: {str(e)}")
@@ -196,9 +189,8 @@ if filtered:
             if is_unread and current_role == "client":
                 if st.button("Mark as Read", key=f"read_{n['id']}", use_container_width=True):
                     try:
-                        supabase.table("notifications").update({"read": 1}).eq("id", n["id"]).execute()
+                        mark_read([n["id"]])
                         st.success("Marked as read!")
-                        st.cache_data.clear()
                         st.rerun()
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
@@ -209,7 +201,7 @@ if filtered:
                     try:
                         supabase.table("notifications").delete().eq("id", n["id"]).execute()
                         st.success("Notification deleted")
-                        st.cache_data.clear()
+                        invalidate("notifications")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Delete failed: {str(e)}")
@@ -1,7 +1,9 @@
 # pages/🔮_Simulator.py
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import time
 from datetime import date, timedelta
 
 # ────────────────────────────────────────────────
@@ -10,6 +12,9 @@ from datetime import date, timedelta
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.query_cache import cached_query
+from utils.simulation import monthly_account_returns, run_monte_carlo
+from utils.scenario_sweep import SWEEP_PARAMS, run_sweep, break_even_points
 
 render_sidebar()
 require_auth(min_role="client")  # everyone can simulate, but data is empire-wide
@@ -42,10 +47,10 @@ setTimeout(forceScrollToTop, 2000);
 """, unsafe_allow_html=True)
 
 st.header("🔮 Empire Growth Simulator")
-st.markdown("**Advanced scaling forecaster** • Auto-loaded from current empire (accounts, equity, GF balance, avg profits per account, actual Growth Fund %, unit value) via materialized views + realtime data • Simulate scenarios • Projected equity, distributions, growth fund, units • Realtime multi-line charts • Sankey flow previews • Professional planning tool")
+st.markdown("**Advanced scaling forecaster** • Auto-loaded from current empire (accounts, equity, GF balance, avg profits per account, actual Growth Fund %, unit value) via materialized views + realtime data • Simulate scenarios • Monte Carlo P5/P50/P95 bands bootstrapped from real monthly profits • Scenario sweep heatmaps + break-even frontier • Projected equity, distributions, growth fund, units • Realtime multi-line charts • Sankey flow previews • Professional planning tool")
 
 # ─── FULL INSTANT CACHE — MATERIALIZED VIEWS + REALTIME CALCS FOR ACCURATE DEFAULTS ───
-@st.cache_data(ttl=60, show_spinner="Loading current empire stats for simulation...")
+@cached_query("ftmo_accounts", "profits", "growth_fund_transactions", ttl=60, show_spinner="Loading current empire stats for simulation...")
 def fetch_simulator_data():
     try:
         # Instant core stats from materialized views
@@ -58,7 +63,7 @@ def fetch_simulator_data():
 
         # Accurate averages from lightweight tables
         accounts = supabase.table("ftmo_accounts").select("unit_value, participants_v2").execute().data or []
-        profits  = supabase.table("profits").select("gross_profit, record_date").execute().data or []
+        profits  = supabase.table("profits").select("account_id, gross_profit, record_date").execute().data or []
 
         # Avg monthly gross PER ACCOUNT (historical mean)
         avg_per_acc = 15000.0  # sensible fallback
@@ -90,19 +95,35 @@ def fetch_simulator_data():
         unit_values = [a.get("unit_value", 3000.0) for a in accounts if a.get("unit_value", 0) > 0]
         avg_unit_value = sum(unit_values) / len(unit_values) if unit_values else 3000.0
 
+        # Monthly per-account gross samples for the Monte Carlo bootstrap
+        monthly_returns = monthly_account_returns(profits).tolist()
+
         return (
             total_equity, total_accounts, float(avg_per_acc),
-            float(avg_gf_pct), float(avg_unit_value), gf_balance
+            float(avg_gf_pct), float(avg_unit_value), gf_balance, monthly_returns
         )
     except Exception as e:
         st.error(f"Simulator data fetch error: {str(e)}")
-        return 0.0, 0, 15000.0, 10.0, 3000.0, 0.0
+        return 0.0, 0, 15000.0, 10.0, 3000.0, 0.0, []
 
 (
     total_equity, total_accounts, avg_per_acc,
-    avg_gf_pct, avg_unit_value, gf_balance
+    avg_gf_pct, avg_unit_value, gf_balance, monthly_returns
 ) = fetch_simulator_data()
 
+@cached_query("growth_fund_transactions", ttl=60)
+def fetch_avg_gf_spend() -> float:
+    """Historical average monthly Growth Fund outflow (challenge fees, payouts)"""
+    try:
+        rows = supabase.table("growth_fund_transactions").select("date, amount").eq("type", "Out").execute().data or []
+    except Exception:
+        return 0.0
+    if not rows:
+        return 0.0
+    df = pd.DataFrame(rows)
+    df["date"] = pd.to_datetime(df["date"])
+    return float(df.groupby(df["date"].dt.to_period("M"))["amount"].sum().mean())
+
 st.info(f"**Instant Auto-Loaded Empire Stats:** {total_accounts} accounts • Total Equity **${total_equity:,.0f}** • Avg Monthly Gross per Account **${avg_per_acc:,.0f}** • Avg Growth Fund % **{avg_gf_pct:.1f}%** • Avg Unit Value **${avg_unit_value:,.0f}** • Current GF **${gf_balance:,.0f}**")
 
 # ─── SIMULATION INPUTS (ACCURATE DEFAULTS) ───
@@ -134,6 +155,13 @@ with col_sim2:
         help="Auto-loaded average unit value from FTMO accounts"
     )
     monthly_manual_in = st.number_input("Additional Monthly Manual In to GF (USD)", value=0.0, step=1000.0)
+    n_paths = st.select_slider(
+        "Monte Carlo Paths",
+        options=[10_000, 25_000, 50_000, 100_000],
+        value=25_000,
+        format_func=lambda n: f"{n:,}",
+        help=f"Each path resamples real monthly per-account profits ({len(monthly_returns):,} account-months in history)"
+    )
     scenario_name = st.text_input("Scenario Name", value="Elite Scaling Plan 2026")
 
 # Auto-calculated monthly totals
@@ -151,40 +179,47 @@ col_calc4.metric("Monthly Units Generated", f"{monthly_units:.2f}")
 # ─── RUN SIMULATION ───
 if st.button("🚀 Run Simulation", type="primary", use_container_width=True):
     with st.spinner("Running empire growth simulation..."):
-        # Starting points
-        start_equity = total_equity
-        start_gf     = gf_balance
-        dates        = [date.today() + timedelta(days=30 * i) for i in range(months + 1)]
-
-        # Projections
-        equity_proj      = [start_equity]
-        gf_proj          = [start_gf]
-        distributed_proj = [0.0]
-        units_proj       = [0.0]
-
-        for _ in range(months):
-            gross       = monthly_gross_total
-            gf_add      = monthly_gf_add
-            distributed = monthly_distributed
-            units       = monthly_units
-
-            new_equity = equity_proj[-1] + gross
-            new_gf     = gf_proj[-1] + gf_add
-
-            equity_proj.append(new_equity)
-            gf_proj.append(new_gf)
-            distributed_proj.append(distributed_proj[-1] + distributed)
-            units_proj.append(units_proj[-1] + units)
-
-        # Multi-line projection chart
+        dates = [date.today() + timedelta(days=30 * i) for i in range(months + 1)]
+
+        sim_start = time.perf_counter()
+        sim = run_monte_carlo(
+            monthly_returns,
+            accounts=projected_accounts,
+            months=months,
+            n_paths=n_paths,
+            target_mean=monthly_gross_per_acc,
+            start_equity=total_equity,
+            start_gf=gf_balance,
+            gf_pct=gf_percentage,
+            manual_in=monthly_manual_in,
+            unit_value=unit_value_proj
+        )
+        sim_ms = (time.perf_counter() - sim_start) * 1000
+
+        # Multi-line projection chart — P50 line + shaded P5–P95 band per series
+        series = [
+            ("equity",      "Total Equity",       accent_primary, "0,255,170",   6, None),
+            ("growth_fund", "Growth Fund",        accent_gold,    "255,215,0",   6, None),
+            ("distributed", "Distributed Shares", "#00ffcc",      "0,255,204",   5, None),
+            ("units",       "Cumulative Units",   "#ff6b6b",      "255,107,107", 5, "dot"),
+        ]
         fig_multi = go.Figure()
-        fig_multi.add_trace(go.Scatter(x=dates, y=equity_proj,      name="Total Equity",      line=dict(color=accent_primary, width=6)))
-        fig_multi.add_trace(go.Scatter(x=dates, y=gf_proj,          name="Growth Fund",        line=dict(color=accent_gold,    width=6)))
-        fig_multi.add_trace(go.Scatter(x=dates, y=distributed_proj, name="Distributed Shares", line=dict(color="#00ffcc",       width=5)))
-        fig_multi.add_trace(go.Scatter(x=dates, y=units_proj,       name="Cumulative Units",   line=dict(color="#ff6b6b",      width=5, dash="dot")))
+        for key, label, color, rgb, width, dash in series:
+            p5, p50, p95 = sim[key]
+            fig_multi.add_trace(go.Scatter(
+                x=dates, y=p95, line=dict(width=0), showlegend=False, hoverinfo="skip", legendgroup=key
+            ))
+            fig_multi.add_trace(go.Scatter(
+                x=dates, y=p5, fill="tonexty", fillcolor=f"rgba({rgb},0.15)", line=dict(width=0),
+                name=f"{label} P5–P95", legendgroup=key, hoverinfo="skip"
+            ))
+            fig_multi.add_trace(go.Scatter(
+                x=dates, y=p50, name=f"{label} (P50)", legendgroup=key,
+                line=dict(color=color, width=width, dash=dash)
+            ))
 
         fig_multi.update_layout(
-            title=f"{scenario_name} — Empire Growth Trajectory ({months} months)",
+            title=f"{scenario_name} — Empire Growth Trajectory ({months} months, {n_paths:,} paths)",
             height=620,
             hovermode="x unified",
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
@@ -193,13 +228,21 @@ if st.button("🚀 Run Simulation", type="primary", use_container_width=True):
             margin=dict(l=40, r=40, t=80, b=40)
         )
         st.plotly_chart(fig_multi, use_container_width=True)
+        st.caption(f"🎲 {n_paths:,} paths × {months} months simulated in {sim_ms:,.0f} ms • Bands = P5 / P50 / P95")
+        if sim["fit"] == "shift":
+            st.caption("⚠️ Historical average per account is ≤ 0 — monthly returns were shifted (not rescaled) to hit the target average")
 
-        # Final key metrics
+        # Final key metrics (median, with the P5–P95 range underneath)
         col_final1, col_final2, col_final3, col_final4 = st.columns(4)
-        col_final1.metric("Final Total Equity", f"${equity_proj[-1]:,.0f}")
-        col_final2.metric("Final Growth Fund", f"${gf_proj[-1]:,.0f}")
-        col_final3.metric("Total Distributed Shares", f"${distributed_proj[-1]:,.0f}")
-        col_final4.metric("Total Units Generated", f"{units_proj[-1]:.2f}")
+        for col, key, label, fmt in [
+            (col_final1, "equity",      "Final Total Equity",       "${:,.0f}"),
+            (col_final2, "growth_fund", "Final Growth Fund",        "${:,.0f}"),
+            (col_final3, "distributed", "Total Distributed Shares", "${:,.0f}"),
+            (col_final4, "units",       "Total Units Generated",    "{:,.2f}"),
+        ]:
+            p5, p50, p95 = sim[key][:, -1]
+            col.metric(label, fmt.format(p50))
+            col.caption(f"P5 {fmt.format(p5)} • P95 {fmt.format(p95)}")
 
         # Average monthly Sankey flow preview
         st.subheader("Projected Average Monthly Flow")
@@ -244,6 +287,126 @@ if st.button("🚀 Run Simulation", type="primary", use_container_width=True):
         else:
             st.info("No gross profit projected in this scenario")
 
+# ─── SCENARIO SWEEP (full grid, process pool, memoized) ───
+st.subheader("🧪 Scenario Sweep & Break-Even Frontier")
+st.caption("Sweep 2–3 parameters at once • Unswept parameters use the values above • End states are Monte Carlo medians • Break-even = Growth Fund neither grows nor shrinks over the horizon")
+
+avg_gf_spend = fetch_avg_gf_spend()
+col_sw1, col_sw2 = st.columns([2, 1])
+with col_sw1:
+    sweep_keys = st.multiselect(
+        "Parameters to sweep (2–3)",
+        list(SWEEP_PARAMS),
+        default=["accounts", "gf_pct"],
+        format_func=SWEEP_PARAMS.get,
+        max_selections=3,
+        key="sweep_keys"
+    )
+with col_sw2:
+    gf_spend = st.number_input(
+        "Monthly GF Spend (USD)",
+        value=round(avg_gf_spend, 2),
+        min_value=0.0,
+        step=1000.0,
+        help="Auto-loaded from historical monthly 'Out' Growth Fund transactions"
+    )
+
+sweep_defaults = {
+    "accounts":      (float(max(total_accounts, 1)), float(total_accounts + 100), 50),
+    "gf_pct":        (0.0, 50.0, 50),
+    "gross_per_acc": (round(monthly_gross_per_acc * 0.25), round(monthly_gross_per_acc * 2), 50),
+    "manual_in":     (0.0, 20000.0, 10),
+    "gf_spend":      (0.0, float(max(gf_spend * 3, 10000.0)), 10),
+}
+axes = {}
+for key in sweep_keys:
+    lo, hi, n = sweep_defaults[key]
+    col_r1, col_r2, col_r3 = st.columns(3)
+    v_min = col_r1.number_input(f"{SWEEP_PARAMS[key]} — from", value=lo, key=f"sweep_{key}_min")
+    v_max = col_r2.number_input("to", value=hi, key=f"sweep_{key}_max")
+    steps = col_r3.number_input("steps", min_value=2, max_value=100, value=n, key=f"sweep_{key}_steps")
+    values = np.linspace(v_min, v_max, int(steps))
+    if key == "accounts":
+        values = np.unique(np.rint(values).clip(min=0))
+    axes[key] = values.tolist()
+
+if len(sweep_keys) < 2:
+    st.info("Pick at least 2 parameters to sweep")
+elif st.button("🧪 Run Sweep", type="primary", use_container_width=True):
+    fixed = {
+        "accounts": projected_accounts,
+        "gf_pct": gf_percentage,
+        "gross_per_acc": monthly_gross_per_acc,
+        "manual_in": monthly_manual_in,
+        "gf_spend": gf_spend,
+    }
+    try:
+        with st.spinner("Sweeping scenario grid..."):
+            st.session_state.sim_sweep = run_sweep(monthly_returns, fixed, axes, months, gf_balance)
+    except ValueError as e:
+        st.error(str(e))
+
+if st.session_state.get("sim_sweep"):
+    sweep, from_cache = st.session_state.sim_sweep
+    (x_key, x_vals), (y_key, y_vals), *rest = sweep["axes"]
+    pick = lambda arr: arr
+    layer_note = ""
+    if rest:
+        z_key, z_vals = rest[0]
+        z_i = st.select_slider(
+            f"{SWEEP_PARAMS[z_key]} (3rd axis)",
+            options=list(range(len(z_vals))),
+            format_func=lambda i: f"{z_vals[i]:,.1f}",
+            key="sweep_layer"
+        )
+        pick = lambda arr: arr[:, :, z_i]
+        layer_note = f" • {SWEEP_PARAMS[z_key]} = {z_vals[z_i]:,.1f}"
+
+    timing = "⚡ From cache" if from_cache else f"⏱️ {sweep['seconds']:.2f}s"
+    st.caption(
+        f"{timing} • {sweep['grid_points']:,} scenarios • "
+        f"{sweep['simulations']} Monte Carlo runs on {sweep['workers']} worker(s){layer_note}"
+    )
+    if sweep.get("fit") == "shift":
+        st.caption("⚠️ Historical average per account is ≤ 0 — gross per account is applied as a shift, not a rescale")
+
+    net_p50 = pick(sweep["net_growth_fund_p50"])
+    net_p5  = pick(sweep["net_growth_fund_p5"])
+    col_h1, col_h2 = st.columns(2)
+    for col, key, title, scale in [
+        (col_h1, "growth_fund_p50", "End Growth Fund (P50)", [[0, "#0a0f1a"], [1, accent_gold]]),
+        (col_h2, "distributed_p50", "Total Distributed (P50)", [[0, "#0a0f1a"], [1, accent_primary]]),
+    ]:
+        fig_sweep = go.Figure(go.Heatmap(
+            z=pick(sweep[key]).T, x=x_vals, y=y_vals, colorscale=scale,
+            colorbar=dict(title="USD"),
+            hovertemplate=f"{SWEEP_PARAMS[x_key]}: %{{x:,.1f}}<br>{SWEEP_PARAMS[y_key]}: %{{y:,.1f}}<br>$%{{z:,.0f}}<extra></extra>"
+        ))
+        for net, dash, label in [(net_p50, "solid", "Break-even (P50)"), (net_p5, "dash", "Break-even (P5)")]:
+            fig_sweep.add_trace(go.Contour(
+                z=net.T, x=x_vals, y=y_vals, showscale=False, name=label, showlegend=True,
+                contours=dict(start=0, end=0, size=1, coloring="lines"),
+                line=dict(color="#ff6b6b", width=3, dash=dash), hoverinfo="skip"
+            ))
+        fig_sweep.update_layout(
+            title=title, height=480,
+            xaxis_title=SWEEP_PARAMS[x_key], yaxis_title=SWEEP_PARAMS[y_key],
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=40, r=20, t=80, b=40)
+        )
+        col.plotly_chart(fig_sweep, use_container_width=True)
+
+    with st.expander("📉 Break-Even Frontier"):
+        p50_points = dict(break_even_points(x_vals, y_vals, net_p50))
+        p5_points = dict(break_even_points(x_vals, y_vals, net_p5))
+        frontier_df = pd.DataFrame({
+            SWEEP_PARAMS[x_key]: x_vals,
+            f"{SWEEP_PARAMS[y_key]} @ break-even (P50)": [p50_points[x] for x in x_vals],
+            f"{SWEEP_PARAMS[y_key]} @ break-even (P5)": [p5_points[x] for x in x_vals],
+        })
+        st.dataframe(frontier_df, use_container_width=True, hide_index=True)
+        st.caption("Empty = Growth Fund stays on one side of break-even across the whole swept range")
+
 # ─── MOTIVATIONAL FOOTER (sync style) ───
 st.markdown(f"""
 <div style="padding:4rem 2rem; text-align:center; margin:5rem auto; max-width:1100px;
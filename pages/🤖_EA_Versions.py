@@ -1,7 +1,8 @@
 # pages/🤖_EA_Versions.py
 import streamlit as st
-import requests
-from datetime import date
+import pandas as pd
+import plotly.graph_objects as go
+from datetime import date, timedelta
 
 # ────────────────────────────────────────────────
 # AUTH + SIDEBAR + REQUIRE AUTH (must be first)
@@ -9,6 +10,9 @@ from datetime import date
 from utils.auth import require_auth
 from utils.sidebar import render_sidebar
 from utils.supabase_client import supabase
+from utils.http_transport import get_http_client
+from utils.query_cache import cached_query, invalidate
+from utils.change_feed import watch_tables
 
 render_sidebar()
 require_auth(min_role="client")  # clients download (gated), owner releases
@@ -45,40 +49,46 @@ st.markdown("**Elite EA distribution** • Owner release with changelog • Auto
 
 current_role = st.session_state.get("role", "guest").lower()
 
-# ─── ULTRA-REALTIME FETCH (10s TTL) ───
-@st.cache_data(ttl=10, show_spinner="Syncing EA versions...")
-def fetch_ea_full():
+# ─── REALTIME FETCH (pushed by the change feed; TTL is just a safety net) ───
+feed = watch_tables("ea_versions", "ea_downloads", "client_licenses", key="ea_versions")
+
+# Download counts come from ea_versions.download_count (trigger-maintained) —
+# hindi na hinihila ang buong ea_downloads table
+@cached_query("ea_versions", "ea_downloads", ttl=feed.ttl(10, "ea_versions", "ea_downloads"), show_spinner="Syncing EA versions...")
+def fetch_ea_versions():
     try:
-        versions = supabase.table("ea_versions").select("*").order("upload_date", desc=True).execute().data or []
-        downloads = supabase.table("ea_downloads").select("*").execute().data or []
-        download_counts = {}
-        for d in downloads:
-            vid = d["version_id"]
-            download_counts[vid] = download_counts.get(vid, 0) + 1
-
-        # Client license check (latest active non-revoked)
-        client_license = None
-        if current_role == "client":
-            my_name = st.session_state.get("full_name", "")
-            user_resp = supabase.table("users").select("id").eq("full_name", my_name).single().execute()
-            if user_resp.data:
-                user_id = user_resp.data["id"]
-                license_resp = supabase.table("client_licenses").select("allow_live, version, revoked").eq("account_id", user_id).order("date_generated", desc=True).limit(1).execute()
-                if license_resp.data and not license_resp.data[0].get("revoked", False):
-                    client_license = license_resp.data[0]
-
-        return versions, download_counts, client_license
+        return supabase.table("ea_versions").select("*").order("upload_date", desc=True).execute().data or []
     except Exception as e:
         st.error(f"EA versions sync error: {str(e)}")
-        return [], {}, None
+        return []
+
+# Client license check (latest active non-revoked) — one joined lookup via v_client_entitlements
+@cached_query("users", "client_licenses", ttl=feed.ttl(10, "users", "client_licenses"))
+def fetch_my_entitlement(my_name: str):
+    try:
+        rows = supabase.table("v_client_entitlements").select("allow_live, version, revoked") \
+            .eq("full_name", my_name).limit(1).execute().data or []
+    except Exception as e:
+        st.error(f"License check error: {str(e)}")
+        return None
+    if rows and not rows[0].get("revoked", False):
+        return rows[0]
+    return None
+
+@cached_query("ea_downloads", ttl=300)
+def fetch_download_trends(since: str):
+    return supabase.table("v_ea_download_trends").select("version_id, download_date, downloads") \
+        .gte("download_date", since).order("download_date").execute().data or []
 
-versions, download_counts, client_license = fetch_ea_full()
+versions = fetch_ea_versions()
+download_counts = {v["id"]: v.get("download_count") or 0 for v in versions}
+client_license = fetch_my_entitlement(st.session_state.get("full_name", "")) if current_role == "client" else None
 
 if st.button("🔄 Refresh EA Versions Now", type="secondary", use_container_width=True):
-    st.cache_data.clear()
+    invalidate("ea_versions", "ea_downloads")
     st.rerun()
 
-st.caption("🔄 Versions auto-refresh every 10s • EA files stored permanently in Supabase Storage")
+st.caption("🔄 Versions update live via the realtime feed • EA files stored permanently in Supabase Storage")
 
 # ─── RELEASE NEW VERSION (OWNER ONLY) ───
 if current_role == "owner":
@@ -121,7 +131,7 @@ if current_role == "owner":
 
                         st.success(f"Version **{version_name}** released permanently!")
                         st.balloons()
-                        st.cache_data.clear()
+                        invalidate("ea_versions", "announcements")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Release failed: {str(e)}")
@@ -129,6 +139,28 @@ if current_role == "owner":
 elif current_role == "admin":
     st.info("Admins can view versions & track downloads • Only owner can release new versions")
 
+# ─── DOWNLOAD TRENDS (OWNER/ADMIN) ───
+if current_role in ["owner", "admin"] and versions:
+    # Query only runs once toggled on (collapsed expander still executes its body every rerun)
+    if st.toggle("📈 Show Download Trends (last 90 days)", key="ea_show_trends"):
+        try:
+            trends = fetch_download_trends((date.today() - timedelta(days=90)).isoformat())
+        except Exception as e:
+            trends = []
+            st.error(f"Trend fetch error: {str(e)}")
+        if trends:
+            names = {v["id"]: v["version"] for v in versions}
+            df = pd.DataFrame(trends)
+            df["version"] = df["version_id"].map(names).fillna("Deleted version")
+            pivot = df.pivot_table(index="download_date", columns="version", values="downloads", aggfunc="sum").fillna(0)
+            fig = go.Figure()
+            for name in pivot.columns:
+                fig.add_trace(go.Scatter(x=pivot.index, y=pivot[name], mode="lines+markers", name=name))
+            fig.update_layout(height=380, template="plotly_dark", yaxis_title="Downloads / day")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.caption("No downloads in the last 90 days")
+
 # ─── REALTIME VERSION LIST ───
 st.subheader("Available EA Versions")
 if versions:
@@ -161,7 +193,7 @@ if versions:
 
             if file_url and can_download:
                 try:
-                    r = requests.get(file_url, timeout=10)
+                    r = get_http_client().get(file_url)
                     if r.status_code == 200:
                         if st.download_button(
                             f"⬇️ Download {v['version']}",
@@ -177,6 +209,7 @@ if versions:
                                     "downloaded_by": st.session_state.get("full_name", "User"),
                                     "download_date": date.today().isoformat()
                                 }).execute()
+                                invalidate("ea_downloads")
                                 st.success("Download tracked!")
                             except:
                                 pass  # silent fail on tracking
@@ -198,7 +231,7 @@ if versions:
                         supabase.table("ea_versions").delete().eq("id", vid).execute()
                         supabase.table("ea_downloads").delete().eq("version_id", vid).execute()
                         st.success("Version deleted permanently")
-                        st.cache_data.clear()
+                        invalidate("ea_versions", "ea_downloads")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Delete failed: {str(e)}")
@@ -0,0 +1,137 @@
+# pages/🩺_Query_Diagnostics.py
+import json
+
+import streamlit as st
+import pandas as pd
+
+# ────────────────────────────────────────────────
+# AUTH + SIDEBAR + REQUIRE AUTH (must be first)
+# ────────────────────────────────────────────────
+from utils.auth import require_auth
+from utils.sidebar import render_sidebar
+from utils.query_trace import get_traces, clear_traces, get_sample_rate, set_sample_rate
+
+render_sidebar()
+require_auth(min_role="owner")  # owner only — filters can contain client names
+
+N_PLUS_ONE_MIN = 3   # same query shape ≥ this many times in one rerun → flagged
+SLOW_TOP_N = 25
+
+st.header("🩺 Query Diagnostics")
+st.markdown("**Every Supabase call, per page & rerun** • Table, operation, filters, rows, payload & latency for each `.execute()` • Repeated query shapes (N+1) flagged • Slowest queries • Export JSON/CSV • Owner-only")
+
+current_role = st.session_state.get("role", "guest").lower()
+if current_role != "owner":
+    st.error("🔒 Query Diagnostics are **OWNER-ONLY**.")
+    st.stop()
+
+# ─── CONTROLS ───
+col_c1, col_c2, col_c3 = st.columns([3, 1, 1])
+with col_c1:
+    rate = st.slider(
+        "Sampling rate (whole reruns, this server process)",
+        min_value=0.0, max_value=1.0, value=float(get_sample_rate()), step=0.05,
+        help="1.0 = trace every rerun. Production: 0.05–0.1 keeps overhead negligible. Default from QUERY_TRACE_SAMPLE (0.05)."
+    )
+    if rate != get_sample_rate():
+        set_sample_rate(rate)
+with col_c2:
+    if st.button("🔄 Refresh", use_container_width=True):
+        st.rerun()
+with col_c3:
+    if st.button("🗑️ Clear Traces", use_container_width=True):
+        clear_traces()
+        st.rerun()
+
+traces = get_traces()
+if not traces:
+    st.info("No traced queries yet — open some pages (or raise the sampling rate) then refresh.")
+    st.stop()
+
+df = pd.DataFrame(traces)
+st.caption(f"Last {len(df):,} traced queries in this server process (ring buffer)")
+
+# ─── OVERVIEW ───
+reruns = df.groupby(["page", "session", "rerun"], sort=False)
+cols = st.columns(4)
+cols[0].metric("Traced Queries", f"{len(df):,}")
+cols[1].metric("Reruns", f"{reruns.ngroups:,}")
+cols[2].metric("Total DB Time", f"{df['ms'].sum() / 1000:,.2f} s")
+cols[3].metric("Data Transferred (est.)", f"{df['bytes'].sum() / 1024:,.1f} KB")
+
+# ─── PER PAGE ───
+st.subheader("📄 Per Page (per rerun)")
+per_rerun = reruns.agg(
+    started=("at", "min"),
+    queries=("table", "size"),
+    ms=("ms", "sum"),
+    rows=("rows", "sum"),
+    bytes=("bytes", "sum"),
+    errors=("error", lambda e: int((e != "").sum()))
+).reset_index()
+per_page = per_rerun.groupby("page").agg(
+    reruns=("rerun", "size"),
+    avg_queries=("queries", "mean"),
+    max_queries=("queries", "max"),
+    avg_ms=("ms", "mean"),
+    max_ms=("ms", "max"),
+    avg_kb=("bytes", lambda b: b.mean() / 1024),
+    errors=("errors", "sum")
+).round(1).sort_values("avg_ms", ascending=False).reset_index()
+st.dataframe(per_page, use_container_width=True, hide_index=True)
+
+with st.expander("🔁 Every Traced Rerun"):
+    st.dataframe(
+        per_rerun.sort_values("started", ascending=False).round({"ms": 1}),
+        use_container_width=True, hide_index=True
+    )
+
+# ─── N+1 ───
+st.subheader("🔂 Repeated Query Shapes (N+1 suspects)")
+repeated = df.groupby(["page", "session", "rerun", "table", "operation", "shape"]).agg(
+    calls=("ms", "size"),
+    total_ms=("ms", "sum"),
+    rows=("rows", "sum")
+).reset_index()
+repeated = repeated[repeated["calls"] >= N_PLUS_ONE_MIN].sort_values("calls", ascending=False)
+if repeated.empty:
+    st.success(f"No query shape ran {N_PLUS_ONE_MIN}+ times in a single rerun 🎉")
+else:
+    st.warning(f"{len(repeated)} rerun(s) repeat the same query shape — batch these with in_() or a join/view")
+    st.dataframe(repeated.round({"total_ms": 1}), use_container_width=True, hide_index=True)
+
+# ─── SLOWEST ───
+st.subheader(f"🐢 Slowest {SLOW_TOP_N} Queries")
+slow_cols = ["at", "page", "rerun", "fragment", "table", "operation", "filters", "rows", "bytes", "ms", "error"]
+st.dataframe(df.nlargest(SLOW_TOP_N, "ms")[slow_cols], use_container_width=True, hide_index=True)
+
+# ─── PER TABLE ───
+with st.expander("🗂️ Per Table"):
+    per_table = df.groupby(["table", "operation"]).agg(
+        calls=("ms", "size"),
+        avg_ms=("ms", "mean"),
+        p95_ms=("ms", lambda m: m.quantile(0.95)),
+        rows=("rows", "sum"),
+        kb=("bytes", lambda b: b.sum() / 1024)
+    ).round(1).sort_values("calls", ascending=False).reset_index()
+    st.dataframe(per_table, use_container_width=True, hide_index=True)
+
+# ─── EXPORT ───
+st.subheader("📤 Export")
+col_e1, col_e2 = st.columns(2)
+with col_e1:
+    st.download_button(
+        "⬇️ Download JSON",
+        json.dumps(traces, indent=2, default=str),
+        file_name=f"query_traces_{pd.Timestamp.now():%Y%m%d_%H%M}.json",
+        mime="application/json",
+        use_container_width=True
+    )
+with col_e2:
+    st.download_button(
+        "⬇️ Download CSV",
+        df.to_csv(index=False),
+        file_name=f"query_traces_{pd.Timestamp.now():%Y%m%d_%H%M}.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
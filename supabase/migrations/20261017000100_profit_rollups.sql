@@ -0,0 +1,63 @@
+-- supabase/migrations/20261017000100_profit_rollups.sql
+-- Pre-grouped profit / distribution rollups (kasama ng mv_empire_summary)
+-- Pages read a few KB from these instead of downloading the whole ledgers.
+
+-- ─── TOTALS (single row) ───
+create materialized view if not exists mv_profit_totals as
+select
+    1 as id,
+    coalesce((select sum(gross_profit) from profits), 0)::numeric as total_gross,
+    coalesce((select sum(share_amount) from profit_distributions where not coalesce(is_growth_fund, false)), 0)::numeric as total_distributed,
+    (select count(*) from profits) as profit_count,
+    (select count(*) from profit_distributions) as distribution_count;
+
+create unique index if not exists mv_profit_totals_id on mv_profit_totals (id);
+
+-- ─── PER-PARTICIPANT (non Growth Fund shares) ───
+create materialized view if not exists mv_participant_shares as
+select
+    coalesce(participant_name, 'Unknown') as participant_name,
+    sum(share_amount)::numeric as total_share,
+    count(*) as distribution_count
+from profit_distributions
+where not coalesce(is_growth_fund, false)
+group by coalesce(participant_name, 'Unknown');
+
+create unique index if not exists mv_participant_shares_name on mv_participant_shares (participant_name);
+
+-- ─── PER-MONTH GROSS PROFIT ───
+create materialized view if not exists mv_monthly_profits as
+select
+    to_char(record_date::date, 'YYYY-MM') as month,
+    sum(gross_profit)::numeric as gross_profit,
+    sum(coalesce(growth_fund_add, 0))::numeric as growth_fund_add,
+    count(*) as profit_count
+from profits
+group by to_char(record_date::date, 'YYYY-MM');
+
+create unique index if not exists mv_monthly_profits_month on mv_monthly_profits (month);
+
+-- ─── REFRESH (statement-level, once per write batch) ───
+create or replace function refresh_profit_rollups()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    refresh materialized view concurrently mv_profit_totals;
+    refresh materialized view concurrently mv_participant_shares;
+    refresh materialized view concurrently mv_monthly_profits;
+    return null;
+end;
+$$;
+
+drop trigger if exists trg_profits_refresh_rollups on profits;
+create trigger trg_profits_refresh_rollups
+    after insert or update or delete on profits
+    for each statement execute function refresh_profit_rollups();
+
+drop trigger if exists trg_distributions_refresh_rollups on profit_distributions;
+create trigger trg_distributions_refresh_rollups
+    after insert or update or delete on profit_distributions
+    for each statement execute function refresh_profit_rollups();
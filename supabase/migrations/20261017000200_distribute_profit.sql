@@ -0,0 +1,62 @@
+-- supabase/migrations/20261017000200_distribute_profit.sql
+-- Atomic "Record & Distribute Profit" — one RPC round-trip, one transaction.
+-- Balances are incremented in the database (balance = balance + share),
+-- kaya walang lost update kahit sabay mag-record ang dalawang admin.
+
+create or replace function distribute_profit(
+    p_account_id            uuid,
+    p_gross_profit          numeric,
+    p_record_date           date,
+    p_units_generated       numeric,
+    p_growth_fund_add       numeric,
+    p_contributor_share_pct numeric,
+    p_distributions         jsonb,          -- [{participant_name, participant_user_id, participant_role, percentage, share_amount, is_growth_fund}, ...]
+    p_account_source        text,
+    p_recorded_by           text
+)
+returns uuid
+language plpgsql
+security definer
+as $$
+declare
+    v_profit_id uuid;
+begin
+    insert into profits (account_id, gross_profit, record_date, units_generated, growth_fund_add, contributor_share_pct)
+    values (p_account_id, p_gross_profit, p_record_date, p_units_generated, p_growth_fund_add, p_contributor_share_pct)
+    returning id into v_profit_id;
+
+    insert into profit_distributions (
+        profit_id, participant_name, participant_user_id, participant_role,
+        percentage, share_amount, is_growth_fund
+    )
+    select
+        v_profit_id,
+        d->>'participant_name',
+        nullif(d->>'participant_user_id', '')::uuid,
+        d->>'participant_role',
+        (d->>'percentage')::numeric,
+        (d->>'share_amount')::numeric,
+        coalesce((d->>'is_growth_fund')::boolean, false)
+    from jsonb_array_elements(coalesce(p_distributions, '[]'::jsonb)) as d;
+
+    -- One set-based increment for every beneficiary (Growth Fund rows excluded)
+    update users u
+    set balance = coalesce(u.balance, 0) + inc.total
+    from (
+        select nullif(d->>'participant_user_id', '')::uuid as user_id,
+               sum((d->>'share_amount')::numeric) as total
+        from jsonb_array_elements(coalesce(p_distributions, '[]'::jsonb)) as d
+        where nullif(d->>'participant_user_id', '') is not null
+          and not coalesce((d->>'is_growth_fund')::boolean, false)
+        group by 1
+    ) as inc
+    where u.id = inc.user_id;
+
+    if p_growth_fund_add > 0 then
+        insert into growth_fund_transactions (date, type, amount, description, account_source, recorded_by)
+        values (p_record_date, 'In', p_growth_fund_add, 'Auto from ' || p_account_source || ' profit', p_account_source, p_recorded_by);
+    end if;
+
+    return v_profit_id;
+end;
+$$;
@@ -0,0 +1,21 @@
+-- supabase/migrations/20261017000300_image_renditions.sql
+-- Upload-time renditions (see utils/renditions.py). Filled in asynchronously
+-- after upload; NULL means "not ready yet" → pages fall back to the original.
+
+alter table testimonials
+    add column if not exists thumb_path  text,
+    add column if not exists thumb_url   text,
+    add column if not exists medium_path text,
+    add column if not exists medium_url  text;
+
+alter table announcement_files
+    add column if not exists thumb_path  text,
+    add column if not exists thumb_url   text,
+    add column if not exists medium_path text,
+    add column if not exists medium_url  text;
+
+alter table client_files
+    add column if not exists thumb_path  text,
+    add column if not exists thumb_url   text,
+    add column if not exists medium_path text,
+    add column if not exists medium_url  text;
@@ -0,0 +1,23 @@
+-- supabase/migrations/20261017000400_realtime_publication.sql
+-- Tables streamed to utils/change_feed.py (one postgres_changes subscription per server).
+-- Idempotent: skips tables na nasa publication na.
+
+do $$
+declare
+    t text;
+begin
+    foreach t in array array[
+        'messages', 'notifications', 'withdrawals', 'client_files',
+        'ea_versions', 'ea_downloads', 'client_licenses',
+        'announcements', 'announcement_comments', 'testimonials', 'waitlist'
+    ]
+    loop
+        if not exists (
+            select 1 from pg_publication_tables
+            where pubname = 'supabase_realtime' and schemaname = 'public' and tablename = t
+        ) then
+            execute format('alter publication supabase_realtime add table public.%I', t);
+        end if;
+    end loop;
+end;
+$$;
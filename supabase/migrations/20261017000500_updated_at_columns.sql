@@ -0,0 +1,29 @@
+-- supabase/migrations/20261017000500_updated_at_columns.sql
+-- updated_at on waitlist + messages so the Whitelist Monitor can tell
+-- "nothing changed" from one tiny (count, max(updated_at)) query.
+
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+alter table waitlist add column if not exists updated_at timestamptz not null default now();
+alter table messages add column if not exists updated_at timestamptz not null default now();
+
+drop trigger if exists waitlist_set_updated_at on waitlist;
+create trigger waitlist_set_updated_at
+    before update on waitlist
+    for each row execute function set_updated_at();
+
+drop trigger if exists messages_set_updated_at on messages;
+create trigger messages_set_updated_at
+    before update on messages
+    for each row execute function set_updated_at();
+
+create index if not exists idx_waitlist_updated_at on waitlist (updated_at desc);
+create index if not exists idx_messages_updated_at on messages (updated_at desc);
@@ -0,0 +1,49 @@
+-- supabase/migrations/20261017000600_notification_unread_counts.sql
+-- Per-client unread counter for the notification badge (utils/notifications.py).
+-- Maintained by triggers on notifications kaya isang row lookup lang ang badge.
+
+create table if not exists notification_unread_counts (
+    client_name text primary key,
+    unread      integer not null default 0
+);
+
+create index if not exists idx_notifications_client_date on notifications (client_name, date desc);
+
+create or replace function bump_notification_unread(p_client_name text, p_delta integer)
+returns void
+language sql
+as $$
+    insert into notification_unread_counts (client_name, unread)
+    values (p_client_name, greatest(p_delta, 0))
+    on conflict (client_name)
+    do update set unread = greatest(notification_unread_counts.unread + p_delta, 0);
+$$;
+
+create or replace function notifications_unread_trigger()
+returns trigger
+language plpgsql
+security definer
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and coalesce(old.read, 0) = 0 and old.client_name is not null then
+        perform bump_notification_unread(old.client_name, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and coalesce(new.read, 0) = 0 and new.client_name is not null then
+        perform bump_notification_unread(new.client_name, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists notifications_unread_count on notifications;
+create trigger notifications_unread_count
+    after insert or update of read, client_name or delete on notifications
+    for each row execute function notifications_unread_trigger();
+
+-- Backfill from existing rows
+insert into notification_unread_counts (client_name, unread)
+select client_name, count(*)
+from notifications
+where coalesce(read, 0) = 0 and client_name is not null
+group by client_name
+on conflict (client_name) do update set unread = excluded.unread;
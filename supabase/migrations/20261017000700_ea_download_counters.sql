@@ -0,0 +1,60 @@
+-- supabase/migrations/20261017000700_ea_download_counters.sql
+-- EA Versions page reads counts/trends/entitlement from here instead of pulling ea_downloads.
+
+-- 1) Per-version counter column, maintained by trigger
+alter table ea_versions add column if not exists download_count bigint not null default 0;
+
+create or replace function ea_downloads_count_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op = 'INSERT' then
+        update ea_versions set download_count = download_count + 1 where id = new.version_id;
+    elsif tg_op = 'DELETE' then
+        update ea_versions set download_count = greatest(download_count - 1, 0) where id = old.version_id;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists ea_downloads_count on ea_downloads;
+create trigger ea_downloads_count
+    after insert or delete on ea_downloads
+    for each row execute function ea_downloads_count_trigger();
+
+update ea_versions v
+set download_count = coalesce(d.total, 0)
+from (
+    select version_id, count(*) as total from ea_downloads group by version_id
+) d
+where d.version_id = v.id;
+
+-- 2) Daily downloads per version (charts)
+create index if not exists idx_ea_downloads_version_date on ea_downloads (version_id, download_date);
+-- Trends read "last 90 days, every version" → date-leading composite = index-only range scan
+create index if not exists idx_ea_downloads_date_version on ea_downloads (download_date, version_id);
+
+create or replace view v_ea_download_trends
+with (security_invoker = true) as
+select version_id, download_date, count(*) as downloads
+from ea_downloads
+group by version_id, download_date;
+
+-- 3) Latest license per client in one lookup (users ⋈ client_licenses)
+create index if not exists idx_client_licenses_account_date on client_licenses (account_id, date_generated desc);
+
+create or replace view v_client_entitlements
+with (security_invoker = true) as
+select distinct on (u.id)
+    u.id as user_id,
+    u.full_name,
+    l.allow_live,
+    l.version,
+    l.revoked,
+    l.date_generated
+from users u
+join client_licenses l on l.account_id = u.id
+order by u.id, l.date_generated desc;
@@ -0,0 +1,177 @@
+-- supabase/migrations/20261017000800_growth_fund_ledger.sql
+-- Growth Fund ledger: monthly closing checkpoints + per-source rollups (utils/gf_ledger.py).
+-- Balance / source breakdown / curve = checkpoints + transactions since the last closed month,
+-- kaya hindi na dina-download ang buong growth_fund_transactions history.
+
+create index if not exists idx_gf_transactions_date on growth_fund_transactions (date);
+
+-- ─── MONTHLY CLOSING SNAPSHOTS ───
+create table if not exists gf_checkpoints (
+    month           date primary key,           -- first day of the closed month
+    closing_balance numeric not null,
+    total_in        numeric not null default 0,
+    total_out       numeric not null default 0,
+    tx_count        bigint  not null default 0,
+    closed_at       timestamptz not null default now()
+);
+
+-- Closes every finished month after the latest checkpoint (empty months included,
+-- balance carried forward). Idempotent — safe to call from the app or a cron job.
+create or replace function close_growth_fund_months()
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_month   date;
+    v_stop    date := date_trunc('month', current_date)::date;
+    v_balance numeric := 0;
+    v_in      numeric;
+    v_out     numeric;
+    v_count   bigint;
+    v_closed  integer := 0;
+begin
+    perform pg_advisory_xact_lock(hashtext('close_growth_fund_months'));
+
+    select (month + interval '1 month')::date, closing_balance
+    into v_month, v_balance
+    from gf_checkpoints
+    order by month desc
+    limit 1;
+
+    if v_month is null then
+        select date_trunc('month', min(date::date))::date into v_month from growth_fund_transactions;
+        v_balance := 0;
+    end if;
+    if v_month is null then
+        return 0;
+    end if;
+
+    while v_month < v_stop loop
+        select coalesce(sum(amount) filter (where type = 'In'), 0),
+               coalesce(sum(amount) filter (where type = 'Out'), 0),
+               count(*)
+        into v_in, v_out, v_count
+        from growth_fund_transactions
+        where date::date >= v_month and date::date < (v_month + interval '1 month')::date;
+
+        v_balance := v_balance + v_in - v_out;
+        insert into gf_checkpoints (month, closing_balance, total_in, total_out, tx_count)
+        values (v_month, v_balance, v_in, v_out, v_count)
+        on conflict (month) do update
+            set closing_balance = excluded.closing_balance,
+                total_in = excluded.total_in,
+                total_out = excluded.total_out,
+                tx_count = excluded.tx_count,
+                closed_at = now();
+
+        v_closed := v_closed + 1;
+        v_month := (v_month + interval '1 month')::date;
+    end loop;
+    return v_closed;
+end;
+$$;
+
+-- ─── PER-SOURCE ROLLUPS ───
+-- kind: auto = profit-sharing inflow (per account), manual = manual In, out = outflow
+create table if not exists gf_source_rollups (
+    kind      text not null check (kind in ('auto', 'manual', 'out')),
+    source    text not null,
+    total     numeric not null default 0,       -- always positive (out = amount spent)
+    tx_count  bigint  not null default 0,
+    last_date date,
+    primary key (kind, source)
+);
+
+-- Same classification as the old in-page loop (Auto descriptions from distribute_profit)
+create or replace function gf_source_key(p_type text, p_description text, p_account_source text,
+                                         out kind text, out source text)
+language sql
+immutable
+as $$
+    select k.kind,
+           case when k.kind = 'auto' then coalesce(nullif(p_account_source, ''), 'Unknown')
+                else coalesce(nullif(p_description, ''), nullif(p_account_source, ''),
+                              case when p_type = 'Out' then 'Outflow' else 'Manual In' end)
+           end
+    from (
+        select case when p_type = 'Out' then 'out'
+                    when coalesce(p_account_source, '') <> 'Manual' and coalesce(p_description, '') like 'Auto%' then 'auto'
+                    else 'manual'
+               end as kind
+    ) k;
+$$;
+
+create or replace function bump_gf_source_rollup(p_type text, p_amount numeric, p_description text,
+                                                 p_account_source text, p_date date, p_sign integer)
+returns void
+language plpgsql
+as $$
+declare
+    k record;
+begin
+    select * into k from gf_source_key(p_type, p_description, p_account_source);
+
+    insert into gf_source_rollups (kind, source, total, tx_count, last_date)
+    values (k.kind, k.source, p_sign * coalesce(p_amount, 0), p_sign, case when p_sign > 0 then p_date end)
+    on conflict (kind, source) do update
+        set total = gf_source_rollups.total + excluded.total,
+            tx_count = gf_source_rollups.tx_count + excluded.tx_count,
+            last_date = greatest(gf_source_rollups.last_date, excluded.last_date);
+
+    delete from gf_source_rollups where kind = k.kind and source = k.source and tx_count <= 0;
+end;
+$$;
+
+create or replace function growth_fund_ledger_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_from date;
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_gf_source_rollup(old.type, old.amount, old.description, old.account_source, old.date::date, -1);
+        v_from := old.date::date;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_gf_source_rollup(new.type, new.amount, new.description, new.account_source, new.date::date, 1);
+        v_from := least(coalesce(v_from, new.date::date), new.date::date);
+    end if;
+
+    -- Backdated write → closed months from that month on are reopened (re-closed on next call).
+    -- Same lock as close_growth_fund_months(): a concurrent close can't re-upsert a stale
+    -- checkpoint over this delete
+    perform pg_advisory_xact_lock(hashtext('close_growth_fund_months'));
+    delete from gf_checkpoints where month >= date_trunc('month', v_from)::date;
+    return null;
+end;
+$$;
+
+drop trigger if exists growth_fund_ledger on growth_fund_transactions;
+create trigger growth_fund_ledger
+    after insert or update or delete on growth_fund_transactions
+    for each row execute function growth_fund_ledger_trigger();
+
+-- ─── BACKFILL ───
+truncate gf_source_rollups;
+insert into gf_source_rollups (kind, source, total, tx_count, last_date)
+select k.kind, k.source, sum(t.amount), count(*), max(t.date::date)
+from growth_fund_transactions t
+cross join lateral gf_source_key(t.type, t.description, t.account_source) k
+group by k.kind, k.source;
+
+truncate gf_checkpoints;
+select close_growth_fund_months();
+
+-- Monthly close on the 1st (only if pg_cron is enabled; the app also closes lazily)
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule('close-growth-fund-months', '5 0 1 * *', 'select close_growth_fund_months()');
+    end if;
+end;
+$$;
@@ -0,0 +1,37 @@
+-- supabase/migrations/20261017000900_public_stats.sql
+-- Public landing stats in one call (utils/public_stats.py — served from a process-wide snapshot).
+-- Growth Fund = last monthly checkpoint + delta (20261017000800_growth_fund_ledger.sql),
+-- walang full scan ng growth_fund_transactions.
+
+create index if not exists idx_users_role on users (role);
+
+create or replace function public_stats()
+returns table (
+    accounts_count bigint,
+    total_equity   numeric,
+    gf_balance     numeric,
+    members_count  bigint,
+    computed_at    timestamptz
+)
+language sql
+stable
+security definer
+set search_path = public
+as $$
+    with last_close as (
+        select month, closing_balance from gf_checkpoints order by month desc limit 1
+    )
+    select
+        (select count(*) from ftmo_accounts),
+        (select coalesce(sum(current_equity), 0) from ftmo_accounts)::numeric,
+        coalesce((select closing_balance from last_close), 0)
+            + coalesce((
+                select sum(case when type = 'In' then amount else -amount end)
+                from growth_fund_transactions
+                where date::date >= coalesce((select (month + interval '1 month')::date from last_close), '-infinity'::date)
+            ), 0),
+        (select count(*) from users where role = 'client'),
+        now();
+$$;
+
+grant execute on function public_stats() to anon, authenticated;
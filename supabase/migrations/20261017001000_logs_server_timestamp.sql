@@ -0,0 +1,15 @@
+-- supabase/migrations/20261017001000_logs_server_timestamp.sql
+-- logs."timestamp" = when the action happened (log_action() stamps it; batching, retries and
+-- journal replay keep it). logs.inserted_at = when the row reached the DB — server-assigned,
+-- used only as the Audit Logs sync cursor (utils/log_store.py), kaya late / replayed rows
+-- still get picked up without rewriting their event time.
+
+alter table logs alter column "timestamp" set default now();  -- rows written without one
+
+alter table logs add column if not exists inserted_at timestamptz;
+update logs set inserted_at = "timestamp" where inserted_at is null;
+alter table logs alter column inserted_at set default now();
+alter table logs alter column inserted_at set not null;
+
+create index if not exists idx_logs_timestamp_id on logs ("timestamp", id);
+create index if not exists idx_logs_inserted_at_id on logs (inserted_at, id);
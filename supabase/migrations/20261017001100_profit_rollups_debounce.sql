@@ -0,0 +1,91 @@
+-- supabase/migrations/20261017001100_profit_rollups_debounce.sql
+-- Profit rollups (20261017000100_profit_rollups.sql), round 2:
+-- 1) mv_participant_shares keeps Growth Fund rows (is_growth_fund column) — Reports pie
+--    shows every distribution, Dashboard still filters them out
+-- 2) Writes only drop a marker row; the three full refreshes run at most once per batch
+--    of writes, off the read path (utils/rollups.py background thread, or pg_cron every
+--    minute if enabled) — readers only ever read the views
+
+-- ─── PER-PARTICIPANT, GF INCLUDED ───
+drop materialized view if exists mv_participant_shares;
+create materialized view mv_participant_shares as
+select
+    coalesce(participant_name, 'Unknown') as participant_name,
+    coalesce(is_growth_fund, false) as is_growth_fund,
+    sum(share_amount)::numeric as total_share,
+    count(*) as distribution_count
+from profit_distributions
+group by coalesce(participant_name, 'Unknown'), coalesce(is_growth_fund, false);
+
+create unique index if not exists mv_participant_shares_name on mv_participant_shares (participant_name, is_growth_fund);
+
+-- ─── DIRTY MARKERS ───
+-- Insert-only (no shared row to update) → writers never queue behind each other or behind
+-- a running refresh. Uncommitted markers stay invisible, kaya a write that commits
+-- mid-refresh keeps its marker for the next round.
+drop table if exists profit_rollups_state;
+create table if not exists profit_rollups_dirty (
+    id        bigint generated always as identity primary key,
+    marked_at timestamptz not null default now()
+);
+
+create or replace function mark_profit_rollups_dirty()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into profit_rollups_dirty default values;
+    return null;
+end;
+$$;
+
+drop trigger if exists trg_profits_refresh_rollups on profits;
+create trigger trg_profits_refresh_rollups
+    after insert or update or delete on profits
+    for each statement execute function mark_profit_rollups_dirty();
+
+drop trigger if exists trg_distributions_refresh_rollups on profit_distributions;
+create trigger trg_distributions_refresh_rollups
+    after insert or update or delete on profit_distributions
+    for each statement execute function mark_profit_rollups_dirty();
+
+drop function if exists refresh_profit_rollups();
+
+-- Returns true if it refreshed. Concurrent callers skip (someone else is already on it).
+create or replace function refresh_profit_rollups_if_dirty()
+returns boolean
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_seen bigint;
+begin
+    if not pg_try_advisory_xact_lock(hashtext('refresh_profit_rollups')) then
+        return false;
+    end if;
+    select max(id) into v_seen from profit_rollups_dirty;
+    if v_seen is null then
+        return false;
+    end if;
+
+    -- Every marker up to v_seen is committed → the refreshes below see those writes
+    refresh materialized view concurrently mv_profit_totals;
+    refresh materialized view concurrently mv_participant_shares;
+    refresh materialized view concurrently mv_monthly_profits;
+    delete from profit_rollups_dirty where id <= v_seen;
+    return true;
+end;
+$$;
+
+grant execute on function refresh_profit_rollups_if_dirty() to anon, authenticated;
+
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule('refresh-profit-rollups', '* * * * *', 'select refresh_profit_rollups_if_dirty()');
+    end if;
+end;
+$$;
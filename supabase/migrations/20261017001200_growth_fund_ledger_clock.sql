@@ -0,0 +1,98 @@
+-- supabase/migrations/20261017001200_growth_fund_ledger_clock.sql
+-- Growth Fund ledger (20261017000800_growth_fund_ledger.sql), round 2:
+-- 1) Reopening checkpoints takes the same advisory lock as close_growth_fund_months(),
+--    kaya a backdated write can't interleave with a running close and leave a stale
+--    closing_balance behind
+-- 2) "Current month" is UTC on both sides (here and utils/gf_ledger.py), not the DB timezone
+
+create or replace function gf_open_month()
+returns date
+language sql
+stable
+as $$
+    select date_trunc('month', (now() at time zone 'utc')::date)::date;
+$$;
+
+create or replace function close_growth_fund_months()
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_month   date;
+    v_stop    date := gf_open_month();
+    v_balance numeric := 0;
+    v_in      numeric;
+    v_out     numeric;
+    v_count   bigint;
+    v_closed  integer := 0;
+begin
+    perform pg_advisory_xact_lock(hashtext('close_growth_fund_months'));
+
+    select (month + interval '1 month')::date, closing_balance
+    into v_month, v_balance
+    from gf_checkpoints
+    order by month desc
+    limit 1;
+
+    if v_month is null then
+        select date_trunc('month', min(date::date))::date into v_month from growth_fund_transactions;
+        v_balance := 0;
+    end if;
+    if v_month is null then
+        return 0;
+    end if;
+
+    while v_month < v_stop loop
+        select coalesce(sum(amount) filter (where type = 'In'), 0),
+               coalesce(sum(amount) filter (where type = 'Out'), 0),
+               count(*)
+        into v_in, v_out, v_count
+        from growth_fund_transactions
+        where date::date >= v_month and date::date < (v_month + interval '1 month')::date;
+
+        v_balance := v_balance + v_in - v_out;
+        insert into gf_checkpoints (month, closing_balance, total_in, total_out, tx_count)
+        values (v_month, v_balance, v_in, v_out, v_count)
+        on conflict (month) do update
+            set closing_balance = excluded.closing_balance,
+                total_in = excluded.total_in,
+                total_out = excluded.total_out,
+                tx_count = excluded.tx_count,
+                closed_at = now();
+
+        v_closed := v_closed + 1;
+        v_month := (v_month + interval '1 month')::date;
+    end loop;
+    return v_closed;
+end;
+$$;
+
+create or replace function growth_fund_ledger_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_from date;
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_gf_source_rollup(old.type, old.amount, old.description, old.account_source, old.date::date, -1);
+        v_from := old.date::date;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_gf_source_rollup(new.type, new.amount, new.description, new.account_source, new.date::date, 1);
+        v_from := least(coalesce(v_from, new.date::date), new.date::date);
+    end if;
+
+    -- Backdated write → closed months from that month on are reopened (re-closed on next call).
+    -- Same lock as the close, on every write (not only "past month" ones — the write's
+    -- and the close's clocks can straddle a month boundary): waits out a running close
+    -- (then deletes what it wrote), or makes the next close wait until this commits.
+    perform pg_advisory_xact_lock(hashtext('close_growth_fund_months'));
+    delete from gf_checkpoints where month >= date_trunc('month', v_from)::date;
+    return null;
+end;
+$$;
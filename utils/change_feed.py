@@ -0,0 +1,165 @@
+# utils/change_feed.py
+"""
+Push-based change feed for KMFX Empire (replaces short-TTL polling)
+- ONE Supabase Realtime subscription per server process (postgres_changes)
+- Every insert/update/delete → invalidate(table) → only the affected cached queries go stale
+- Per-table version counters; watch_tables() fans changes out to open tabs
+  via a tiny fragment that compares ints (walang DB query habang idle)
+- Idle tabs back off: check every 1s while the user is active, 5s after a
+  minute idle, 30s after 5 minutes → an idle tab sees a change up to 30s late,
+  any interaction brings it back to 1s
+- Tables outside WATCHED_TABLES (e.g. users — kept out of the publication)
+  never get pushes → queries reading them keep the short polling TTL
+- REALTIME_MODE = "local" (secrets/.env) → in-process stand-in: writes made
+  by this server still fan out instantly, external writes fall back to TTL
+Tables must be in the supabase_realtime publication
+(see supabase/migrations/20261017000400_realtime_publication.sql)
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+
+import streamlit as st
+from realtime import AsyncRealtimeClient, RealtimePostgresChangesListenEvent, RealtimeSubscribeStates
+
+from utils.query_cache import add_invalidation_listener, invalidate
+from utils.supabase_client import supabase
+
+WATCHED_TABLES = (
+    "messages", "notifications", "withdrawals", "client_files",
+    "ea_versions", "ea_downloads", "client_licenses",
+    "announcements", "announcement_comments", "testimonials", "waitlist",
+)
+LIVE_TTL = 600          # cache TTL while the feed is live (safety net lang)
+WATCH_BACKOFF = ((60.0, 1.0), (300.0, 5.0), (float("inf"), 30.0))  # (idle < s, check every s)
+RECONNECT_DELAY = 5.0
+
+
+def realtime_mode() -> str:
+    try:
+        mode = st.secrets.get("REALTIME_MODE")
+    except Exception:
+        mode = None
+    return (mode or os.getenv("REALTIME_MODE") or "supabase").lower()
+
+
+class ChangeFeed:
+    """Process-wide table version counters fed by Realtime + local invalidate() calls"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions = defaultdict(int)
+        self.stats = {"events": 0, "reconnects": 0}
+        self.live = False
+        self._thread = None
+        add_invalidation_listener(self._bump)
+
+    # ─── VERSIONS ───
+    def _bump(self, tables):
+        with self.lock:
+            for table in tables:
+                self.versions[table] += 1
+
+    def version(self, *tables) -> tuple:
+        with self.lock:
+            return tuple(self.versions[t] for t in tables)
+
+    def publish(self, table: str):
+        """Local stand-in for a Realtime event (same effect as a postgres_changes message)"""
+        with self.lock:
+            self.stats["events"] += 1
+        invalidate(table)
+
+    def ttl(self, fallback: int, *tables) -> int:
+        """Long TTL while pushes are arriving for every table read; the old polling TTL otherwise"""
+        pushed = all(t in WATCHED_TABLES for t in tables)
+        return LIVE_TTL if self.live and pushed else fallback
+
+    # ─── SUPABASE REALTIME ───
+    def start(self):
+        if self._thread is None and realtime_mode() == "supabase":
+            self._thread = threading.Thread(target=self._run, name="kmfx-change-feed", daemon=True)
+            self._thread.start()
+
+    def _on_change(self, payload):
+        table = (payload.get("data") or {}).get("table")
+        if table:
+            self.publish(table)
+
+    def _set_live(self, live: bool):
+        with self.lock:
+            was_live, self.live = self.live, live
+        if live != was_live:
+            # live → down: entries cached with LIVE_TTL would outlive the 10s polling fallback
+            # down → live: anything could have changed while we were disconnected
+            invalidate(*WATCHED_TABLES)
+
+    def _on_status(self, status, err):
+        self._set_live(status == RealtimeSubscribeStates.SUBSCRIBED)
+
+    async def _subscribe(self):
+        client = AsyncRealtimeClient(str(supabase.realtime_url), token=supabase.supabase_key)
+        await client.connect()
+        channel = client.channel("kmfx-changes")
+        for table in WATCHED_TABLES:
+            channel.on_postgres_changes(
+                RealtimePostgresChangesListenEvent.All, schema="public", table=table, callback=self._on_change
+            )
+        await channel.subscribe(self._on_status)
+        while client.is_connected:
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            try:
+                loop.run_until_complete(self._subscribe())
+            except Exception:
+                pass  # Network / auth error — TTL polling covers us until reconnect
+            self._set_live(False)
+            with self.lock:
+                self.stats["reconnects"] += 1
+            time.sleep(RECONNECT_DELAY)
+
+
+@st.cache_resource
+def get_change_feed() -> ChangeFeed:
+    """One feed (and one Realtime socket) per server process"""
+    feed = ChangeFeed()
+    feed.start()
+    return feed
+
+
+# ────────────────────────────────────────────────
+# FAN-OUT TO OPEN TABS
+# ────────────────────────────────────────────────
+def _watch_interval(idle: float) -> float:
+    return next(every for limit, every in WATCH_BACKOFF if idle < limit)
+
+
+def watch_tables(*tables, key: str):
+    """
+    Rerun the page when any of these tables changes.
+    Call BEFORE fetching so a change landing mid-render still triggers a rerun.
+    """
+    feed = get_change_feed()
+    seen_key, active_key, auto_key = f"feed_seen_{key}", f"feed_active_{key}", f"feed_auto_{key}"
+    if not st.session_state.pop(auto_key, False):
+        st.session_state[active_key] = time.monotonic()  # user-driven run → fast checks again
+    st.session_state[seen_key] = feed.version(*tables)
+    interval = _watch_interval(time.monotonic() - st.session_state[active_key])
+
+    @st.fragment(run_every=interval)
+    def _watch():
+        changed = feed.version(*tables) != st.session_state.get(seen_key)
+        # run_every is fixed per render — step down to the slower interval via one app rerun
+        slower = _watch_interval(time.monotonic() - st.session_state[active_key]) != interval
+        if changed or slower:
+            st.session_state[auto_key] = True
+            st.rerun()
+
+    _watch()
+    return feed
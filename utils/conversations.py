@@ -0,0 +1,118 @@
+# utils/conversations.py
+"""
+Per-conversation message queries for KMFX Empire Messages
+- Server-side filter per (admin, client) — never downloads other clients' history
+- Per-session buffer: first load = latest page, then only rows newer than the
+  `since` cursor are appended on each rerun
+- "Load older" pages backwards from the oldest message we hold
+- With the change feed live, sync only runs when messages actually changed
+Bandwidth scales with ONE conversation, not the whole messages table
+"""
+import time
+
+import streamlit as st
+
+from utils.supabase_client import supabase
+
+PAGE_SIZE = 50
+MIN_SYNC_INTERVAL = 2  # seconds — fallback throttle when no feed version is given
+MESSAGE_COLUMNS = "id, message, timestamp, from_admin, from_client, to_client"
+
+
+def _quote(value: str) -> str:
+    # PostgREST filter values: wrap in double quotes so commas/parens sa pangalan are safe
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def conversation_filter(client_name: str, admin_name: str = None) -> str:
+    """
+    PostgREST or=() filter for one conversation
+    - admin view: admin ↔ client (plus client messages not addressed to anyone)
+    - client view (admin_name=None): everything from/to the client
+    """
+    c = _quote(client_name)
+    if admin_name is None:
+        return f"from_client.eq.{c},to_client.eq.{c}"
+    a = _quote(admin_name)
+    return (
+        f"and(from_admin.eq.{a},to_client.eq.{c}),"
+        f"and(from_client.eq.{c},to_client.is.null),"
+        f"and(from_client.eq.{c},from_admin.eq.{a})"
+    )
+
+
+def _boundary_ids(messages, ts) -> list:
+    return [m["id"] for m in messages if m["timestamp"] == ts]
+
+
+class ConversationBuffer:
+    """Messages of one conversation for one session (oldest first)"""
+
+    def __init__(self, or_filter: str):
+        self.or_filter = or_filter
+        self.messages = []
+        self.has_older = True
+        self.last_sync = 0.0
+        self.synced_version = None
+
+    def _query(self):
+        return supabase.table("messages").select(MESSAGE_COLUMNS).or_(self.or_filter)
+
+    def sync(self, force: bool = False, version=None) -> int:
+        """
+        Append messages newer than the since cursor. Returns number of new rows.
+        version = change feed version of the messages table (skip if unchanged)
+        """
+        if not force:
+            if version is not None and version == self.synced_version:
+                return 0
+            if version is None and time.monotonic() - self.last_sync < MIN_SYNC_INTERVAL:
+                return 0
+        self.synced_version = version
+
+        if not self.messages:
+            page = self._query().order("timestamp", desc=True).limit(PAGE_SIZE).execute().data or []
+            self.messages = page[::-1]
+            self.has_older = len(page) == PAGE_SIZE
+            self.last_sync = time.monotonic()
+            return len(page)
+
+        added = 0
+        while True:
+            since = self.messages[-1]["timestamp"]
+            q = self._query().gte("timestamp", since)
+            seen = _boundary_ids(self.messages, since)
+            if seen:
+                q = q.not_.in_("id", seen)
+            page = q.order("timestamp").limit(PAGE_SIZE).execute().data or []
+            self.messages.extend(page)
+            added += len(page)
+            if len(page) < PAGE_SIZE:
+                break
+
+        self.last_sync = time.monotonic()
+        return added
+
+    def load_older(self) -> int:
+        """Prepend one page of older messages. Returns number of rows added."""
+        if not self.messages:
+            return self.sync(force=True)
+
+        oldest = self.messages[0]["timestamp"]
+        q = self._query().lte("timestamp", oldest)
+        seen = _boundary_ids(self.messages, oldest)
+        if seen:
+            q = q.not_.in_("id", seen)
+        page = q.order("timestamp", desc=True).limit(PAGE_SIZE).execute().data or []
+        self.messages = page[::-1] + self.messages
+        self.has_older = len(page) == PAGE_SIZE
+        return len(page)
+
+
+def get_conversation(client_name: str, admin_name: str = None) -> ConversationBuffer:
+    """Session-scoped buffer per conversation (survives reruns, not shared between users)"""
+    buffers = st.session_state.setdefault("conversation_buffers", {})
+    key = (admin_name, client_name)
+    if key not in buffers:
+        buffers[key] = ConversationBuffer(conversation_filter(client_name, admin_name))
+    return buffers[key]
@@ -0,0 +1,102 @@
+# utils/gf_ledger.py
+"""
+Growth Fund ledger for KMFX Empire
+- Balance = latest monthly closing checkpoint (gf_checkpoints) + transactions since
+- Source breakdown from gf_source_rollups (maintained by trigger on every insert)
+- Balance curve = month-end checkpoints + running balance over the recent delta
+  (see supabase/migrations/20261017000800_growth_fund_ledger.sql)
+- Cost is bounded by the current month's transactions, hindi all-time history
+- Finished months still in the delta (new month, backdated write) are closed
+  lazily via close_growth_fund_months() then re-read
+"""
+from datetime import date, datetime, timezone
+
+from utils.supabase_client import supabase
+
+
+def _signed(t) -> float:
+    amount = float(t.get("amount") or 0.0)
+    return -amount if t.get("type") == "Out" else amount
+
+
+def _next_month(month: str) -> str:
+    d = date.fromisoformat(str(month)[:10])
+    return str(date(d.year + d.month // 12, d.month % 12 + 1, 1))
+
+
+def _read_head(columns: str):
+    """(checkpoints asc, transactions after the last checkpoint)"""
+    checkpoints = supabase.table("gf_checkpoints") \
+        .select("month, closing_balance, total_in, total_out, tx_count") \
+        .order("month") \
+        .execute().data or []
+
+    query = supabase.table("growth_fund_transactions").select(columns)
+    if checkpoints:
+        query = query.gte("date", _next_month(checkpoints[-1]["month"]))
+    recent = query.order("date", desc=True).execute().data or []
+    return checkpoints, recent
+
+
+def _load_head(columns: str):
+    checkpoints, recent = _read_head(columns)
+    # UTC — same clock as gf_open_month() / close_growth_fund_months() in SQL
+    month_start = str(datetime.now(timezone.utc).date().replace(day=1))
+    if any(str(t.get("date") or "")[:10] < month_start for t in recent):
+        supabase.rpc("close_growth_fund_months").execute()
+        checkpoints, recent = _read_head(columns)
+    return checkpoints, recent
+
+
+def fetch_month_transactions(month: str) -> list:
+    """Every transaction of one closed month (history browser), newest first"""
+    return supabase.table("growth_fund_transactions") \
+        .select("*") \
+        .gte("date", str(month)[:10]) \
+        .lt("date", _next_month(month)) \
+        .order("date", desc=True) \
+        .execute().data or []
+
+
+def fetch_gf_ledger() -> dict:
+    """
+    Returns:
+    {
+        "balance": float,
+        "opening_balance": float,                # closing balance of the last checkpoint
+        "checkpoints": [{"month", "closing_balance", "total_in", "total_out", "tx_count"}, ...],
+        "recent": [transaction, ...],            # since the last checkpoint, newest first
+        "auto_sources": {account: total},        # profit-sharing inflows
+        "manual_sources": {source: signed total} # manual In (+) / outflows (-)
+        "curve": [{"date": "YYYY-MM-DD", "balance": float}, ...]
+    }
+    Raises on query failure — callers already wrap their fetch in try/except.
+    """
+    checkpoints, recent = _load_head("*")
+    opening = float(checkpoints[-1]["closing_balance"]) if checkpoints else 0.0
+
+    rollups = supabase.table("gf_source_rollups").select("kind, source, total").execute().data or []
+    auto_sources, manual_sources = {}, {}
+    for r in rollups:
+        total = float(r.get("total") or 0.0)
+        if r["kind"] == "auto":
+            auto_sources[r["source"]] = auto_sources.get(r["source"], 0.0) + total
+        else:
+            signed = -total if r["kind"] == "out" else total
+            manual_sources[r["source"]] = manual_sources.get(r["source"], 0.0) + signed
+
+    curve = [{"date": _next_month(c["month"]), "balance": float(c["closing_balance"])} for c in checkpoints]
+    balance = opening
+    for t in sorted(recent, key=lambda t: str(t.get("date") or "")):
+        balance += _signed(t)
+        curve.append({"date": str(t.get("date") or "")[:10], "balance": balance})
+
+    return {
+        "balance": balance,
+        "opening_balance": opening,
+        "checkpoints": checkpoints,
+        "recent": recent,
+        "auto_sources": auto_sources,
+        "manual_sources": manual_sources,
+        "curve": curve,
+    }
@@ -3,34 +3,36 @@
 Reusable utility functions for KMFX EA Dashboard
 - File upload to Supabase Storage (with signed URL option)
 - Image resizing (uniform size with padding for journey/timeline/testimonials)
-- Action logging to Supabase logs table
+- Action logging to Supabase logs table (buffered, background writer)
 - Keep-alive ping to prevent Streamlit Cloud sleep
 - QR code generation helpers
 """
 import os
 import uuid
-import requests
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageOps
 import streamlit as st
 import qrcode
 
 from utils.supabase_client import supabase
+from utils.http_transport import get_http_client
+from utils.log_writer import get_log_writer
+from utils.imaging import encode_photo
 
 # ────────────────────────────────────────────────
 # IMAGE RESIZING – Uniform size with padding (800x700 default)
 # ────────────────────────────────────────────────
-def make_same_size(image_input, target_width=800, target_height=700, bg_color=(0, 0, 0)):
+def make_same_size(image_input, target_width=800, target_height=700, bg_color=(0, 0, 0), quality=82):
     """
     Resize image to exact target size with centered padding (black bg for dark theme).
     Accepts:
     - Local file path (str)
     - Uploaded file object (with .getvalue() or .read())
     - BytesIO or raw bytes
-    Returns bytes ready for st.image() or None on failure
+    Returns WebP/JPEG bytes (not PNG — photos are 5-10x smaller) ready for st.image() or None on failure
     """
     try:
         # Handle different input types
@@ -43,7 +45,8 @@ def make_same_size(image_input, target_width=800, target_height=700, bg_color=(0
         else:  # assume raw bytes
             img = Image.open(BytesIO(image_input))
 
-        # Resize preserving aspect ratio
+        # Fix phone rotation, resize preserving aspect ratio
+        img = ImageOps.exif_transpose(img)
         img.thumbnail((target_width, target_height), Image.LANCZOS)
 
         # Create new image with target size + background
@@ -51,11 +54,8 @@ def make_same_size(image_input, target_width=800, target_height=700, bg_color=(0
         offset = ((target_width - img.width) // 2, (target_height - img.height) // 2)
         new_img.paste(img, offset)
 
-        # Convert to bytes
-        buf = BytesIO()
-        new_img.save(buf, format="PNG")
-        buf.seek(0)
-        return buf.getvalue()
+        # Convert to bytes (size-efficient photo format)
+        return encode_photo(new_img, quality)
     except Exception as e:
         st.warning(f"Image resize failed: {str(e)}")
         return None
@@ -63,42 +63,62 @@ def make_same_size(image_input, target_width=800, target_height=700, bg_color=(0
 # ────────────────────────────────────────────────
 # UPLOAD TO SUPABASE STORAGE
 # ────────────────────────────────────────────────
+def store_file(content: bytes, file_name: str, bucket: str, folder: str = "", content_type: str = None,
+               use_signed_url: bool = False, signed_expiry: int = 604800):
+    """
+    Core storage upload (no Streamlit UI calls — safe to run in worker threads)
+    Returns (url, storage_path); raises on failure
+    """
+    # Storage key = ASCII letters/digits + ._- only (spaces, #, ?, /, accents → _)
+    clean_name = "".join(c if (c.isascii() and c.isalnum()) or c in "._-" else "_" for c in file_name)
+    safe_name = f"{uuid.uuid4()}_{clean_name}"
+    storage_path = f"{folder}/{safe_name}" if folder else safe_name
+
+    supabase.storage.from_(bucket).upload(
+        path=storage_path,
+        file=content,
+        file_options={
+            "content-type": content_type or "application/octet-stream",
+            "upsert": "true"
+        }
+    )
+
+    if use_signed_url:
+        signed = supabase.storage.from_(bucket).create_signed_url(storage_path, signed_expiry)
+        url = signed.get("signedURL") if signed else None
+    else:
+        url = supabase.storage.from_(bucket).get_public_url(storage_path)
+    return url, storage_path
+
+
+def read_upload(file) -> bytes:
+    """Get bytes safely from UploadedFile / file-like / raw bytes"""
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if hasattr(file, "read"):
+        return file.read()
+    return file  # assume bytes
+
+
 def upload_to_supabase(file, bucket: str, folder: str = "", use_signed_url: bool = False, signed_expiry: int = 604800):
     """
     Upload file to Supabase Storage
     Returns (url, storage_path) or (None, None) on failure
     - use_signed_url=True → returns 7-day signed URL (private buckets)
     - use_signed_url=False → returns public URL (if bucket is public)
+    For many files at once use utils.uploads.upload_many (parallel + retry)
     """
     try:
         file_name = getattr(file, "name", f"file_{uuid.uuid4().hex}")
-        safe_name = f"{uuid.uuid4()}_{file_name}"
-        storage_path = f"{folder}/{safe_name}" if folder else safe_name
-
-        # Get bytes safely
-        if hasattr(file, "getvalue"):
-            content = file.getvalue()
-        elif hasattr(file, "read"):
-            content = file.read()
-        else:
-            content = file  # assume bytes
 
         with st.spinner(f"Uploading {file_name}..."):
-            supabase.storage.from_(bucket).upload(
-                path=storage_path,
-                file=content,
-                file_options={
-                    "content-type": getattr(file, "type", "application/octet-stream"),
-                    "upsert": "true"
-                }
+            url, storage_path = store_file(
+                read_upload(file), file_name, bucket, folder,
+                content_type=getattr(file, "type", None),
+                use_signed_url=use_signed_url,
+                signed_expiry=signed_expiry
             )
 
-        if use_signed_url:
-            signed = supabase.storage.from_(bucket).create_signed_url(storage_path, signed_expiry)
-            url = signed.get("signedURL") if signed else None
-        else:
-            url = supabase.storage.from_(bucket).get_public_url(storage_path)
-
         st.success(f"✅ {file_name} uploaded")
         return url, storage_path
     except Exception as e:
@@ -111,18 +131,21 @@ def upload_to_supabase(file, bucket: str, folder: str = "", use_signed_url: bool
 def log_action(action: str, details: str = "", user_name: str = None, user_type: str = None):
     """
     Log important actions to logs table (silent fail if error)
+    Non-blocking: row is queued to the background writer (utils.log_writer)
+    timestamp = when the action happened (captured here, kept through batching /
+    retries / journal replay); the DB stamps inserted_at for the Audit Logs sync cursor
     """
     user_name = user_name or st.session_state.get("full_name", "Unknown")
     user_type = user_type or st.session_state.get("role", "unknown")
 
     try:
-        supabase.table("logs").insert({
-            "timestamp": datetime.utcnow().isoformat(),
+        get_log_writer().submit({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
             "action": action,
             "details": details,
             "user_type": user_type,
             "user_name": user_name
-        }).execute()
+        })
     except Exception:
         # Silent – logging should never break the app
         pass
@@ -133,9 +156,10 @@ def log_action(action: str, details: str = "", user_name: str = None, user_type:
 def keep_alive():
     """Ping the app every ~25 minutes to keep it awake on Cloud"""
     url = "https://kmfxea.streamlit.app"  # ← CHANGE TO YOUR ACTUAL LIVE URL
+    client = get_http_client()
     while True:
         try:
-            requests.get(url, timeout=10)
+            client.get(url)
         except:
             pass
         time.sleep(1500)  # 25 minutes
@@ -0,0 +1,127 @@
+# utils/http_transport.py
+"""
+Shared HTTP transport for KMFX Empire
+- ONE pooled httpx.Client per server process (HTTP/2 + keep-alive) shared by
+  PostgREST, Storage, Edge Functions, image fetch, file downloads & keep-alive
+  → back-to-back calls reuse warm connections (walang paulit-ulit na TLS handshake)
+- Retry with exponential backoff + jitter:
+  idempotent reads (GET/HEAD/OPTIONS) on 429/5xx/timeouts, any method on connect errors
+  (request never left the machine)
+- No default headers — Supabase passes apikey/auth per request, so external
+  URLs (images, keep-alive ping) never see our key
+Tuning via secrets/.env: HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+HTTP_RETRIES, HTTP_BACKOFF, HTTP2
+"""
+import os
+import random
+import time
+
+import httpx
+import streamlit as st
+
+DEFAULTS = {
+    "HTTP_POOL_SIZE": 20,
+    "HTTP_CONNECT_TIMEOUT": 5.0,
+    "HTTP_READ_TIMEOUT": 30.0,
+    "HTTP_RETRIES": 3,
+    "HTTP_BACKOFF": 0.25,   # seconds → 0.25, 0.5, 1.0 (+ jitter)
+    "HTTP2": True,
+}
+KEEPALIVE_EXPIRY = 60.0     # seconds an idle connection stays in the pool
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF = 8.0
+
+
+def _setting(name: str):
+    default = DEFAULTS[name]
+    try:
+        raw = st.secrets.get(name)
+    except Exception:
+        raw = None
+    raw = raw if raw is not None else os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        if isinstance(default, bool):
+            return str(raw).strip().lower() in ("1", "true", "yes", "on")
+        return type(default)(raw)
+    except ValueError:
+        return default
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401 — httpx needs it for HTTP/2
+        return True
+    except ImportError:
+        return False
+
+
+# ────────────────────────────────────────────────
+# RETRYING TRANSPORT
+# ────────────────────────────────────────────────
+class RetryTransport(httpx.HTTPTransport):
+    def __init__(self, retries: int, backoff: float, **kwargs):
+        super().__init__(**kwargs)
+        self.retries = retries
+        self.backoff = backoff
+
+    def _sleep(self, attempt: int, response=None):
+        delay = min(self.backoff * (2 ** attempt), MAX_BACKOFF)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = min(max(delay, float(retry_after)), MAX_BACKOFF)
+        time.sleep(delay + random.uniform(0, delay / 2))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = super().handle_request(request)
+            except httpx.ConnectError:
+                if attempt >= self.retries:
+                    raise
+                self._sleep(attempt)
+            except (httpx.TimeoutException, httpx.RemoteProtocolError, httpx.ReadError):
+                if not idempotent or attempt >= self.retries:
+                    raise
+                self._sleep(attempt)
+            else:
+                if not idempotent or response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                response.read()
+                response.close()
+                self._sleep(attempt, response)
+            attempt += 1
+
+
+# ────────────────────────────────────────────────
+# SHARED CLIENT
+# ────────────────────────────────────────────────
+def build_http_client() -> httpx.Client:
+    pool_size = max(1, _setting("HTTP_POOL_SIZE"))
+    http2 = _setting("HTTP2") and _http2_available()
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    transport = RetryTransport(
+        retries=max(0, _setting("HTTP_RETRIES")),
+        backoff=_setting("HTTP_BACKOFF"),
+        http2=http2,
+        limits=limits
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(_setting("HTTP_READ_TIMEOUT"), connect=_setting("HTTP_CONNECT_TIMEOUT")),
+        follow_redirects=True
+    )
+
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """Process-wide pooled client (same one the Supabase client uses)"""
+    return build_http_client()
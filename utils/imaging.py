@@ -0,0 +1,52 @@
+# utils/imaging.py
+"""
+Pure image helpers (PIL only — walang Streamlit/Supabase imports)
+Safe to run inside a ProcessPoolExecutor worker.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps, features
+
+# Rendition name → longest side in px
+RENDITION_SIZES = {"thumb": 320, "medium": 1280}
+RENDITION_QUALITY = {"thumb": 70, "medium": 82}
+
+
+def photo_format() -> tuple:
+    """(PIL format, extension, content-type) — WebP when available, else JPEG"""
+    if features.check("webp"):
+        return "WEBP", "webp", "image/webp"
+    return "JPEG", "jpg", "image/jpeg"
+
+
+def open_image(content: bytes) -> Image.Image:
+    """Open + apply EXIF rotation (phone photos) + flatten to RGB"""
+    img = Image.open(BytesIO(content))
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        bg = Image.new("RGB", img.size, (0, 0, 0))
+        bg.paste(img, mask=img.split()[-1])
+        return bg
+    return img.convert("RGB")
+
+
+def encode_photo(img: Image.Image, quality: int = 82) -> bytes:
+    fmt, _, _ = photo_format()
+    buf = BytesIO()
+    img.save(buf, format=fmt, quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def build_renditions(content: bytes) -> dict:
+    """
+    Original bytes → {"thumb": bytes, "medium": bytes}
+    Aspect ratio preserved, never upscaled. Runs in a worker process.
+    """
+    img = open_image(content)
+    out = {}
+    for name, size in RENDITION_SIZES.items():
+        copy = img.copy()
+        copy.thumbnail((size, size), Image.LANCZOS)
+        out[name] = encode_photo(copy, RENDITION_QUALITY[name])
+    return out
@@ -0,0 +1,192 @@
+# utils/log_store.py
+"""
+Incremental audit log store for KMFX Empire
+- Process-wide cache ng logs rows (shared by all owner sessions)
+- Sync pulls ONLY rows inserted after the last seen (inserted_at, id) cursor —
+  inserted_at is server-assigned, timestamp stays the event time (late / replayed
+  rows still get picked up); a short overlap window behind the cursor is re-read
+  so rows whose transaction committed out of order aren't skipped
+- Keyset (not offset) pagination for both sync and the filtered table view
+- Rows are held as one typed DataFrame (parsed UTC timestamps, categorical
+  user_name / action) para vectorized ang filters at aggregations
+"""
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pandas.api.types import union_categoricals
+
+from utils.supabase_client import supabase
+
+SYNC_PAGE_SIZE = 1000
+MIN_SYNC_INTERVAL = 5  # seconds — multiple reruns within this window reuse the cache
+SYNC_OVERLAP = timedelta(seconds=30)  # re-read behind the cursor (late-committing inserts)
+
+LOG_COLUMNS = ["id", "timestamp", "inserted_at", "user_name", "user_type", "action", "details"]
+CATEGORY_COLUMNS = ["user_name", "user_type", "action"]
+
+
+def _to_frame(rows) -> pd.DataFrame:
+    """Raw PostgREST rows → typed frame (ts = parsed datetime, text cols never NaN)"""
+    df = pd.DataFrame(rows, columns=LOG_COLUMNS)
+    df["ts"] = pd.to_datetime(df["timestamp"], utc=True, format="ISO8601")
+    df["details"] = df["details"].fillna("").astype(str)
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+class LogStore:
+    """Append-only in-memory copy of the logs table (newest first)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame = _to_frame([])
+        self.cursor = None      # (inserted_at, id) of the last row we pulled
+        self.ids = set()        # ids already in frame (dedupes the overlap re-read)
+        self.last_sync = 0.0
+
+    def sync(self, force: bool = False) -> int:
+        """Fetch rows after the cursor in keyset pages. Returns number of new rows."""
+        with self.lock:
+            if not force and time.monotonic() - self.last_sync < MIN_SYNC_INTERVAL:
+                return 0
+
+            new_rows = []
+            after = None
+            while True:
+                q = supabase.table("logs").select("*")
+                if after:
+                    ts, last_id = after
+                    q = q.or_(f'inserted_at.gt."{ts}",and(inserted_at.eq."{ts}",id.gt.{last_id})')
+                elif self.cursor:
+                    # inserted_at is stamped before commit — a slow transaction can land behind the cursor
+                    since = pd.Timestamp(self.cursor[0]) - SYNC_OVERLAP
+                    q = q.gte("inserted_at", since.isoformat())
+                page = q.order("inserted_at").order("id").limit(SYNC_PAGE_SIZE).execute().data or []
+                if not page:
+                    break
+                after = (page[-1]["inserted_at"], page[-1]["id"])
+                new_rows.extend(r for r in page if r["id"] not in self.ids)
+                if len(page) < SYNC_PAGE_SIZE:
+                    break
+            if after:
+                self.cursor = after
+            added = len(new_rows)
+
+            if new_rows:
+                self.ids.update(r["id"] for r in new_rows)
+                # Prepend newest-first; re-cast categories once per sync (not per row)
+                fresh = _to_frame(new_rows).sort_values("ts", ascending=False, kind="stable", ignore_index=True)
+                if self.frame.empty:
+                    self.frame = fresh  # empty frame's categories have no dtype to union with
+                else:
+                    combined = pd.concat([fresh, self.frame], ignore_index=True)
+                    for col in CATEGORY_COLUMNS:
+                        combined[col] = union_categoricals([fresh[col], self.frame[col]], ignore_order=True)
+                    if fresh["ts"].iloc[-1] < self.frame["ts"].iloc[0]:
+                        # Late rows (batched / replayed) older than what we hold → re-sort by event time
+                        combined = combined.sort_values("ts", ascending=False, kind="stable", ignore_index=True)
+                    self.frame = combined
+
+            self.last_sync = time.monotonic()
+            return added
+
+    def snapshot(self) -> pd.DataFrame:
+        """Newest-first typed frame (treat as read-only — shared across sessions)"""
+        with self.lock:
+            return self.frame
+
+
+@st.cache_resource
+def get_log_store() -> LogStore:
+    """One store per server process"""
+    return LogStore()
+
+
+# ────────────────────────────────────────────────
+# SERVER-SIDE FILTERED PAGES (keyset, newest first)
+# ────────────────────────────────────────────────
+def _clean_search(text: str) -> str:
+    # PostgREST or=() syntax uses , ( ) * " — strip them from user input
+    return "".join(ch for ch in text if ch not in ',()*"\\').strip()
+
+
+def fetch_log_page(search: str = "", user: str = None, action: str = None,
+                   start_date=None, end_date=None, before=None, limit: int = 100):
+    """
+    One page of filtered logs, newest first.
+    before = (timestamp, [ids at that timestamp already shown]) from the previous page
+    Returns (rows, next_before) — next_before is None when there are no older rows.
+    No count(*) here — match counts come from the synced LogStore frame
+    """
+    q = supabase.table("logs").select("*")
+    if user:
+        q = q.eq("user_name", user)
+    if action:
+        q = q.eq("action", action)
+    if start_date:
+        q = q.gte("timestamp", start_date.isoformat())
+    if end_date:
+        q = q.lt("timestamp", (end_date + timedelta(days=1)).isoformat())
+    s = _clean_search(search or "")
+    if s:
+        q = q.or_(f"action.ilike.*{s}*,details.ilike.*{s}*,user_name.ilike.*{s}*")
+
+    seen = set()
+    if before:
+        ts, seen_ids = before
+        seen = set(seen_ids)
+        q = q.lte("timestamp", ts)
+
+    rows = q.order("timestamp", desc=True).order("id", desc=True).limit(limit + len(seen) + 1).execute().data or []
+    rows = [r for r in rows if r["id"] not in seen]
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not has_more or not rows:
+        return rows, None
+
+    last_ts = rows[-1]["timestamp"]
+    boundary_ids = [r["id"] for r in rows if r["timestamp"] == last_ts]
+    if before and before[0] == last_ts:
+        boundary_ids += list(seen)
+    return rows, (last_ts, boundary_ids)
+
+
+# ────────────────────────────────────────────────
+# VECTORIZED LOCAL FILTER (one boolean mask)
+# ────────────────────────────────────────────────
+def filter_log_frame(df: pd.DataFrame, search: str = "", user: str = None, action: str = None,
+                     start_date=None, end_date=None) -> pd.DataFrame:
+    """Apply every filter as a single mask — no per-row Python or date parsing"""
+    mask = pd.Series(True, index=df.index)
+    if user:
+        mask &= df["user_name"] == user
+    if action:
+        mask &= df["action"] == action
+    if start_date:
+        mask &= df["ts"] >= pd.Timestamp(start_date, tz="UTC")
+    if end_date:
+        mask &= df["ts"] < pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(days=1)
+    if search:
+        s = search.lower()
+        mask &= (
+            _category_contains(df["action"], s)
+            | df["details"].str.lower().str.contains(s, regex=False)
+            | _category_contains(df["user_name"], s)
+        )
+    return df[mask]
+
+
+def _category_contains(col: pd.Series, text: str) -> np.ndarray:
+    """Substring match on the (few) categories, then broadcast via codes"""
+    cats = col.cat.categories
+    if len(cats) == 0:
+        return np.zeros(len(col), dtype=bool)
+    hits = np.asarray(cats.astype(str).str.lower().str.contains(text, regex=False), dtype=bool)
+    codes = col.cat.codes.to_numpy()
+    return hits[codes] & (codes >= 0)
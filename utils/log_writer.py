@@ -0,0 +1,138 @@
+# utils/log_writer.py
+"""
+Background audit log writer for KMFX Empire
+- log_action() just enqueues — walang network I/O sa request thread
+- Worker thread batch-inserts into logs (flush on size OR interval)
+- Retry with exponential backoff; kapag down ang Supabase, spill to a local
+  JSONL journal and replay it on the next successful flush
+- Drains on interpreter shutdown (atexit)
+- Counters: queued / flushed / dropped / spilled / replayed
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+import streamlit as st
+
+from utils.supabase_client import supabase
+
+QUEUE_MAX = 5000
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 2.0        # seconds
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5          # seconds → 0.5, 1, 2 ...
+JOURNAL_PATH = os.getenv("KMFX_LOG_JOURNAL", ".kmfx_log_journal.jsonl")
+
+
+class LogWriter:
+    """Bounded in-process queue drained by one daemon thread"""
+
+    def __init__(self, journal_path: str = JOURNAL_PATH):
+        self.queue = queue.Queue(maxsize=QUEUE_MAX)
+        self.journal_path = journal_path
+        self.journal_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {"queued": 0, "flushed": 0, "dropped": 0, "spilled": 0, "replayed": 0}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kmfx-log-writer", daemon=True)
+        self._thread.start()
+
+    # ─── PUBLIC ───
+    def submit(self, row: dict) -> bool:
+        """Non-blocking enqueue. Returns False (and counts a drop) if the queue is full."""
+        try:
+            self.queue.put_nowait(row)
+            self._bump("queued")
+            return True
+        except queue.Full:
+            self._bump("dropped")
+            return False
+
+    def get_stats(self) -> dict:
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.queue.qsize()
+        return stats
+
+    def close(self, timeout: float = 5.0):
+        """Stop the worker and flush everything still queued (called at shutdown)"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    # ─── WORKER ───
+    def _bump(self, key: str, n: int = 1):
+        with self.stats_lock:
+            self.stats[key] += n
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while not self._stop.is_set():
+            try:
+                batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            if len(batch) >= BATCH_SIZE or time.monotonic() >= deadline:
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                deadline = time.monotonic() + FLUSH_INTERVAL
+
+        # Shutdown drain
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._flush(batch, retries=1)
+
+    def _flush(self, batch: list, retries: int = MAX_RETRIES):
+        for attempt in range(retries):
+            try:
+                supabase.table("logs").insert(batch).execute()
+                self._bump("flushed", len(batch))
+                self._replay_journal()
+                return
+            except Exception:
+                if attempt < retries - 1:
+                    time.sleep(BACKOFF_BASE * (2 ** attempt))
+        self._spill(batch)
+
+    # ─── ON-DISK JOURNAL ───
+    def _spill(self, batch: list):
+        try:
+            with self.journal_lock, open(self.journal_path, "a", encoding="utf-8") as f:
+                for row in batch:
+                    f.write(json.dumps(row) + "\n")
+            self._bump("spilled", len(batch))
+        except OSError:
+            self._bump("dropped", len(batch))
+
+    def _replay_journal(self):
+        with self.journal_lock:
+            if not os.path.exists(self.journal_path):
+                return
+            try:
+                with open(self.journal_path, encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                for i in range(0, len(rows), BATCH_SIZE):
+                    supabase.table("logs").insert(rows[i:i + BATCH_SIZE]).execute()
+                    self._bump("replayed", len(rows[i:i + BATCH_SIZE]))
+                    # Rewrite what's left so a mid-replay failure doesn't duplicate rows
+                    with open(self.journal_path, "w", encoding="utf-8") as f:
+                        f.writelines(json.dumps(r) + "\n" for r in rows[i + BATCH_SIZE:])
+                os.remove(self.journal_path)
+            except Exception:
+                pass  # Backend flaky again — keep the journal for the next flush
+
+
+@st.cache_resource
+def get_log_writer() -> LogWriter:
+    """One writer per server process (drained at exit)"""
+    writer = LogWriter()
+    atexit.register(writer.close)
+    return writer
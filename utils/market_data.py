@@ -0,0 +1,312 @@
+# utils/market_data.py
+"""
+Background gold-price feed for the landing ticker & chart
+- One daemon thread per server process refreshes the XAUUSD quote + intraday
+  OHLC bars; pages only read memory → render never waits on Yahoo
+- Bars persisted to a local SQLite store (MARKET_DATA_DB) kaya after a restart
+  the chart + last quote are served from disk while the first fetch runs
+- Providers: "yahoo" (yfinance, GC=F futures) or "fixture" (offline — CSV from
+  MARKET_DATA_FIXTURE, or a deterministic synthetic walk if unset)
+- Failed fetch → keep serving the last good data, retry with backoff
+Tuning via secrets/.env: MARKET_DATA_PROVIDER, MARKET_DATA_FIXTURE, MARKET_DATA_DB
+"""
+import csv
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+SYMBOL = "XAUUSD"
+YAHOO_TICKER = "GC=F"
+BAR_INTERVAL = "5m"
+BAR_SECONDS = 300
+QUOTE_REFRESH = 60.0        # seconds
+BARS_REFRESH = 300.0        # seconds
+RETENTION_DAYS = 30         # bars older than this are pruned from the store
+MEMORY_BARS = 2000          # bars kept in memory for the chart (~1 week of 5m)
+MAX_BACKOFF = 900.0
+DB_PATH = ".kmfx_market.sqlite"
+
+
+def _setting(name: str, default=None):
+    try:
+        raw = st.secrets.get(name)
+    except Exception:
+        raw = None
+    return raw if raw is not None else os.getenv(name, default)
+
+
+# ────────────────────────────────────────────────
+# PROVIDERS
+# ────────────────────────────────────────────────
+class YahooProvider:
+    """yfinance — imported lazily so fixture mode runs without network / the package"""
+    name = "yahoo"
+
+    def __init__(self, ticker: str = YAHOO_TICKER):
+        self.ticker = ticker
+
+    def fetch_quote(self) -> dict:
+        import yfinance as yf
+
+        t = yf.Ticker(self.ticker)
+        info = t.fast_info
+        price = info.get("last_price")
+        prev = info.get("previous_close")
+        if not price:
+            hist = t.history(period="2d")
+            if hist.empty:
+                raise ValueError("no quote data")
+            price = float(hist["Close"].iloc[-1])
+            prev = float(hist["Close"].iloc[-2]) if len(hist) > 1 else price
+        change = ((price - prev) / prev * 100) if prev else 0.0
+        return {"price": float(price), "change_pct": float(change), "at": time.time()}
+
+    def fetch_bars(self, since: float = None) -> list:
+        import yfinance as yf
+
+        period = "5d" if since is None or time.time() - since > 86400 else "1d"
+        hist = yf.Ticker(self.ticker).history(period=period, interval=BAR_INTERVAL)
+        return [
+            {
+                "time": int(ts.timestamp()),
+                "open": float(row["Open"]), "high": float(row["High"]),
+                "low": float(row["Low"]), "close": float(row["Close"]),
+                "volume": float(row.get("Volume") or 0.0),
+            }
+            for ts, row in hist.iterrows()
+        ]
+
+
+class FixtureProvider:
+    """Offline bars: CSV (time,open,high,low,close[,volume]; time = unix seconds) or synthetic walk"""
+    name = "fixture"
+
+    def __init__(self, path: str = None, seed: int = 2026, days: int = 5, start_price: float = 2400.0):
+        self.path = path
+        self.seed = seed
+        self.days = days
+        self.start_price = start_price
+
+    def _load(self) -> list:
+        if self.path:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                return [
+                    {
+                        "time": int(float(r["time"])),
+                        "open": float(r["open"]), "high": float(r["high"]),
+                        "low": float(r["low"]), "close": float(r["close"]),
+                        "volume": float(r.get("volume") or 0.0),
+                    }
+                    for r in csv.DictReader(f)
+                ]
+        # Synthetic walk ending at the current bar (same bars for the same seed + bar slot)
+        rng = random.Random(self.seed)
+        end = int(time.time()) // BAR_SECONDS * BAR_SECONDS
+        n = self.days * 86400 // BAR_SECONDS
+        bars, price = [], self.start_price
+        for i in range(n):
+            o = price
+            c = o * math.exp(rng.gauss(0.0, 0.0012))
+            spread = abs(rng.gauss(0.0, 0.0008)) * o
+            bars.append({
+                "time": end - (n - 1 - i) * BAR_SECONDS,
+                "open": round(o, 2), "high": round(max(o, c) + spread, 2),
+                "low": round(min(o, c) - spread, 2), "close": round(c, 2),
+                "volume": float(rng.randint(50, 500)),
+            })
+            price = c
+        return bars
+
+    def fetch_bars(self, since: float = None) -> list:
+        return self._load()
+
+    def fetch_quote(self) -> dict:
+        bars = self._load()
+        if not bars:
+            raise ValueError("fixture has no bars")
+        last = bars[-1]
+        day_ago = next((b for b in reversed(bars) if b["time"] <= last["time"] - 86400), bars[0])
+        change = (last["close"] - day_ago["close"]) / day_ago["close"] * 100 if day_ago["close"] else 0.0
+        return {"price": last["close"], "change_pct": change, "at": time.time()}
+
+
+def build_provider():
+    kind = str(_setting("MARKET_DATA_PROVIDER", "yahoo")).strip().lower()
+    if kind == "fixture":
+        return FixtureProvider(_setting("MARKET_DATA_FIXTURE") or None)
+    return YahooProvider()
+
+
+# ────────────────────────────────────────────────
+# LOCAL STORE (SQLite)
+# ────────────────────────────────────────────────
+class BarStore:
+    """bars(symbol, ts) → OHLCV + last quote per symbol; one connection per call (thread-safe)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as db:
+            db.execute("""
+                create table if not exists bars (
+                    symbol text not null, ts integer not null,
+                    open real, high real, low real, close real, volume real,
+                    primary key (symbol, ts)
+                ) without rowid
+            """)
+            db.execute("""
+                create table if not exists quotes (
+                    symbol text primary key, price real, change_pct real, at real
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def upsert_bars(self, symbol: str, bars: list):
+        with self._connect() as db:
+            db.executemany(
+                "insert or replace into bars values (?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, b["time"], b["open"], b["high"], b["low"], b["close"], b.get("volume", 0.0)) for b in bars]
+            )
+            db.execute("delete from bars where symbol = ? and ts < ?",
+                       (symbol, int(time.time()) - RETENTION_DAYS * 86400))
+
+    def load_bars(self, symbol: str, limit: int = MEMORY_BARS) -> list:
+        with self._connect() as db:
+            rows = db.execute(
+                "select ts, open, high, low, close, volume from bars where symbol = ? order by ts desc limit ?",
+                (symbol, limit)
+            ).fetchall()
+        return [{"time": r[0], "open": r[1], "high": r[2], "low": r[3], "close": r[4], "volume": r[5]}
+                for r in reversed(rows)]
+
+    def save_quote(self, symbol: str, quote: dict):
+        with self._connect() as db:
+            db.execute("insert or replace into quotes values (?, ?, ?, ?)",
+                       (symbol, quote["price"], quote["change_pct"], quote["at"]))
+
+    def load_quote(self, symbol: str):
+        with self._connect() as db:
+            row = db.execute("select price, change_pct, at from quotes where symbol = ?", (symbol,)).fetchone()
+        return {"price": row[0], "change_pct": row[1], "at": row[2]} if row else None
+
+
+# ────────────────────────────────────────────────
+# FEED
+# ────────────────────────────────────────────────
+class MarketDataFeed:
+    """Latest quote + recent bars in memory, refreshed by one daemon thread"""
+
+    def __init__(self, provider, db_path: str, symbol: str = SYMBOL):
+        self.provider = provider
+        self.db_path = db_path
+        self.symbol = symbol
+        self.lock = threading.Lock()
+        self.quote = None
+        self.bars = []
+        self.stats = {"quote_fetches": 0, "bar_fetches": 0, "failures": 0, "last_error": ""}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kmfx-market-data", daemon=True)
+        self._thread.start()
+
+    # ─── PUBLIC (memory only) ───
+    def get_quote(self):
+        with self.lock:
+            return dict(self.quote) if self.quote else None
+
+    def get_bars(self, limit: int = None) -> list:
+        with self.lock:
+            bars = self.bars if limit is None else self.bars[-limit:]
+            return list(bars)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {**self.stats, "provider": self.provider.name, "bars": len(self.bars)}
+
+    def close(self):
+        self._stop.set()
+
+    # ─── WORKER ───
+    def _run(self):
+        store = None
+        try:
+            store = BarStore(self.db_path)
+            bars, quote = store.load_bars(self.symbol), store.load_quote(self.symbol)
+            with self.lock:
+                self.bars, self.quote = bars, quote
+        except Exception as e:
+            self._fail(e)  # store unusable (read-only disk) → memory-only feed
+
+        # Quote and bars refresh independently — a dead intraday endpoint never starves the ticker
+        jobs = {
+            "bars": {"run": self._refresh_bars, "every": BARS_REFRESH, "due": 0.0, "failures": 0},
+            "quote": {"run": self._refresh_quote, "every": QUOTE_REFRESH, "due": 0.0, "failures": 0},
+        }
+        while not self._stop.is_set():
+            for job in jobs.values():
+                if time.monotonic() < job["due"]:
+                    continue
+                try:
+                    job["run"](store)
+                    job["failures"] = 0
+                    job["due"] = time.monotonic() + job["every"]
+                except Exception as e:
+                    self._fail(e)
+                    job["failures"] += 1
+                    job["due"] = time.monotonic() + min(job["every"] * (2 ** (job["failures"] - 1)), MAX_BACKOFF)
+            wait = min(job["due"] for job in jobs.values()) - time.monotonic()
+            self._stop.wait(max(wait, 1.0))
+
+    def _refresh_bars(self, store):
+        with self.lock:
+            since = self.bars[-1]["time"] if self.bars else None
+        fresh = self.provider.fetch_bars(since)
+        with self.lock:
+            self.stats["bar_fetches"] += 1
+        if not fresh:
+            return
+        if store is not None:
+            store.upsert_bars(self.symbol, fresh)
+        with self.lock:
+            merged = {b["time"]: b for b in self.bars}
+            merged.update((b["time"], b) for b in fresh)
+            self.bars = [merged[t] for t in sorted(merged)][-MEMORY_BARS:]
+
+    def _refresh_quote(self, store):
+        quote = self.provider.fetch_quote()
+        if store is not None:
+            store.save_quote(self.symbol, quote)
+        with self.lock:
+            self.quote = quote
+            self.stats["quote_fetches"] += 1
+
+    def _fail(self, error):
+        with self.lock:
+            self.stats["failures"] += 1
+            self.stats["last_error"] = str(error)[:200]
+
+
+@st.cache_resource
+def get_market_feed() -> MarketDataFeed:
+    return MarketDataFeed(build_provider(), _setting("MARKET_DATA_DB") or DB_PATH)
+
+
+def get_gold_quote():
+    """(price, change %) from memory — (None, 0.0) until the first quote lands"""
+    quote = get_market_feed().get_quote()
+    if not quote or not quote.get("price"):
+        return None, 0.0
+    return round(quote["price"], 1), round(quote.get("change_pct") or 0.0, 2)
+
+
+def get_gold_bars(limit: int = None) -> list:
+    """Candles for streamlit-lightweight-charts: [{"time", "open", "high", "low", "close"}, ...]"""
+    return [
+        {"time": b["time"], "open": b["open"], "high": b["high"], "low": b["low"], "close": b["close"]}
+        for b in get_market_feed().get_bars(limit)
+    ]
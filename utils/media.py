@@ -0,0 +1,136 @@
+# utils/media.py
+"""
+Image delivery for feeds/grids (Announcements, Testimonials)
+- "direct" mode (default): browser loads the public/signed URL itself —
+  walang bytes na dumadaan sa Streamlit server
+- "proxy" mode: bytes served from a size-bounded LRU cache keyed by
+  storage path, revalidated with ETag; misses fetched in parallel through
+  the shared pooled client (utils/http_transport.py — same pool as Supabase)
+Set IMAGE_DELIVERY = "proxy" in secrets/.env kung hindi reachable ng browser ang storage URLs
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import streamlit as st
+
+from utils.http_transport import get_http_client
+
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024   # 64 MB per server process
+IMAGE_REVALIDATE_AFTER = 600               # seconds before an ETag check
+IMAGE_FETCH_WORKERS = 8
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+
+def image_delivery_mode() -> str:
+    try:
+        mode = st.secrets.get("IMAGE_DELIVERY")
+    except Exception:
+        mode = None
+    return (mode or os.getenv("IMAGE_DELIVERY") or "direct").lower()
+
+
+def is_image(file_name: str) -> bool:
+    return (file_name or "").lower().endswith(IMAGE_EXTENSIONS)
+
+
+# ────────────────────────────────────────────────
+# LRU BYTE CACHE (bounded by total bytes)
+# ────────────────────────────────────────────────
+class ImageCache:
+    def __init__(self, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key → (bytes, etag, checked_at)
+        self.size = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, data: bytes, etag: str = None):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.size -= len(old[0])
+            if len(data) > self.max_bytes:
+                return
+            self.entries[key] = (data, etag, time.monotonic())
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (evicted, _, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def touch(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.entries[key] = (entry[0], entry[1], time.monotonic())
+
+
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    return ImageCache()
+
+
+def _fetch_one(cache: ImageCache, client: httpx.Client, key, url):
+    entry = cache.get(key)
+    if entry and time.monotonic() - entry[2] < IMAGE_REVALIDATE_AFTER:
+        return entry[0]
+
+    headers = {"If-None-Match": entry[1]} if entry and entry[1] else {}
+    try:
+        r = client.get(url, headers=headers)
+    except Exception:
+        return entry[0] if entry else None
+    if r.status_code == 304 and entry:
+        cache.touch(key)
+        return entry[0]
+    if r.status_code == 200:
+        cache.put(key, r.content, r.headers.get("ETag"))
+        return r.content
+    return entry[0] if entry else None
+
+
+def fetch_images(items) -> dict:
+    """
+    items: iterable of (cache_key, url) — cache_key is usually the storage_path
+    Returns {cache_key: bytes or None}; misses are fetched in parallel
+    """
+    items = [(k, u) for k, u in items if u]
+    if not items:
+        return {}
+    # Resolve shared resources on the script thread, not inside the workers
+    cache = get_image_cache()
+    client = get_http_client()
+    with ThreadPoolExecutor(max_workers=min(IMAGE_FETCH_WORKERS, len(items))) as pool:
+        results = pool.map(lambda kv: _fetch_one(cache, client, *kv), items)
+        return {k: data for (k, _), data in zip(items, results)}
+
+
+# ────────────────────────────────────────────────
+# RENDER HELPERS
+# ────────────────────────────────────────────────
+def prepare_images(items) -> dict:
+    """
+    Call ONCE per render with every (cache_key, url) on the page.
+    direct mode → {key: url}; proxy mode → {key: bytes} (parallel fetch)
+    """
+    items = list(items)
+    if image_delivery_mode() == "proxy":
+        return fetch_images(items)
+    return {k: u for k, u in items if u}
+
+
+def show_image(source, caption: str = None):
+    """st.image for either a URL (direct) or bytes (proxy)"""
+    if source:
+        st.image(source, use_column_width=True, caption=caption)
+    else:
+        st.caption(f"{caption or 'Image'} (unavailable)")
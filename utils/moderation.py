@@ -0,0 +1,67 @@
+# utils/moderation.py
+"""
+Bulk moderation helpers (Whitelist Monitor)
+- One update().in_("id", ids) per status change (chunked para hindi
+  lumampas sa URL limit ng PostgREST)
+- Status emails via the edge function through a bounded thread pool
+- Every helper returns per-row results {id: "ok" | error text} for the report
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.supabase_client import supabase
+
+UPDATE_CHUNK_SIZE = 150      # ~150 uuids per in_() keeps the URL well under 8 KB
+EMAIL_WORKERS = 6
+EMAIL_FUNCTION = "send-waitlist-confirmation"
+
+
+def bulk_update(table: str, ids, values: dict) -> dict:
+    """Apply the same values to many rows. Returns {id: "ok" | "not found" | error}."""
+    ids = [str(i) for i in dict.fromkeys(ids)]
+    results = {}
+    for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+        chunk = ids[start:start + UPDATE_CHUNK_SIZE]
+        try:
+            resp = supabase.table(table).update(values).in_("id", chunk).execute()
+            updated = {str(row["id"]) for row in resp.data or []}
+            for row_id in chunk:
+                results[row_id] = "ok" if row_id in updated else "not found"
+        except Exception as e:
+            for row_id in chunk:
+                results[row_id] = f"failed: {e}"
+    return results
+
+
+def _send_one(entry: dict, status: str) -> str:
+    try:
+        supabase.functions.invoke(
+            EMAIL_FUNCTION,
+            {"body": {
+                "name": entry.get("full_name") or "Anonymous",
+                "email": entry["email"],
+                "language": entry.get("language") or "en",
+                "status": status
+            }}
+        )
+        return "sent"
+    except Exception as e:
+        return f"failed: {e}"
+
+
+def send_status_emails(entries, status: str, max_workers: int = EMAIL_WORKERS) -> dict:
+    """Invoke the email edge function per entry, at most max_workers at a time → {id: result}"""
+    results = {}
+    targets = []
+    for entry in entries:
+        if entry.get("email"):
+            targets.append(entry)
+        else:
+            results[str(entry["id"])] = "skipped (no email)"
+    if not targets:
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as pool:
+        futures = {str(e["id"]): pool.submit(_send_one, e, status) for e in targets}
+        for row_id, fut in futures.items():
+            results[row_id] = fut.result()
+    return results
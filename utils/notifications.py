@@ -0,0 +1,81 @@
+# utils/notifications.py
+"""
+Notification fan-out + per-client reads for KMFX Empire
+- Broadcasts are inserted in bounded chunks (never one giant payload)
+- Clients read ONLY their own rows (server-side filter + limit)
+- Unread badge = one row from notification_unread_counts, kept up to date
+  by triggers (see supabase/migrations/20261017000600_notification_unread_counts.sql)
+"""
+from datetime import date
+
+from utils.query_cache import cached_query, invalidate
+from utils.supabase_client import supabase
+
+FANOUT_CHUNK_SIZE = 500
+CLIENT_FEED_LIMIT = 200
+ADMIN_FEED_LIMIT = 500
+
+
+def send_notification(recipients, title: str, message: str, category: str) -> int:
+    """Insert one notification per recipient, FANOUT_CHUNK_SIZE rows per request. Returns rows sent."""
+    base = {
+        "title": title,
+        "message": message,
+        "date": date.today().isoformat(),
+        "category": category,
+        "read": 0
+    }
+    names = list(dict.fromkeys(n for n in recipients if n))
+    sent = 0
+    try:
+        for start in range(0, len(names), FANOUT_CHUNK_SIZE):
+            chunk = names[start:start + FANOUT_CHUNK_SIZE]
+            supabase.table("notifications").insert([{**base, "client_name": n} for n in chunk]).execute()
+            sent += len(chunk)
+    finally:
+        if sent:
+            invalidate("notifications")
+    return sent
+
+
+@cached_query("notifications", ttl=30)
+def fetch_client_notifications(client_name: str, limit: int = CLIENT_FEED_LIMIT) -> list:
+    return supabase.table("notifications").select("*") \
+        .eq("client_name", client_name) \
+        .order("date", desc=True) \
+        .limit(limit) \
+        .execute().data or []
+
+
+@cached_query("notifications", ttl=30)
+def fetch_recent_notifications(limit: int = ADMIN_FEED_LIMIT) -> list:
+    """Owner/admin feed — latest N across all clients"""
+    return supabase.table("notifications").select("*") \
+        .order("date", desc=True) \
+        .limit(limit) \
+        .execute().data or []
+
+
+@cached_query("notifications", ttl=30)
+def unread_count(client_name: str) -> int:
+    """Badge count — one indexed single-row lookup"""
+    try:
+        rows = supabase.table("notification_unread_counts").select("unread") \
+            .eq("client_name", client_name).limit(1).execute().data or []
+    except Exception:
+        return 0
+    return int(rows[0]["unread"]) if rows else 0
+
+
+def mark_read(notification_ids):
+    ids = [str(i) for i in notification_ids]
+    if ids:
+        supabase.table("notifications").update({"read": 1}).in_("id", ids).eq("read", 0).execute()
+        invalidate("notifications")
+
+
+def mark_all_read(client_name: str):
+    """Every unread row of this client (not just the CLIENT_FEED_LIMIT shown) → badge back to 0"""
+    if client_name:
+        supabase.table("notifications").update({"read": 1}).eq("client_name", client_name).eq("read", 0).execute()
+        invalidate("notifications")
@@ -0,0 +1,103 @@
+# utils/public_stats.py
+"""
+Public landing stats snapshot for KMFX Empire (stale-while-revalidate)
+- One public_stats() RPC → accounts, equity, Growth Fund, members
+  (see supabase/migrations/20261017000900_public_stats.sql)
+- Process-wide snapshot served from memory — anonymous visitors never wait
+  on the database; stale reads just wake the refresher thread
+- One daemon thread does every refresh → a burst of 1,000 landing hits
+  causes at most one query; a failed refresh keeps serving the last snapshot
+- Counters: served / stale / refreshes / failures
+"""
+import threading
+import time
+
+import streamlit as st
+
+from utils.supabase_client import supabase
+
+FRESH_FOR = 60.0        # seconds a snapshot counts as fresh
+RETRY_AFTER = 15.0      # seconds before retrying a failed refresh
+
+
+def fetch_public_stats() -> dict:
+    rows = supabase.rpc("public_stats").execute().data or []
+    row = rows[0] if isinstance(rows, list) and rows else rows or {}
+    return {
+        "accounts_count": int(row.get("accounts_count") or 0),
+        "total_equity": float(row.get("total_equity") or 0.0),
+        "gf_balance": float(row.get("gf_balance") or 0.0),
+        "members_count": int(row.get("members_count") or 0),
+    }
+
+
+class PublicStatsCache:
+    """Last good snapshot + one refresher thread (woken by stale reads)"""
+
+    def __init__(self, fetch=fetch_public_stats, fresh_for: float = FRESH_FOR):
+        self.fetch = fetch
+        self.fresh_for = fresh_for
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.fetched_at = 0.0
+        self.last_failure = float("-inf")
+        self.stats = {"served": 0, "stale": 0, "refreshes": 0, "failures": 0}
+        self._wake = threading.Event()
+        self._wake.set()  # first refresh right away
+        self._thread = threading.Thread(target=self._run, name="kmfx-public-stats", daemon=True)
+        self._thread.start()
+
+    # ─── PUBLIC ───
+    def get(self):
+        """(snapshot or None, age in seconds) — never blocks on I/O"""
+        now = time.monotonic()
+        with self.lock:
+            snapshot, age = self.snapshot, now - self.fetched_at
+            self.stats["served"] += 1
+            stale = snapshot is None or age > self.fresh_for
+            if stale:
+                self.stats["stale"] += 1
+        if stale:
+            self._wake.set()
+        return snapshot, age
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return dict(self.stats)
+
+    # ─── WORKER ───
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self.lock:
+                fresh = self.snapshot is not None and time.monotonic() - self.fetched_at <= self.fresh_for
+                wait = RETRY_AFTER - (time.monotonic() - self.last_failure)
+            if fresh:
+                continue
+            if wait > 0:
+                time.sleep(wait)  # failed recently — stale reads keep the old snapshot meanwhile
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            snapshot = self.fetch()
+        except Exception:
+            with self.lock:
+                self.last_failure = time.monotonic()
+                self.stats["failures"] += 1
+            return
+        with self.lock:
+            self.snapshot = snapshot
+            self.fetched_at = time.monotonic()
+            self.stats["refreshes"] += 1
+
+
+@st.cache_resource
+def get_public_stats_cache() -> PublicStatsCache:
+    return PublicStatsCache()
+
+
+def get_public_stats():
+    """(snapshot dict or None, age seconds) — None only until the first refresh lands"""
+    return get_public_stats_cache().get()
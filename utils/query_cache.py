@@ -0,0 +1,191 @@
+# utils/query_cache.py
+"""
+Tag-based query cache for KMFX Empire (replaces global st.cache_data.clear())
+- @cached_query("table_a", "table_b", ttl=...) — each fetch declares the tables it reads
+- invalidate("table_a") after a write drops ONLY the entries tagged with that table
+- Process-wide (shared by all sessions), LRU-bounded, one fetch per key at a time
+  kaya sabay-sabay na sessions don't stampede Supabase after a write
+- Hit / miss / eviction / invalidation counters per query (owner stats panel)
+"""
+import copy
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import streamlit as st
+
+MAX_ENTRIES = 512
+DEFAULT_TTL = 60  # seconds
+
+_lock = threading.RLock()
+_entries = OrderedDict()        # key → (value, expires_at, tags)
+_tag_index = defaultdict(set)   # table → {key, ...}
+_generations = defaultdict(int) # table → bumped on every invalidate
+_key_locks = {}                 # key → [Lock, users] — only keys being fetched right now
+_queries = {}                   # query name → tags
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+_listeners = []                 # fn(tables) — called after every invalidate (change feed)
+
+
+# ────────────────────────────────────────────────
+# INTERNALS
+# ────────────────────────────────────────────────
+def _query_name(func) -> str:
+    # Pages all run as __main__, so qualify with the file name
+    source = os.path.basename(func.__code__.co_filename).removesuffix(".py")
+    return f"{source}.{func.__qualname__}"
+
+
+def _make_key(name: str, args, kwargs) -> tuple:
+    return (name, repr(args), repr(sorted(kwargs.items())))
+
+
+def _drop(key, reason: str):
+    """Remove one entry + its tag links (caller holds _lock)"""
+    entry = _entries.pop(key, None)
+    if entry is None:
+        return
+    for tag in entry[2]:
+        _tag_index[tag].discard(key)
+    _stats[key[0]][reason] += 1
+
+
+def _store(key, value, ttl, tags):
+    with _lock:
+        _drop(key, "evictions")
+        _entries[key] = (value, time.monotonic() + ttl, tags)
+        for tag in tags:
+            _tag_index[tag].add(key)
+        while len(_entries) > MAX_ENTRIES:
+            _drop(next(iter(_entries)), "evictions")
+
+
+def _acquire_key_lock(key):
+    """Single-flight lock for key, ref-counted (caller holds _lock)"""
+    slot = _key_locks.setdefault(key, [threading.Lock(), 0])
+    slot[1] += 1
+    return slot
+
+
+def _release_key_lock(key, slot):
+    """Last user out removes the lock → dict stays bounded by in-flight fetches"""
+    with _lock:
+        slot[1] -= 1
+        if slot[1] == 0 and _key_locks.get(key) is slot:
+            del _key_locks[key]
+
+
+def _lookup(key):
+    """Fresh cached value or None (caller holds _lock)"""
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if entry[1] <= time.monotonic():
+        _drop(key, "evictions")
+        return None
+    _entries.move_to_end(key)
+    return entry
+
+
+# ────────────────────────────────────────────────
+# PUBLIC API
+# ────────────────────────────────────────────────
+def cached_query(*tables, ttl: int = DEFAULT_TTL, show_spinner=None):
+    """
+    Decorator para sa Supabase fetch functions.
+    Results are deep-copied on the way out (same as st.cache_data) so callers can mutate freely.
+    fn.clear() drops just that query's entries (manual "Refresh" buttons).
+    """
+    tags = frozenset(tables)
+
+    def decorator(func):
+        name = _query_name(func)
+        _queries[name] = tags
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _make_key(name, args, kwargs)
+            with _lock:
+                entry = _lookup(key)
+                if entry is not None:
+                    _stats[name]["hits"] += 1
+                    return copy.deepcopy(entry[0])
+                slot = _acquire_key_lock(key)
+
+            try:
+                with slot[0]:
+                    # Another session may have filled it while we waited
+                    with _lock:
+                        entry = _lookup(key)
+                        if entry is not None:
+                            _stats[name]["hits"] += 1
+                            return copy.deepcopy(entry[0])
+                        _stats[name]["misses"] += 1
+                        generation = {tag: _generations[tag] for tag in tags}
+
+                    if show_spinner:
+                        with st.spinner(show_spinner):
+                            value = func(*args, **kwargs)
+                    else:
+                        value = func(*args, **kwargs)
+
+                    # Skip caching if a write to one of our tables landed mid-fetch
+                    with _lock:
+                        if all(_generations[tag] == gen for tag, gen in generation.items()):
+                            _store(key, value, ttl, tags)
+            finally:
+                _release_key_lock(key, slot)
+            return copy.deepcopy(value)
+
+        def clear():
+            with _lock:
+                for key in [k for k in _entries if k[0] == name]:
+                    _drop(key, "invalidations")
+
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tables):
+    """Call after a write — drops every cached query that reads any of these tables"""
+    with _lock:
+        for table in tables:
+            _generations[table] += 1
+            for key in list(_tag_index.get(table, ())):
+                _drop(key, "invalidations")
+    for listener in list(_listeners):
+        listener(tables)
+
+
+def clear_all():
+    """Drop every cached entry (counters are kept) — cold-start benchmarks / tests"""
+    with _lock:
+        for key in list(_entries):
+            _drop(key, "invalidations")
+
+
+def add_invalidation_listener(fn):
+    """Register fn(tables) to run after every invalidate() (used by utils/change_feed.py)"""
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+
+def get_cache_stats() -> list:
+    """Per-query counters + live entry count, for the owner stats panel"""
+    with _lock:
+        live = defaultdict(int)
+        for key in _entries:
+            live[key[0]] += 1
+        return [
+            {
+                "query": name,
+                "tables": ", ".join(sorted(tags)),
+                "entries": live[name],
+                **_stats[name]
+            }
+            for name, tags in sorted(_queries.items())
+        ]
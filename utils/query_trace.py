@@ -0,0 +1,226 @@
+# utils/query_trace.py
+"""
+Per-rerun Supabase query instrumentation for KMFX Empire
+- TracedClient wraps the client from get_supabase(): every .execute() records
+  table, operation, filters, rows, payload size and latency
+- Grouped by page + session + rerun (render_sidebar() calls begin_rerun())
+- Sampling is per rerun (whole rerun traced or not) — QUERY_TRACE_SAMPLE in
+  secrets/.env, 0.0–1.0 (default 0.05); unsampled reruns only pay one dict lookup per query
+- Payload size is an estimate (one serialized row × row count), never a
+  re-serialization of the whole response
+- Process-wide ring buffer (owner diagnostics page reads it, JSON/CSV export)
+Storage / edge function calls pass through untouched
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+MAX_RECORDS = 5000
+DEFAULT_SAMPLE_RATE = 0.05
+ARG_PREVIEW = 40         # chars per filter argument kept in the record
+ACTION_METHODS = {"select", "insert", "update", "upsert", "delete"}
+VALUE_ONLY_METHODS = {"limit", "range", "or_", "single", "maybe_single"}  # shape = name only
+RERUN_KEY = "_query_trace_rerun"
+
+_lock = threading.Lock()
+_records = deque(maxlen=MAX_RECORDS)
+_sample_rate = None      # None → read QUERY_TRACE_SAMPLE on first use
+
+
+# ────────────────────────────────────────────────
+# SAMPLING + RERUN CONTEXT
+# ────────────────────────────────────────────────
+def get_sample_rate() -> float:
+    global _sample_rate
+    if _sample_rate is None:
+        try:
+            raw = st.secrets.get("QUERY_TRACE_SAMPLE")
+        except Exception:
+            raw = None
+        raw = raw if raw is not None else os.getenv("QUERY_TRACE_SAMPLE", str(DEFAULT_SAMPLE_RATE))
+        try:
+            _sample_rate = min(max(float(raw), 0.0), 1.0)
+        except ValueError:
+            _sample_rate = DEFAULT_SAMPLE_RATE
+    return _sample_rate
+
+
+def set_sample_rate(rate: float):
+    """Process-wide — owner can dial it down from the diagnostics page"""
+    global _sample_rate
+    _sample_rate = min(max(float(rate), 0.0), 1.0)
+
+
+def _current_page(ctx) -> str:
+    try:
+        page = ctx.pages_manager.get_pages().get(ctx.pages_manager.current_page_script_hash) or {}
+        return os.path.basename(page.get("script_path") or "").removesuffix(".py") or "main"
+    except Exception:
+        return "unknown"
+
+
+def begin_rerun():
+    """Start a new trace group for this session (call once at the top of every page run)"""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    prev = st.session_state.get(RERUN_KEY) or {}
+    st.session_state[RERUN_KEY] = {
+        "rerun": prev.get("rerun", 0) + 1,
+        "page": _current_page(ctx),
+        "sampled": random.random() < get_sample_rate(),
+    }
+
+
+def _trace_context():
+    """(page, session, rerun, fragment) for this query — None if it shouldn't be recorded"""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        # Background threads (log writer, renditions, thread pools)
+        if random.random() >= get_sample_rate():
+            return None
+        return ("background", "-", 0, False)
+    current = ctx.session_state[RERUN_KEY] if RERUN_KEY in ctx.session_state else None
+    if current is None:
+        # Page na hindi dumadaan sa render_sidebar() (public landing)
+        if random.random() >= get_sample_rate():
+            return None
+        return (_current_page(ctx), ctx.session_id[:8], 0, bool(ctx.fragment_ids_this_run))
+    if not current["sampled"]:
+        return None
+    return (current["page"], ctx.session_id[:8], current["rerun"], bool(ctx.fragment_ids_this_run))
+
+
+# ────────────────────────────────────────────────
+# CLIENT WRAPPER
+# ────────────────────────────────────────────────
+def _estimate_bytes(data) -> int:
+    """~JSON size: first row serialized × row count (O(1 row), not O(payload))"""
+    if data is None:
+        return 0
+    if isinstance(data, list):
+        if not data:
+            return 2
+        return len(json.dumps(data[0], default=str)) * len(data) + len(data) + 1
+    return len(json.dumps(data, default=str)) if isinstance(data, dict) else len(str(data))
+
+
+def _preview(value) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return f"[{len(value)} items]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(list(value)[:6]) + "}"
+    text = str(value)
+    return text if len(text) <= ARG_PREVIEW else text[:ARG_PREVIEW] + "…"
+
+
+class _TracedQuery:
+    """Proxy over a postgrest request builder — remembers the call chain until .execute()"""
+
+    def __init__(self, builder, table: str, operation: str, filters: tuple = (), shape: tuple = ()):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._filters = filters
+        self._shape = shape
+
+    def _chain(self, result, name: str, args=()):
+        if name in ACTION_METHODS:
+            return _TracedQuery(result, self._table, name, self._filters, self._shape)
+        step = f"{name}({', '.join(_preview(a) for a in args)})"
+        # Shape = same call chain minus the values → repeated shapes in one rerun = N+1
+        column = args[0] if args and isinstance(args[0], str) and name not in VALUE_ONLY_METHODS else None
+        shape = f"{name}({column})" if column else name
+        return _TracedQuery(result, self._table, self._operation, self._filters + (step,), self._shape + (shape,))
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # .not_ is a property that returns the (negated) builder
+            return self._chain(attr, name) if hasattr(attr, "execute") else attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return self._chain(result, name, args) if hasattr(result, "execute") else result
+        return call
+
+    def execute(self):
+        where = _trace_context()
+        if where is None:
+            return self._builder.execute()
+
+        started = time.perf_counter()
+        error = None
+        try:
+            response = self._builder.execute()
+            return response
+        except Exception as e:
+            error, response = str(e)[:200], None
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            data = getattr(response, "data", None)
+            _record(
+                where, self._table, self._operation, self._filters, self._shape,
+                rows=len(data) if isinstance(data, list) else int(data is not None),
+                payload=_estimate_bytes(data),
+                ms=elapsed_ms, error=error
+            )
+
+
+class TracedClient:
+    """Drop-in wrapper: table()/from_()/rpc() are traced, everything else delegates"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str):
+        return _TracedQuery(self._client.table(name), name, "select")
+
+    from_ = table
+
+    def rpc(self, fn: str, params=None, *args, **kwargs):
+        return _TracedQuery(self._client.rpc(fn, params, *args, **kwargs), f"rpc:{fn}", "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ────────────────────────────────────────────────
+# RECORDS
+# ────────────────────────────────────────────────
+def _record(where, table, operation, filters, shape, rows: int, payload: int, ms: float, error=None):
+    page, session, rerun, fragment = where
+    with _lock:
+        _records.append({
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "page": page,
+            "session": session,
+            "rerun": rerun,
+            "fragment": fragment,
+            "table": table,
+            "operation": operation,
+            "filters": " · ".join(filters),
+            "shape": " · ".join(shape),
+            "rows": rows,
+            "bytes": payload,
+            "ms": round(ms, 2),
+            "error": error or "",
+        })
+
+
+def get_traces() -> list:
+    with _lock:
+        return list(_records)
+
+
+def clear_traces():
+    with _lock:
+        _records.clear()
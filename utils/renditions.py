@@ -0,0 +1,85 @@
+# utils/renditions.py
+"""
+Upload-time image renditions (thumb + medium) for testimonials,
+announcement attachments and vault uploads
+- Resize runs in a process pool (hindi naba-block ang session ng uploader)
+- Renditions are stored next to the original: <folder>/renditions/<name>_thumb.webp
+- Rendition paths/URLs are written back to the row when ready
+  (thumb_path, thumb_url, medium_path, medium_url)
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import streamlit as st
+
+from utils.imaging import build_renditions, photo_format
+from utils.query_cache import invalidate
+from utils.supabase_client import supabase
+
+RENDITION_WORKERS = 2
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+
+@st.cache_resource
+def get_rendition_pool() -> ProcessPoolExecutor:
+    """One small process pool per server (CPU-bound PIL work)"""
+    return ProcessPoolExecutor(max_workers=RENDITION_WORKERS)
+
+
+def rendition_paths(storage_path: str) -> dict:
+    """Original storage path → {"thumb": path, "medium": path}"""
+    folder, _, file_name = storage_path.rpartition("/")
+    stem = os.path.splitext(file_name)[0]
+    _, ext, _ = photo_format()
+    prefix = f"{folder}/renditions" if folder else "renditions"
+    return {name: f"{prefix}/{stem}_{name}.{ext}" for name in ("thumb", "medium")}
+
+
+def _store_renditions(future, bucket: str, storage_path: str, table: str, row_id, public: bool):
+    try:
+        renditions = future.result()
+        paths = rendition_paths(storage_path)
+        _, _, content_type = photo_format()
+        update = {}
+        for name, data in renditions.items():
+            supabase.storage.from_(bucket).upload(
+                path=paths[name],
+                file=data,
+                file_options={"content-type": content_type, "upsert": "true"}
+            )
+            update[f"{name}_path"] = paths[name]
+            if public:
+                update[f"{name}_url"] = supabase.storage.from_(bucket).get_public_url(paths[name])
+        supabase.table(table).update(update).eq("id", row_id).execute()
+        invalidate(table)  # thumbs appear on the next render
+    except Exception:
+        pass  # Grids fall back to the original when renditions are missing
+
+
+def schedule_renditions(content: bytes, file_name: str, bucket: str, storage_path: str,
+                        table: str, row_id, public: bool = True) -> bool:
+    """
+    Queue thumb/medium generation for an uploaded image and return immediately.
+    Returns False for non-images (nothing scheduled).
+    """
+    if not content or not storage_path or not (file_name or "").lower().endswith(IMAGE_EXTENSIONS):
+        return False
+    future = get_rendition_pool().submit(build_renditions, content)
+    # Upload + row update happen when the pool finishes, off the script thread
+    threading.Thread(
+        target=_store_renditions,
+        args=(future, bucket, storage_path, table, row_id, public),
+        daemon=True
+    ).start()
+    return True
+
+
+def remove_renditions(bucket: str, storage_path: str):
+    """Best-effort cleanup when the original is deleted"""
+    if not storage_path:
+        return
+    try:
+        supabase.storage.from_(bucket).remove(list(rendition_paths(storage_path).values()))
+    except Exception:
+        pass
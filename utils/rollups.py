@@ -0,0 +1,103 @@
+# utils/rollups.py
+"""
+Server-side profit aggregation for KMFX Empire
+- Totals, per-participant shares, per-month gross profit
+- Read from mv_profit_totals / mv_participant_shares / mv_monthly_profits
+  (see supabase/migrations/20261017000100_profit_rollups.sql)
+- Payload stays a few KB kahit lumaki ang profits / profit_distributions
+- Writes only mark the rollups dirty (see 20261017001100_profit_rollups_debounce.sql);
+  one background thread per process runs the refresh — reads just wake it, never wait
+"""
+import threading
+import time
+
+import streamlit as st
+
+from utils.supabase_client import supabase
+
+REFRESH_EVERY = 15.0    # seconds — at most one refresh attempt per window
+
+
+class RollupRefresher:
+    """Daemon thread that calls refresh_profit_rollups_if_dirty() when woken (throttled)"""
+
+    def __init__(self, every: float = REFRESH_EVERY):
+        self.every = every
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kmfx-rollup-refresh", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                supabase.rpc("refresh_profit_rollups_if_dirty").execute()
+            except Exception:
+                pass  # serve the last refresh; the next wake-up (or pg_cron) catches up
+            time.sleep(self.every)
+
+
+@st.cache_resource
+def get_rollup_refresher() -> RollupRefresher:
+    return RollupRefresher()
+
+
+def request_rollup_refresh():
+    """Non-blocking — call after a profit write or on read"""
+    get_rollup_refresher().request()
+
+
+def fetch_profit_rollups() -> dict:
+    """
+    Returns:
+    {
+        "total_gross": float,
+        "total_distributed": float,             # excludes Growth Fund rows
+        "participant_shares": {name: total},    # sorted desc, excludes Growth Fund rows
+        "all_participant_shares": {name: total},# sorted desc, every distribution
+        "monthly_gross": [{"month": "YYYY-MM", "gross_profit": float, "growth_fund_add": float}, ...]
+    }
+    Raises on query failure — callers already wrap their fetch in try/except.
+    Reads the views only; a pending refresh runs on the background thread.
+    """
+    request_rollup_refresh()
+
+    totals_resp = supabase.table("mv_profit_totals").select("total_gross, total_distributed").execute()
+    totals = totals_resp.data[0] if totals_resp.data else {}
+
+    shares = supabase.table("mv_participant_shares") \
+        .select("participant_name, is_growth_fund, total_share") \
+        .order("total_share", desc=True) \
+        .execute().data or []
+
+    monthly = supabase.table("mv_monthly_profits") \
+        .select("month, gross_profit, growth_fund_add") \
+        .order("month") \
+        .execute().data or []
+
+    all_shares = {}
+    for s in shares:
+        all_shares[s["participant_name"]] = all_shares.get(s["participant_name"], 0.0) + float(s.get("total_share") or 0.0)
+    all_shares = dict(sorted(all_shares.items(), key=lambda kv: kv[1], reverse=True))
+
+    return {
+        "total_gross": float(totals.get("total_gross") or 0.0),
+        "total_distributed": float(totals.get("total_distributed") or 0.0),
+        "participant_shares": {
+            s["participant_name"]: float(s.get("total_share") or 0.0)
+            for s in shares if not s.get("is_growth_fund")
+        },
+        "all_participant_shares": all_shares,
+        "monthly_gross": [
+            {
+                "month": m["month"],
+                "gross_profit": float(m.get("gross_profit") or 0.0),
+                "growth_fund_add": float(m.get("growth_fund_add") or 0.0)
+            }
+            for m in monthly
+        ]
+    }
@@ -0,0 +1,160 @@
+# utils/scenario_sweep.py
+"""
+Scenario sweep for the Empire Growth Simulator
+- User sweeps 2–3 parameters over ranges → full grid of end states
+- Only the account count changes the profit distribution; GF %, gross per
+  account, manual in and GF spend are exact rescales / shifts. So ONE Monte
+  Carlo per distinct account count (spread across a process pool), then the
+  whole grid is a NumPy broadcast
+- Memoized by parameter hash (process-wide LRU) → revisiting a grid is instant
+- Break-even frontier = where net Growth Fund change over the horizon is 0
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import streamlit as st
+
+from utils.simulation import PERCENTILES, end_state, final_gross_percentiles, fit_to_target
+
+SWEEP_PARAMS = {
+    "accounts":      "Projected Active Accounts",
+    "gf_pct":        "Growth Fund %",
+    "gross_per_acc": "Avg Monthly Gross per Account (USD)",
+    "manual_in":     "Monthly Manual In to GF (USD)",
+    "gf_spend":      "Monthly GF Spend (USD)",
+}
+SWEEP_PATHS = 10_000
+SWEEP_SEED = 2026
+MAX_GRID_POINTS = 250_000
+MEMO_SIZE = 16
+SWEEP_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+_memo_lock = threading.Lock()
+_memo = OrderedDict()  # param hash → result
+
+
+@st.cache_resource
+def get_sweep_pool() -> ProcessPoolExecutor:
+    """Warm worker processes shared by all sessions (spawn — no forked Streamlit threads)"""
+    return ProcessPoolExecutor(max_workers=SWEEP_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+def sweep_hash(returns: np.ndarray, fixed: dict, axes: dict, months: int, start_gf: float,
+               n_paths: int, seed: int) -> str:
+    h = hashlib.sha256(np.ascontiguousarray(returns, dtype=float).tobytes())
+    h.update(json.dumps({
+        "fixed": fixed,
+        "axes": {k: [float(v) for v in vals] for k, vals in axes.items()},
+        "months": months, "start_gf": start_gf, "n_paths": n_paths, "seed": seed,
+    }, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _account_percentiles(returns, accounts_values, months: int, n_paths: int, seed: int):
+    """{accounts: percentile row} — chunks fanned out to the process pool"""
+    if len(accounts_values) == 1:
+        rows = final_gross_percentiles(returns, accounts_values, months, n_paths, seed)
+        return dict(zip(accounts_values, rows)), 1
+
+    n_chunks = min(len(accounts_values), SWEEP_WORKERS * 2)
+    chunks = [c.tolist() for c in np.array_split(np.array(accounts_values), n_chunks) if len(c)]
+    pool = None
+    try:
+        pool = get_sweep_pool()
+        futures = [pool.submit(final_gross_percentiles, returns, c, months, n_paths, seed) for c in chunks]
+        rows = np.concatenate([f.result() for f in futures])
+        workers = SWEEP_WORKERS
+    except (BrokenProcessPool, OSError):
+        # Crashed worker / sandboxed host — drop the cached pool so the next sweep
+        # gets fresh workers, and finish this one on one core (same numbers)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        get_sweep_pool.clear()
+        rows = final_gross_percentiles(returns, accounts_values, months, n_paths, seed)
+        workers = 1
+    return dict(zip(accounts_values, rows)), workers
+
+
+def run_sweep(returns, fixed: dict, axes: dict, months: int, start_gf: float,
+              n_paths: int = SWEEP_PATHS, seed: int = SWEEP_SEED):
+    """
+    fixed = value for every SWEEP_PARAMS key; axes = {param: values} (2–3 keys, overrides fixed)
+    Returns (result, from_cache). result arrays are shaped like the grid (axes order, "ij").
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.size == 0:
+        returns = np.array([1.0])  # walang history → deterministic, rescaled by gross_per_acc
+    grid_points = int(np.prod([len(v) for v in axes.values()]))
+    if grid_points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid too large ({grid_points:,} points, max {MAX_GRID_POINTS:,})")
+
+    key = sweep_hash(returns, fixed, axes, months, start_gf, n_paths, seed)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key], True
+
+    started = time.perf_counter()
+    names = list(axes)
+    mesh = dict(zip(names, np.meshgrid(*[np.asarray(axes[n], dtype=float) for n in names], indexing="ij")))
+    params = {k: mesh.get(k, np.float64(fixed[k])) for k in SWEEP_PARAMS}
+
+    grid_shape = tuple(len(axes[n]) for n in names)
+    accounts = np.broadcast_to(np.rint(params["accounts"]).astype(int), grid_shape)
+    accounts_values = sorted({int(a) for a in np.unique(accounts)})
+    table, workers = _account_percentiles(returns, accounts_values, months, n_paths, seed)
+
+    # Percentile rows per grid point, fitted to the requested gross per account
+    # (shift case: every one of accounts × months draws moves by `shift` → exact offset)
+    lookup = np.array([table[a] for a in accounts_values])                        # (n_acc, n_pct)
+    idx = np.searchsorted(accounts_values, accounts)
+    hist_mean = returns.mean()
+    scale, shift = fit_to_target(hist_mean, params["gross_per_acc"])
+    final_gross = np.moveaxis(lookup[idx], -1, 0) * scale + accounts * months * shift
+
+    state = end_state(final_gross, months, start_gf, params["gf_pct"], params["manual_in"], params["gf_spend"])
+    p5, p50 = PERCENTILES.index(5), PERCENTILES.index(50)
+    result = {
+        "axes": [(n, list(axes[n])) for n in names],
+        "growth_fund_p50": state["growth_fund"][p50],
+        "distributed_p50": state["distributed"][p50],
+        "net_growth_fund_p50": state["net_growth_fund"][p50],
+        "net_growth_fund_p5": state["net_growth_fund"][p5],
+        "grid_points": grid_points,
+        "fit": "scale" if hist_mean > 0 else "shift",
+        "simulations": len(accounts_values),
+        "workers": workers,
+        "seconds": time.perf_counter() - started,
+    }
+    with _memo_lock:
+        _memo[key] = result
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result, False
+
+
+def break_even_points(values_x, values_y, net) -> list:
+    """
+    Per x value: the y where net GF change crosses 0 (linear interpolation),
+    None if it never crosses within the swept range. net shape = (len(x), len(y))
+    """
+    values_y = np.asarray(values_y, dtype=float)
+    points = []
+    for i, x in enumerate(values_x):
+        row = net[i]
+        crossing = np.nonzero(np.diff(np.sign(row)) != 0)[0]
+        if crossing.size == 0:
+            points.append((x, None))
+            continue
+        j = crossing[0]
+        y0, y1, n0, n1 = values_y[j], values_y[j + 1], row[j], row[j + 1]
+        points.append((x, float(y0 if n1 == n0 else y0 + (y1 - y0) * (-n0) / (n1 - n0))))
+    return points
@@ -1,5 +1,8 @@
 import streamlit as st
 
+from utils.notifications import unread_count
+from utils.query_trace import begin_rerun
+
 def render_sidebar():
     """
     Role-based sidebar navigation – clean, logical order, no redundancy
@@ -7,6 +10,8 @@ def render_sidebar():
     - Admin: operational management
     - Owner: full empire control (FTMO Accounts first, then Profit Sharing, etc.)
     """
+    begin_rerun()  # new query-trace group (every page calls render_sidebar first)
+
     # Get current user info safely
     role = st.session_state.get("role", "guest").lower().strip()
     full_name = st.session_state.get("full_name", "Guest")
@@ -22,11 +27,12 @@ def render_sidebar():
 
     # ── CLIENT VIEW (personal access only) ────────────────────────────────
     if role == "client":
+        unread = unread_count(full_name)  # one-row counter lookup (cached)
         st.sidebar.page_link("pages/💰_Profit_Sharing.py", label="💰 My Earnings")
         st.sidebar.page_link("pages/💳_Withdrawals.py", label="💳 Withdrawals")
         st.sidebar.page_link("pages/🌱_Growth_Fund.py", label="🌱 Growth Fund")
         st.sidebar.page_link("pages/🤖_EA_Versions.py", label="🤖 EA Versions")
-        st.sidebar.page_link("pages/🔔_Notifications.py", label="🔔 Notifications")
+        st.sidebar.page_link("pages/🔔_Notifications.py", label=f"🔔 Notifications ({unread})" if unread else "🔔 Notifications")
         st.sidebar.page_link("pages/📸_Testimonials.py", label="📸 Testimonials")
 
     # ── ADMIN VIEW (operations + moderation) ──────────────────────────────
@@ -59,6 +65,7 @@ def render_sidebar():
 
         # Oversight & broadcast
         st.sidebar.page_link("pages/📜_Audit_Logs.py", label="📜 Audit Logs")
+        st.sidebar.page_link("pages/🩺_Query_Diagnostics.py", label="🩺 Query Diagnostics")
         st.sidebar.page_link("pages/📢_Announcements.py", label="📢 Announcements")
         st.sidebar.page_link("pages/🔔_Notifications.py", label="🔔 Notifications")
         st.sidebar.page_link("pages/📁_File_Vault.py", label="📁 File Vault")
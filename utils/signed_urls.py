@@ -0,0 +1,82 @@
+# utils/signed_urls.py
+"""
+Process-wide signed URL cache for Supabase Storage
+- Keyed by (bucket, storage_path); reused until shortly before expiry
+- Misses are signed in BULK via create_signed_urls (one request per chunk)
+- Chunks run concurrently in a small thread pool
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.supabase_client import supabase
+
+SIGNED_URL_EXPIRY = 3600 * 24     # 24 hours
+REFRESH_MARGIN = 3600             # re-sign when less than 1 hour left
+SIGN_CHUNK_SIZE = 100
+SIGN_WORKERS = 4
+
+_lock = threading.Lock()
+_cache = {}  # (bucket, storage_path) → (signed_url, expires_at)
+
+
+def _sign_chunk(bucket: str, paths: list, expires_in: int) -> dict:
+    signed = supabase.storage.from_(bucket).create_signed_urls(paths, expires_in)
+    out = {}
+    for item in signed or []:
+        url = item.get("signedURL") or item.get("signedUrl")
+        if url and not item.get("error"):
+            out[item.get("path")] = url
+    return out
+
+
+def get_signed_urls(bucket: str, storage_paths, expires_in: int = SIGNED_URL_EXPIRY) -> dict:
+    """
+    Returns {storage_path: signed_url} for every path that could be signed.
+    Cached URLs are returned as-is until REFRESH_MARGIN before they expire.
+    """
+    paths = list(dict.fromkeys(p for p in storage_paths if p))
+    now = time.time()
+    result = {}
+    missing = []
+
+    with _lock:
+        for path in paths:
+            cached = _cache.get((bucket, path))
+            if cached and cached[1] - now > REFRESH_MARGIN:
+                result[path] = cached[0]
+            else:
+                missing.append(path)
+
+    if not missing:
+        return result
+
+    chunks = [missing[i:i + SIGN_CHUNK_SIZE] for i in range(0, len(missing), SIGN_CHUNK_SIZE)]
+    signed = {}
+    if len(chunks) == 1:
+        try:
+            signed.update(_sign_chunk(bucket, chunks[0], expires_in))
+        except Exception:
+            pass
+    else:
+        with ThreadPoolExecutor(max_workers=min(SIGN_WORKERS, len(chunks))) as pool:
+            futures = [pool.submit(_sign_chunk, bucket, chunk, expires_in) for chunk in chunks]
+            for fut in futures:
+                try:
+                    signed.update(fut.result())
+                except Exception:
+                    pass  # That chunk stays unsigned; next render retries it
+
+    expires_at = now + expires_in
+    with _lock:
+        for path, url in signed.items():
+            _cache[(bucket, path)] = (url, expires_at)
+    result.update(signed)
+    return result
+
+
+def invalidate_signed_urls(bucket: str, storage_paths):
+    """Forget URLs for deleted/replaced objects"""
+    with _lock:
+        for path in storage_paths:
+            _cache.pop((bucket, path), None)
@@ -0,0 +1,156 @@
+# utils/simulation.py
+"""
+Monte Carlo engine for the Empire Growth Simulator
+- Bootstraps monthly per-account gross from the real profits history
+  (zero months kept — an account with no payout that month is a real outcome)
+- Vectorized: paths × months as NumPy arrays, walang Python loop per month
+- Sum of N accounts per month = draw from a pre-built pool of N-account sums
+  (exact bootstrap distribution, cost independent of N per path-month)
+- Every projected series is an increasing affine map of cumulative gross, so
+  P5/P50/P95 of cumulative gross → bands for equity, GF, distributed, units
+- Scenario sweeps only need final-gross percentiles per distinct account count
+  (final_gross_percentiles — runs inside the sweep process pool)
+"""
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (5, 50, 95)
+SUM_POOL_SIZE = 1 << 16      # 65,536 pre-drawn N-account monthly totals
+POOL_CHUNK = 1 << 22         # max draws materialized at once while building the pool
+MAX_PATHS = 100_000
+
+
+def monthly_account_returns(profits) -> np.ndarray:
+    """
+    profits rows (account_id, gross_profit, record_date) → 1-D array of monthly
+    per-account gross, zero-filled from each account's first record to the latest month
+    """
+    if not profits:
+        return np.empty(0)
+    df = pd.DataFrame(profits)
+    if "account_id" not in df:
+        df["account_id"] = None
+    df["account_id"] = df["account_id"].fillna("unknown").astype(str)
+    df["month"] = pd.to_datetime(df["record_date"]).dt.to_period("M")
+    df["gross_profit"] = pd.to_numeric(df["gross_profit"], errors="coerce").fillna(0.0)
+
+    monthly = df.groupby(["account_id", "month"])["gross_profit"].sum()
+    last = df["month"].max()
+    samples = []
+    for _, series in monthly.groupby(level=0):
+        series = series.droplevel(0)
+        months = pd.period_range(series.index.min(), last, freq="M")
+        samples.append(series.reindex(months, fill_value=0.0).to_numpy(dtype=float))
+    return np.concatenate(samples)
+
+
+def fit_to_target(hist_mean, target_mean):
+    """
+    (scale, shift) so that returns * scale + shift has mean target_mean.
+    Profitable history → rescale (shape stays proportional); zero / loss-making
+    history → shift instead (rescaling a negative mean would flip or ignore the target)
+    Broadcasts over target_mean arrays (scenario sweep).
+    """
+    target_mean = np.asarray(target_mean, dtype=float)
+    if hist_mean > 0:
+        return target_mean / hist_mean, np.zeros_like(target_mean)
+    return np.ones_like(target_mean), target_mean - hist_mean
+
+
+def build_sum_pool(returns: np.ndarray, accounts: int, rng: np.random.Generator,
+                   pool_size: int = SUM_POOL_SIZE) -> np.ndarray:
+    """pool_size draws of (sum of `accounts` bootstrapped monthly returns)"""
+    returns = np.asarray(returns, dtype=float)
+    pool = np.zeros(pool_size)
+    if accounts <= 0 or returns.size == 0:
+        return pool
+    step = max(1, POOL_CHUNK // pool_size)
+    for start in range(0, accounts, step):
+        k = min(step, accounts - start)
+        pool += returns[rng.integers(0, returns.size, size=(pool_size, k))].sum(axis=1)
+    return pool
+
+
+def simulate_cumulative_gross(pool: np.ndarray, months: int, n_paths: int,
+                              rng: np.random.Generator, scale: float = 1.0) -> np.ndarray:
+    """(n_paths, months + 1) cumulative gross, column 0 = 0"""
+    paths = np.empty((n_paths, months + 1))
+    paths[:, 0] = 0.0
+    paths[:, 1:] = pool[rng.integers(0, pool.size, size=(n_paths, months))]
+    if scale != 1.0:
+        paths[:, 1:] *= scale
+    np.cumsum(paths[:, 1:], axis=1, out=paths[:, 1:])
+    return paths
+
+
+def project_bands(cum_gross_bands: np.ndarray, start_equity: float, start_gf: float,
+                  gf_pct: float, manual_in: float, unit_value: float) -> dict:
+    """
+    Percentile rows of cumulative gross (len(PERCENTILES), months + 1) → same-shape
+    bands per series (same formulas as the deterministic monthly metrics)
+    """
+    g = gf_pct / 100.0
+    m = np.arange(cum_gross_bands.shape[1])
+    return {
+        "equity": start_equity + cum_gross_bands,
+        "growth_fund": start_gf + g * cum_gross_bands + manual_in * m,
+        "distributed": (1 - g) * cum_gross_bands - manual_in * m,
+        "units": cum_gross_bands / unit_value if unit_value > 0 else np.zeros_like(cum_gross_bands),
+    }
+
+
+def run_monte_carlo(returns, accounts: int, months: int, n_paths: int, target_mean: float,
+                    start_equity: float, start_gf: float, gf_pct: float, manual_in: float,
+                    unit_value: float, seed=None) -> dict:
+    """
+    Full simulation → {"percentiles", "fit", "equity", "growth_fund", "distributed", "units"}
+    target_mean rescales (or shifts, see fit_to_target) the bootstrapped returns so the
+    mean monthly gross per account matches the slider. fit = "scale" | "shift"
+    """
+    rng = np.random.default_rng(seed)
+    returns = np.asarray(returns, dtype=float)
+    if returns.size == 0:
+        returns = np.array([target_mean])  # walang history → deterministic
+    hist_mean = returns.mean()
+    scale, shift = fit_to_target(hist_mean, target_mean)
+
+    n_paths = int(min(max(n_paths, 1), MAX_PATHS))
+    pool = build_sum_pool(returns * float(scale) + float(shift), accounts, rng)
+    paths = simulate_cumulative_gross(pool, months, n_paths, rng)
+    cum_bands = np.percentile(paths, PERCENTILES, axis=0)
+    return {
+        "percentiles": PERCENTILES,
+        "fit": "scale" if hist_mean > 0 else "shift",
+        **project_bands(cum_bands, start_equity, start_gf, gf_pct, manual_in, unit_value),
+    }
+
+
+# ────────────────────────────────────────────────
+# SCENARIO SWEEP (see utils/scenario_sweep.py)
+# ────────────────────────────────────────────────
+def final_gross_percentiles(returns, accounts_values, months: int, n_paths: int, seed: int,
+                            pool_size: int = SUM_POOL_SIZE // 4) -> np.ndarray:
+    """
+    (len(accounts_values), len(PERCENTILES)) percentiles of total gross after `months`,
+    at the historical mean (caller applies fit_to_target). Seeded per account count → same
+    numbers whichever worker / chunk evaluates it (smooth heatmaps)
+    """
+    returns = np.asarray(returns, dtype=float)
+    out = np.empty((len(accounts_values), len(PERCENTILES)))
+    for i, accounts in enumerate(accounts_values):
+        rng = np.random.default_rng([seed, int(accounts)])
+        pool = build_sum_pool(returns, int(accounts), rng, pool_size)
+        finals = pool[rng.integers(0, pool.size, size=(n_paths, months))].sum(axis=1)
+        out[i] = np.percentile(finals, PERCENTILES)
+    return out
+
+
+def end_state(final_gross, months: int, start_gf: float, gf_pct, manual_in, gf_spend) -> dict:
+    """End-of-horizon Growth Fund / distributed totals (broadcasts over grid arrays)"""
+    g = np.asarray(gf_pct, dtype=float) / 100.0
+    net_gf = g * final_gross + (manual_in - gf_spend) * months
+    return {
+        "growth_fund": start_gf + net_gf,
+        "net_growth_fund": net_gf,
+        "distributed": (1 - g) * final_gross - manual_in * months,
+    }
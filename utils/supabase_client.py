@@ -4,11 +4,14 @@ Centralized Supabase client with caching
 Gamitin 'to sa lahat ng files para iwas sa paulit-ulit na create_client
 """
 
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 import streamlit as st
 import os
 from dotenv import load_dotenv
 
+from utils.http_transport import get_http_client
+from utils.query_trace import TracedClient
+
 load_dotenv()  # para sa local dev (.env file)
 
 @st.cache_resource
@@ -16,6 +19,8 @@ def get_supabase() -> Client:
     """
     Cached Supabase client — hindi na nagrerecreate sa bawat rerun
     Priority: Streamlit secrets > .env > error
+    Wrapped in TracedClient → per-rerun query stats (🩺 Query Diagnostics)
+    PostgREST/Storage/Functions share the pooled keep-alive transport (utils/http_transport.py)
     """
     url = st.secrets.get("SUPABASE_URL") or os.getenv("SUPABASE_URL")
     key = st.secrets.get("SUPABASE_KEY") or os.getenv("SUPABASE_KEY")
@@ -26,7 +31,8 @@ def get_supabase() -> Client:
             "Ilagay sa Streamlit Cloud Secrets o sa .env file."
         )
 
-    return create_client(url, key)
+    options = ClientOptions(httpx_client=get_http_client())
+    return TracedClient(create_client(url, key, options=options))
 
 
 # Global access — import lang 'to sa ibang files
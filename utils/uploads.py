@@ -0,0 +1,112 @@
+# utils/uploads.py
+"""
+Parallel multi-file upload engine (File Vault, Announcements, Messages, Withdrawals)
+- Up to UPLOAD_WORKERS files in flight at once (built on helpers.store_file)
+- Per-file progress on the script thread, retry with backoff for transient errors
+  only (timeouts, connection drops, 429/5xx) — 4xx / duplicate / auth fail fast
+- One bulk metadata insert at the end (client_files / announcement_files);
+  if it fails, callers remove_uploaded() so no orphan objects stay in storage
+Total time ≈ slowest file, hindi sum ng lahat.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+import streamlit as st
+
+from utils.helpers import read_upload, store_file
+from utils.supabase_client import supabase
+
+UPLOAD_WORKERS = 4
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 0.5  # seconds → 0.5, 1, 2
+
+
+def _is_transient(error: Exception) -> bool:
+    """Timeouts / dropped connections / 429 / 5xx — worth another try"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    status = getattr(error, "status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return False
+    return status == 429 or status >= 500
+
+
+def _upload_with_retry(content: bytes, file_name: str, content_type: str, bucket: str,
+                       folder: str, use_signed_url: bool):
+    for attempt in range(UPLOAD_RETRIES):
+        try:
+            return store_file(content, file_name, bucket, folder,
+                              content_type=content_type, use_signed_url=use_signed_url)
+        except Exception as e:
+            if attempt == UPLOAD_RETRIES - 1 or not _is_transient(e):
+                raise
+            time.sleep(UPLOAD_BACKOFF * (2 ** attempt))
+
+
+def upload_many(files, bucket: str, folder: str = "", use_signed_url: bool = False,
+                max_workers: int = UPLOAD_WORKERS, show_progress: bool = True) -> list:
+    """
+    Upload many files concurrently.
+    Returns one dict per input file (same order):
+        {"file", "name", "content", "url", "storage_path", "error"}
+    error is None on success.
+    """
+    files = list(files or [])
+    if not files:
+        return []
+
+    # Read bytes on the script thread (UploadedFile is not thread-safe to share)
+    results = [
+        {"file": f, "name": getattr(f, "name", "file"), "content": read_upload(f),
+         "url": None, "storage_path": None, "error": None}
+        for f in files
+    ]
+
+    progress = st.progress(0.0) if show_progress else None
+    status = st.empty() if show_progress else None
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as pool:
+        futures = {
+            pool.submit(_upload_with_retry, r["content"], r["name"], getattr(r["file"], "type", None),
+                        bucket, folder, use_signed_url): r
+            for r in results
+        }
+        for fut in as_completed(futures):
+            r = futures[fut]
+            try:
+                r["url"], r["storage_path"] = fut.result()
+            except Exception as e:
+                r["error"] = str(e)
+            done += 1
+            if show_progress:
+                progress.progress(done / len(files))
+                status.text(f"{'✅' if not r['error'] else '❌'} {r['name']} ({done}/{len(files)})")
+
+    if show_progress:
+        progress.empty()
+        status.empty()
+    return results
+
+
+def remove_uploaded(bucket: str, results: list):
+    """Best-effort delete of the objects upload_many() stored (metadata insert failed)"""
+    paths = [r["storage_path"] for r in results if r.get("storage_path")]
+    if not paths:
+        return
+    try:
+        supabase.storage.from_(bucket).remove(paths)
+    except Exception:
+        pass  # orphan objects only cost storage — never mask the original error
+
+
+def insert_file_rows(table: str, rows: list) -> list:
+    """Single bulk insert for all uploaded files' metadata → inserted rows (same order)"""
+    if not rows:
+        return []
+    return supabase.table(table).insert(rows).execute().data or []
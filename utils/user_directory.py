@@ -0,0 +1,98 @@
+# utils/user_directory.py
+"""
+Shared identity resolution for KMFX Empire (user id → full name)
+- Process-wide id → name cache with TTL (shared by all sessions)
+- Missing ids are resolved with ONE bulk in_() query per call
+- Explicit invalidation after users insert/update/delete
+Gamitin 'to instead of per-contributor users lookups sa loops
+"""
+import threading
+import time
+
+from utils.supabase_client import supabase
+
+NAME_TTL_SECONDS = 300
+
+_lock = threading.Lock()
+_names = {}  # user_id (str) → (full_name, cached_at)
+
+
+# ────────────────────────────────────────────────
+# CACHE PRIMING / INVALIDATION
+# ────────────────────────────────────────────────
+def prime_user_names(rows):
+    """
+    Seed the cache from any users query na may 'id' at 'full_name' na
+    (e.g. FTMO Accounts / Profit Sharing full users fetch) para walang extra round-trip
+    """
+    now = time.monotonic()
+    with _lock:
+        for row in rows or []:
+            if row.get("id") is not None:
+                _names[str(row["id"])] = (row.get("full_name"), now)
+
+
+def invalidate_user_names(user_ids=None):
+    """Drop cached names — specific ids, or everything if user_ids is None"""
+    with _lock:
+        if user_ids is None:
+            _names.clear()
+        else:
+            for uid in user_ids:
+                _names.pop(str(uid), None)
+
+
+# ────────────────────────────────────────────────
+# BULK RESOLUTION
+# ────────────────────────────────────────────────
+def resolve_user_names(user_ids) -> dict:
+    """
+    Resolve many user ids at once → {user_id: full_name}
+    Fresh cache hits are free; the rest go out in a single users.in_() query.
+    Unknown ids are simply absent from the result (caller decides the fallback).
+    """
+    wanted = {str(uid) for uid in user_ids if uid}
+    now = time.monotonic()
+    result = {}
+    missing = []
+
+    with _lock:
+        for uid in wanted:
+            cached = _names.get(uid)
+            if cached and now - cached[1] < NAME_TTL_SECONDS:
+                if cached[0] is not None:
+                    result[uid] = cached[0]
+            else:
+                missing.append(uid)
+
+    if missing:
+        try:
+            rows = supabase.table("users").select("id, full_name").in_("id", missing).execute().data or []
+        except Exception:
+            return result  # Don't negative-cache on network errors
+
+        prime_user_names(rows)
+        found = set()
+        for row in rows:
+            found.add(str(row["id"]))
+            if row.get("full_name") is not None:
+                result[str(row["id"])] = row["full_name"]
+
+        # Negative-cache deleted/unknown ids para di na ulit i-query hanggang TTL
+        with _lock:
+            for uid in missing:
+                if uid not in found:
+                    _names[uid] = (None, now)
+
+    return result
+
+
+def contributor_user_ids(accounts) -> set:
+    """Collect every contributor user id across accounts (v2 trees with legacy fallback)"""
+    ids = set()
+    for acc in accounts or []:
+        for c in acc.get("contributors_v2") or acc.get("contributors", []) or []:
+            user_id = c.get("user_id") or c.get("id")
+            if user_id:
+                ids.add(str(user_id))
+    return ids